@@ -5,20 +5,32 @@ Clean, simple pattern matching the old working code.
 """
 
 import os
+import atexit
 import logging
+import logging.handlers
+import queue
 import time
 import asyncio
 import threading
-from typing import Optional
-from contextlib import asynccontextmanager
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
 from datetime import datetime
 from aiohttp import web
 
-from supabase import create_client, Client
+from supabase import Client
+
+# Prefer uvloop when available: lower per-callback overhead for the many small
+# concurrent Supabase/OpenAI HTTP calls each session makes. Set at import (not under
+# __main__) so job processes, which import this module but never run __main__, get it too
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    uvloop = None
 from livekit import agents, rtc
 from livekit.agents import AgentSession, Agent, RoomInputOptions, RunContext, function_tool, ChatContext
-from livekit.plugins import openai as lk_openai
-from livekit.plugins import silero
 from uplift_tts import TTS
 
 # Import core utilities
@@ -44,16 +56,24 @@ from services import (
     RAGService,
     ConversationSummaryService,
 )
+from services.memory_service import CONTEXT_MEMORY_CATEGORIES, MEMORY_CATEGORIES, VALID_CATEGORIES
+from services.profile_service import mentions_profile_details
 
 # Import infrastructure
-from infrastructure.connection_pool import get_connection_pool, get_connection_pool_sync, ConnectionPool
+from infrastructure.connection_pool import get_connection_pool, get_connection_pool_sync, get_shared_supabase_client, ConnectionPool
 from infrastructure.redis_cache import get_redis_cache, get_redis_cache_sync, RedisCache
-from infrastructure.database_batcher import get_db_batcher, get_db_batcher_sync, DatabaseBatcher
+from infrastructure.database_batcher import get_db_batcher, get_db_batcher_sync, init_db_batcher, DatabaseBatcher
 
 # ---------------------------
 # Logging Configuration
 # ---------------------------
-logging.basicConfig(level=logging.INFO)
+# Handlers run on a listener thread: log calls on the event loop only enqueue the
+# record, so a slow or blocked stdout never stalls audio/LLM callbacks
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(level=Config.LOG_LEVEL, handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 # Suppress noisy libraries and audio data logging
 for noisy in ("httpx", "httpcore", "hpack", "urllib3", "openai", "httpx._client", "httpcore.http11", "httpcore.connection"):
     logging.getLogger(noisy).setLevel(logging.WARNING)
@@ -62,90 +82,87 @@ for noisy in ("httpx", "httpcore", "hpack", "urllib3", "openai", "httpx._client"
 logging.getLogger("openai._base_client").setLevel(logging.ERROR)
 logging.getLogger("httpx").setLevel(logging.ERROR)
 
+logger = logging.getLogger("agent")
+logger.setLevel(Config.LOG_LEVEL)  # LOG_LEVEL=DEBUG shows per-turn diagnostics, WARNING for production
+
 # ---------------------------
-# Supabase Client Setup
+# Greeting Defaults
 # ---------------------------
-supabase: Optional[Client] = None
+# Static greetings used when the AI greeting is unavailable or too slow
+FALLBACK_GREETING = "السلام علیکم! کیسے ہیں آپ؟"
+FALLBACK_GREETING_WITH_NAME = "السلام علیکم {name}! آج کیسے ہیں؟"
+# Upper bound on first-greeting generation so a slow LLM can't hold the worker slot
+GREETING_TIMEOUT_S = 30
+# How long a memory search waits for the background RAG load before searching what's indexed
+RAG_LOAD_WAIT_S = 1.0
+# Overall budget for the getCompleteUserInfo fan-out so a slow Supabase can't stall the reply
+USER_INFO_TIMEOUT_S = 2.0
+# Profile regeneration is debounced: meaningful messages are collected and sent to
+# the profile LLM together after this many messages or this many seconds
+PROFILE_DEBOUNCE_TURNS = 5
+PROFILE_DEBOUNCE_S = 20.0
+# Max per-turn background pipelines (profile/state LLM + DB writes) running at once in
+# this worker process; further turns queue for a slot instead of piling onto the APIs
+BACKGROUND_CONCURRENCY = 8
+_background_slots = asyncio.Semaphore(BACKGROUND_CONCURRENCY)
+
+# Returning-user greeting prompt, built once at import; each session only fills in
+# the user/time fields with str.format
+_GREETING_PROMPT_TEMPLATE = """Generate the FIRST greeting for a returning user. 
+DECIDE: (A) Follow up on last conversation  OR  (B) Fresh open-ended start.
 
-if not Config.SUPABASE_URL:
-    print("[SUPABASE ERROR] SUPABASE_URL not configured")
-else:
-    key = Config.get_supabase_key()
-    if not key:
-        print("[SUPABASE ERROR] No Supabase key configured")
-    else:
-        try:
-            loop = None
-            try:
-                loop = asyncio.get_running_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            pool = get_connection_pool_sync()
-            if pool is None:
-                pool = ConnectionPool()
-                if loop.is_running():
-                    asyncio.create_task(pool.initialize())
-                else:
-                    loop.run_until_complete(pool.initialize())
-            
-            supabase = pool.get_supabase_client(Config.SUPABASE_URL, key)
-            set_supabase_client(supabase)
-            print(f"[SUPABASE] Connected using {'SERVICE_ROLE' if Config.SUPABASE_SERVICE_ROLE_KEY else 'ANON'} key (pooled)")
-        except Exception as e:
-            print(f"[SUPABASE ERROR] Connect failed: {e}")
-            supabase = None
+You are Humraaz, a warm, witty, strictly platonic female friend who speaks Urdu only.
 
+[User Info]
+- First name: {first_name}     # Use only the first name in greeting; never full name.
+- Local time now: {local_time} ({time_of_day}; {weekday})
+- Last chat: {last_seen_relative}  ({days} days, {hours} hours ago)
+- User gender (for addressing): {user_gender_value}
 
-# ---------------------------
-# Helper Functions
-# ---------------------------
-async def wait_for_participant(room, *, target_identity: Optional[str] = None, timeout_s: int = 20):
-    """Wait for a remote participant to join"""
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        parts = list(room.remote_participants.values())
-        if parts:
-            if target_identity:
-                for p in parts:
-                    if p.identity == target_identity:
-                        return p
-            else:
-                standard = [p for p in parts if getattr(p, "kind", None) == "STANDARD"]
-                return (standard[0] if standard else parts[0])
-        await asyncio.sleep(0.5)
-    return None
+[Context Inputs]
+- Last summary (<= 250 chars): {summary_text}
+- Last topics (up to 5): {topics_str}
+
+[Decision Heuristics]
+Choose FOLLOW-UP if ALL are true:
+  • recency ≤ 12 hours  OR  (recency ≤ 14 days AND current message domain ≈ last_topics)
+  • last summary contains a goal/concern or an ongoing item (e.g., sleep, review, trip, health, exam)
+  • not sensitive unless user-led (health/finances/relationships)
+Otherwise choose FRESH.
+
+[Safety & Non-creepy Rules]
+- Use at most ONE soft callback clause (≤ 12–16 Urdu tokens) if FOLLOW-UP.
+- Never quote the summary verbatim; paraphrase softly.
+- If the last topic is older than 14 days, avoid callback unless the user recently re-opened it.
+- Do not mention tools, logs, or "summary".
+- Sensitive topics (health/finance/relationship) = user-led only.
+
+[Tone & Form]
+- Urdu only; natural colloquial SOV order.
+- 1–2 short sentences MAX (casual); warm, friendly, not formal.
+- Match time-of-day in a tiny way (morning/evening/late-night).
+- Address user with polite "آپ". Assistant speaks in female first person ("میں … ہوں/کروں گی").
+
+[Micro-variation]
+- Vary openers across sessions (don't reuse the last greeting template).
+- If FOLLOW-UP: acknowledge briefly → one light question or gentle nudge.
+- If FRESH: neutral warmth + 1 open question that lets the user lead.
+
+[Output format]
+- Output ONLY the Urdu greeting text (no labels, no English, no metadata).
+
+# Decision Examples (for the model, do not output):
+- (Morning, last chat 3h ago, topic=sleep): FOLLOW-UP → "صبح بخیر {first_name}! پچھلی رات ذرا کم نیند تھی—آج کیسا لگ رہا ہے؟"
+- (Evening, last chat 9d ago, casual topics): FRESH → "{first_name}, آج دن کیسا گزرا؟ کچھ ہلکی بات سے شروع کریں؟"
+- (Late night, sensitive/old): FRESH (no callback)."""
 
 # ---------------------------
-# Assistant Agent - Simplified Pattern
+# Agent Instructions
 # ---------------------------
-class Assistant(Agent):
-    def __init__(self, chat_ctx: Optional[ChatContext] = None, user_gender: str = None, user_time: str = None):
-        # Track background tasks to prevent memory leaks
-        self._background_tasks = set()
-        
-        # Store room reference for state broadcasting
-        self._room = None
-        self._current_state = "idle"
-        
-        # Track last processed conversation context for database updates
-        self._last_processed_context = ""
-        self._pending_user_message = ""  # Store user message until we get assistant response
-        self._last_assistant_response = ""  # Store last assistant response from conversation_item_added
-        self._user_turn_time = None  # Track when user finished speaking for response time measurement
-        
-        # PATCH: Store session and chat context for conversation history management
-        # NOTE: ChatContext is passed to parent Agent class (line 403) where LiveKit's framework
-        # manages it automatically. We store it here for reference and maintain _conversation_history
-        # internally for tracking, logging, and potential additional context injection if needed.
-        self._session = None
-        self._chat_ctx = chat_ctx if chat_ctx else ChatContext()
-        self._conversation_history = []  # [(user_msg, assistant_msg), ...]
-        self._max_history_turns = 10  # Keep last 10 turns for context
-        self._max_context_tokens = 3000  # Approximate token budget for history
-        
-        self._base_instructions = """
+# Static persona prompt. Kept verbatim (no interpolation) and always sent as the
+# leading part of the instructions so it forms a stable, cacheable prompt prefix;
+# anything user- or session-specific must be appended after it.
+_BASE_INSTRUCTIONS = """
 #
 
 You are **Humraaz**, a warm, witty, supportive **female friend** who speaks **Urdu only**. Your goal is to create natural, engaging conversations that help the user reflect and grow — while staying strictly platonic.
@@ -406,24 +423,154 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
 
 
 """
+
+# Pronoun guidance appended after the gender line, keyed by lowercased gender
+_GENDER_PRONOUN_HINTS = {
+    "male": "- Use masculine pronouns when addressing the user in Urdu\n",
+    "female": "- Use feminine pronouns when addressing the user in Urdu\n",
+}
+
+# Per-session instruction sections, filled with .format() in Assistant.__init__
+_GENDER_CONTEXT_TEMPLATE = "\n\n---\n\n## User Gender Context\n\n**User's Gender**: {gender}\n"
+_TIME_CONTEXT_TEMPLATE = "\n\n---\n\n## Current Time\n\n{time}\n"
+
+# ---------------------------
+# Supabase Client Setup
+# ---------------------------
+# The client itself is created lazily by ensure_supabase() on the job's event
+# loop - nothing connects at import time
+supabase: Optional[Client] = None
+_SUPABASE_KEY: Optional[str] = None
+_supabase_lock = asyncio.Lock()  # single-flight guard for ensure_supabase()
+
+if not Config.SUPABASE_URL:
+    print("[SUPABASE ERROR] SUPABASE_URL not configured")
+else:
+    _SUPABASE_KEY = Config.get_supabase_key()
+    if not _SUPABASE_KEY:
+        print("[SUPABASE ERROR] No Supabase key configured")
+
+
+async def ensure_supabase() -> Optional[Client]:
+    """
+    Create the pooled Supabase client on first use (idempotent).
+    
+    Returns:
+        Supabase client, or None if not configured / connect failed
+    """
+    global supabase
+    if supabase is not None or not (Config.SUPABASE_URL and _SUPABASE_KEY):
+        return supabase
+    async with _supabase_lock:
+        # Concurrent first callers wait for one connect instead of racing their own
+        if supabase is None:
+            try:
+                pool = await get_connection_pool()
+                supabase = pool.get_supabase_client(Config.SUPABASE_URL, _SUPABASE_KEY)
+                set_supabase_client(supabase)
+                print(f"[SUPABASE] Connected using {'SERVICE_ROLE' if Config.SUPABASE_SERVICE_ROLE_KEY else 'ANON'} key (pooled)")
+            except Exception as e:
+                print(f"[SUPABASE ERROR] Connect failed: {e}")
+                supabase = None
+    return supabase
+
+
+# ---------------------------
+# Helper Functions
+# ---------------------------
+def _select_participant(participants, target_identity: Optional[str] = None):
+    """Pick the target participant, or the first STANDARD one (any if none), or None"""
+    parts = list(participants)
+    if not parts:
+        return None
+    if target_identity:
+        return next((p for p in parts if p.identity == target_identity), None)
+    standard = [p for p in parts if getattr(p, "kind", None) == "STANDARD"]
+    return standard[0] if standard else parts[0]
+
+
+async def wait_for_participant(room, *, target_identity: Optional[str] = None, timeout_s: int = 20):
+    """Wait for a remote participant to join (event-driven, no polling)"""
+    # Subscribe before checking the current participants so a join can't slip
+    # in between the check and the subscription
+    joined = asyncio.get_running_loop().create_future()
+
+    def on_participant_connected(participant):
+        # Resolve with the participant that actually joined - no re-scan afterwards
+        if not joined.done() and (not target_identity or participant.identity == target_identity):
+            joined.set_result(participant)
+
+    room.on("participant_connected", on_participant_connected)
+    try:
+        found = _select_participant(room.remote_participants.values(), target_identity)
+        if found:
+            return found
+        return await asyncio.wait_for(joined, timeout=timeout_s)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        room.off("participant_connected", on_participant_connected)
+
+# ---------------------------
+# Assistant Agent - Simplified Pattern
+# ---------------------------
+class Assistant(Agent):
+    # Shared by every session; per-session sections are appended after it
+    BASE_INSTRUCTIONS = _BASE_INSTRUCTIONS
+    # Data-channel payloads for the UI states, encoded once
+    _STATE_BYTES = {s: s.encode("utf-8") for s in ("idle", "listening", "thinking", "speaking")}
+    # Superseded within moments, so a dropped packet is cheaper than a retransmit;
+    # the resting state stays reliable so the UI can't get stuck on a stale one
+    _TRANSIENT_STATES = frozenset(("listening", "thinking", "speaking"))
+
+    def __init__(self, chat_ctx: Optional[ChatContext] = None, user_gender: str = None, user_time: str = None):
+        # Track background tasks to prevent memory leaks
+        self._background_tasks = set()
+        
+        # Store room reference for state broadcasting
+        self._room = None
+        self._current_state = "idle"
+        
+        # Track last processed conversation context for database updates
+        self._last_processed_context = ""
+        self._pending_user_message = ""  # Store user message until we get assistant response
+        self._last_assistant_response = ""  # Store last assistant response from conversation_item_added
+        self._user_turn_time = None  # Track when user finished speaking for response time measurement
+        
+        # PATCH: Store session and chat context for conversation history management
+        # NOTE: ChatContext is passed to parent Agent class (line 403) where LiveKit's framework
+        # manages it automatically. We store it here for reference and maintain _conversation_history
+        # internally for tracking, logging, and potential additional context injection if needed.
+        self._session = None
+        self._chat_ctx = chat_ctx if chat_ctx else ChatContext()
+        self._conversation_history = []  # [(user_msg, assistant_msg), ...]
+        self._max_history_turns = 10  # Keep last 10 turns for context
+        self._max_context_tokens = 3000  # Approximate token budget for history
+        
+        # Fixed prompt prefix first, per-session details appended after it, so the
+        # provider's prompt cache can reuse the shared prefix across sessions.
+        # Segments are collected and joined once instead of re-copying the
+        # whole prompt on every +=.
+        instruction_parts = [self.BASE_INSTRUCTIONS]
         
         # Add gender context if available
         if user_gender:
-            gender_context = f"\n\n---\n\n## User Gender Context\n\n**User's Gender**: {user_gender}\n"
-            if user_gender.lower() == "male":
-                gender_context += "- Use masculine pronouns when addressing the user in Urdu\n"
-            elif user_gender.lower() == "female":
-                gender_context += "- Use feminine pronouns when addressing the user in Urdu\n"
-            
-            self._base_instructions += gender_context
+            instruction_parts.append(_GENDER_CONTEXT_TEMPLATE.format(gender=user_gender))
+            pronoun_hint = _GENDER_PRONOUN_HINTS.get(user_gender.lower())
+            if pronoun_hint:
+                instruction_parts.append(pronoun_hint)
             print(f"[AGENT INIT] ✅ Gender context added to instructions: {user_gender}")
         
         # Add time context if available
         if user_time:
-            time_context = f"\n\n---\n\n## Current Time\n\n{user_time}\n"
-            self._base_instructions += time_context
+            instruction_parts.append(_TIME_CONTEXT_TEMPLATE.format(time=user_time))
             print(f"[AGENT INIT] ✅ Time context added: {user_time}")
         
+        # Without per-session sections, reuse the shared string instead of copying it
+        self._base_instructions = (
+            "".join(instruction_parts) if len(instruction_parts) > 1 else self.BASE_INSTRUCTIONS
+        )
+        
         # CRITICAL: Pass chat_ctx to parent Agent class for initial context
         print(f"[AGENT INIT] 📝 Instructions length: {len(self._base_instructions)} chars")
         print(f"[AGENT INIT] 📝 ChatContext provided: {'Yes' if chat_ctx else 'No'}")
@@ -448,6 +595,24 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         self._turn_counter = 0
         self.SUMMARY_INTERVAL = 5  # Generate summary every 10 turns
         self.rag_service = None  # Set per-user in entrypoint
+        self.rag_load_task: Optional[asyncio.Task] = None  # Background RAG load (set in entrypoint)
+        
+        # Bumped on every profile/memory/state write this session; getCompleteUserInfo
+        # reuses its last result while the version is unchanged
+        self._context_version = 0
+        self._user_info_cache: Optional[tuple] = None  # (user_id, version, result)
+        
+        # Debounced profile updates: messages waiting for the next regeneration
+        self._pending_profile_inputs: List[str] = []
+        self._pending_profile_user: Optional[str] = None
+        self._latest_profile: Optional[str] = None
+        self._profile_flush_task: Optional[asyncio.Task] = None
+        self._profile_flush_now = asyncio.Event()  # Ends the current debounce wait early
+        self._profile_lock = asyncio.Lock()
+        # Last profile read or written this session, tagged with _profile_version;
+        # bumping the version (a save, or invalidate_profile_cache) forces a refetch
+        self._profile_cache: Optional[tuple] = None  # (version, profile)
+        self._profile_version = 0
         
         # DEBUG: Log registered function tools (safely)
         print("[AGENT INIT] Checking registered function tools...")
@@ -477,6 +642,17 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         self._session = session
         print(f"[SESSION] Session reference stored for history management")
     
+    def invalidate_profile_cache(self):
+        """Force the next background turn to re-read the profile"""
+        self._profile_version += 1
+    
+    def _profile_saved(self, profile: str):
+        """Record a profile this session just saved"""
+        self._profile_version += 1
+        self._profile_cache = (self._profile_version, profile)
+        self._latest_profile = profile
+        self._context_version += 1
+    
     def _estimate_tokens(self, text: str) -> int:
         """Rough token estimate: ~4 chars per token for English/Urdu mix"""
         return len(text) // 4
@@ -567,10 +743,10 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         # OPTIMIZATION: Run broadcast in background to avoid blocking conversation flow
         async def _publish():
             try:
-                message = state.encode('utf-8')
+                message = self._STATE_BYTES.get(state) or state.encode('utf-8')
                 await self._room.local_participant.publish_data(
                     message,
-                    reliable=True,
+                    reliable=state not in self._TRANSIENT_STATES,
                     destination_identities=[]  # Broadcast to all
                 )
                 print(f"[STATE] 📡 Broadcasted: {old_state} → {state}")
@@ -598,26 +774,35 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         Returns:
             Success status (optimistic) - actual save happens in background
         """
-        print("=" * 80)
-        print(f"🔥 [MEMORY TOOL CALLED] storeInMemory")
-        print(f"🔥 Category: {category}")
-        print(f"🔥 Key: {key}")
-        print(f"🔥 Value: {value[:100]}{'...' if len(value) > 100 else ''}")
-        print("=" * 80)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[TOOL] storeInMemory value: %s%s", value[:100], "..." if len(value) > 100 else "")
         
         logging.info(f"[TOOL] 💾 storeInMemory called: [{category}] {key}")
         print(f"[TOOL] 💾 storeInMemory called: [{category}] {key}")
         
+        category = category.strip().upper()
+        if category not in VALID_CATEGORIES:
+            print(f"[TOOL] ❌ Invalid memory category: {category}")
+            return {
+                "success": False,
+                "message": f"Invalid category '{category}'. Use one of: {', '.join(MEMORY_CATEGORIES)}"
+            }
+        
         # Fire-and-forget background save task
         async def save_in_background():
             """Save memory in background without blocking LLM response"""
             try:
-                # Save to database
-                success = await asyncio.to_thread(
-                    self.memory_service.save_memory, category, key, value
-                )
+                if not can_write_for_current_user():
+                    return
+                user_id = get_current_user_id()
+                if not user_id:
+                    return
+                
+                # Save to database (batched with concurrent writes via the DB batcher)
+                success = await self.memory_service.store_memory_async(category, key, value, user_id)
                 
                 if success:
+                    self._context_version += 1
                     print(f"[MEMORY_BG] ✅ Saved to database: [{category}] {key}")
                     logging.info(f"[MEMORY_BG] ✅ Saved: [{category}] {key}")
                 else:
@@ -657,12 +842,6 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         Returns:
             The stored value or empty string if not found
         """
-        print("=" * 80)
-        print(f"🔥 [MEMORY TOOL CALLED] retrieveFromMemory")
-        print(f"🔥 Category: {category}")
-        print(f"🔥 Key: {key}")
-        print("=" * 80)
-        
         print(f"[TOOL] 🔍 retrieveFromMemory called: [{category}] {key}")
         user_id = get_current_user_id()
         memory = self.memory_service.get_memory(category, key, user_id)
@@ -686,6 +865,8 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
             return {"success": False, "message": "No meaningful profile information could be extracted"}
         
         success = self.profile_service.save_profile(generated_profile)
+        if success:
+            self._profile_saved(generated_profile)
         return {"success": success, "message": "User profile updated successfully" if success else "Failed to save profile"}
 
     @function_tool()
@@ -771,11 +952,6 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         Returns:
             Complete user profile, all memories by category, conversation state, and trust score
         """
-        print("=" * 80)
-        print(f"🔥 [INFO TOOL CALLED] getCompleteUserInfo")
-        print(f"🔥 Fetching: Profile + Name + State + ALL Memories (BATCHED)")
-        print("=" * 80)
-        
         print(f"[TOOL] 📋 getCompleteUserInfo called - retrieving ALL user data")
         user_id = get_current_user_id()
         
@@ -783,26 +959,59 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
             print(f"[TOOL] ⚠️  No active user")
             return {"message": "No active user"}
         
+        # Nothing written since the last call - reuse that result without any I/O
+        cached = self._user_info_cache
+        if cached and cached[0] == user_id and cached[1] == self._context_version:
+            print(f"[TOOL] ✅ No changes since last call - returning cached user info")
+            return cached[2]
+        
+        version = self._context_version  # writes landing mid-fetch leave the result uncached
         try:
             # OPTIMIZED: Fetch everything in parallel using batch queries
-            profile_task = self.profile_service.get_profile_async(user_id)
             name_task = self.conversation_context_service.get_context(user_id)
             state_task = self.conversation_state_service.get_state(user_id)
             
             # Use batch query for all categories at once (OPTIMIZATION!)
-            categories = ['FACT', 'GOAL', 'INTEREST', 'EXPERIENCE', 'PREFERENCE', 'RELATIONSHIP', 'PLAN', 'OPINION']
-            memories_task = asyncio.to_thread(
-                self.memory_service.get_memories_by_categories_batch,
-                categories=categories,
+            memories_task = self.memory_service.get_memories_by_categories_async(
+                categories=MEMORY_CATEGORIES,
                 limit_per_category=5,
                 user_id=user_id
             )
             
-            # Gather all data in parallel (1 query instead of 8!)
-            profile, context_data, state, memories_by_category = await asyncio.gather(
-                profile_task, name_task, state_task, memories_task,
-                return_exceptions=True
+            # Profile + display name (name fallback) share one Redis round trip
+            profile_name_task = self.profile_service.get_profile_and_display_name_async(user_id)
+            
+            # Run all fetches in parallel (1 query instead of 8!), latency = slowest call.
+            # Each fetch returns its own exception, so one failing never cancels the
+            # others, and on timeout the fetches that already finished are still used
+            async def settle(coro):
+                try:
+                    return await coro
+                except Exception as e:
+                    return e
+            
+            try:
+                async with asyncio.timeout(USER_INFO_TIMEOUT_S):
+                    async with asyncio.TaskGroup() as tg:
+                        fetches = [
+                            tg.create_task(settle(coro))
+                            for coro in (profile_name_task, name_task, state_task, memories_task)
+                        ]
+            except TimeoutError:
+                print(f"[TOOL] ⚠️ User info fetch exceeded {USER_INFO_TIMEOUT_S}s")
+            timed_out = TimeoutError(f"User info fetch exceeded {USER_INFO_TIMEOUT_S}s")
+            profile_and_name, context_data, state, memories_by_category = (
+                task.result() if task.done() and not task.cancelled() else timed_out
+                for task in fetches
+            )
+            
+            fetch_failed = any(
+                isinstance(r, Exception) for r in (profile_and_name, context_data, state, memories_by_category)
             )
+            if isinstance(profile_and_name, Exception):
+                profile = display_name = profile_and_name
+            else:
+                profile, display_name = profile_and_name
             
             # Handle exceptions
             if isinstance(memories_by_category, Exception):
@@ -815,10 +1024,23 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
                 if mems:
                     memories_dict[cat] = [m['value'] for m in mems]
             
-            # Extract name
+            # Extract name: context → display name → FACT/name memory (already in the batch)
             user_name = None
             if context_data and not isinstance(context_data, Exception):
                 user_name = context_data.get("user_name")
+            if not user_name and isinstance(display_name, str) and display_name:
+                user_name = display_name
+            if not user_name:
+                user_name = next(
+                    (m.get("value") for m in memories_by_category.get("FACT", []) if m.get("key") == "name"),
+                    None
+                )
+            if not user_name and not isinstance(display_name, TimeoutError):
+                # Name memory older than the batch window
+                try:
+                    user_name = await self.memory_service.get_value_async(user_id=user_id, category="FACT", key="name")
+                except Exception as e:
+                    print(f"[TOOL] Error fetching name memory: {e}")
             
             # Build response
             result = {
@@ -837,6 +1059,9 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
             print(f"[TOOL]    Stage: {result['conversation_stage']}, Trust: {result['trust_score']:.1f}")
             print(f"[TOOL]    Memories: {result['total_memories']} across {len(memories_dict)} categories (BATCHED)")
             
+            if not fetch_failed:
+                self._user_info_cache = (user_id, version, result)
+            
             return result
             
         except Exception as e:
@@ -859,37 +1084,37 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         Returns:
             List of relevant memories with similarity scores
         """
-        print("=" * 80)
-        print(f"🔥 [MEMORY TOOL CALLED] searchMemories")
-        print(f"🔥 Query: {query}")
-        print(f"🔥 Limit: {limit}")
-        print("=" * 80)
-        
         print(f"[TOOL] 🔍 searchMemories called: query='{query}', limit={limit}")
         user_id = get_current_user_id()
         
         # DEBUG: Track user_id in tool execution
-        print(f"[DEBUG][USER_ID] searchMemories - Current user_id: {UserId.format_for_display(user_id) if user_id else 'NONE'}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[USER_ID] searchMemories - Current user_id: %s", UserId.format_for_display(user_id) if user_id else 'NONE')
         
         if not user_id:
             print(f"[TOOL] ⚠️  No active user")
-            print(f"[DEBUG][USER_ID] ❌ Tool call failed - user_id is None!")
+            logger.debug("[USER_ID] ❌ Tool call failed - user_id is None!")
             return {"memories": [], "message": "No active user"}
         
         try:
             if not self.rag_service:
                 print(f"[TOOL] ⚠️  RAG not initialized")
-                print(f"[DEBUG][RAG] ❌ RAG service is None for user {UserId.format_for_display(user_id)}")
+                logger.debug("[RAG] ❌ RAG service is None for user %s", UserId.format_for_display(user_id))
                 return {"memories": [], "message": "RAG not initialized"}
             
-            # DEBUG: Check RAG state
-            rag_system = self.rag_service.get_rag_system()
-            print(f"[DEBUG][RAG] RAG system exists: {rag_system is not None}")
-            if rag_system:
-                memory_count = len(rag_system.memories)
-                print(f"[DEBUG][RAG] Current RAG has {memory_count} memories loaded")
-                print(f"[DEBUG][RAG] RAG user_id: {UserId.format_for_display(rag_system.user_id)}")
-                print(f"[DEBUG][RAG] FAISS index total: {rag_system.index.ntotal}")
+            # DEBUG: Check RAG state (skipped entirely unless debug logging is on)
+            if logger.isEnabledFor(logging.DEBUG):
+                rag_system = self.rag_service.get_rag_system()
+                logger.debug("[RAG] RAG system exists: %s", rag_system is not None)
+                if rag_system:
+                    logger.debug("[RAG] Current RAG has %d memories loaded", len(rag_system.memories))
+                    logger.debug("[RAG] RAG user_id: %s", UserId.format_for_display(rag_system.user_id))
+                    logger.debug("[RAG] FAISS index total: %d", rag_system.index.ntotal)
+            
+            # Startup load runs in the background; give it a moment to finish if still running
+            # (asyncio.wait never cancels the load on timeout)
+            if self.rag_load_task and not self.rag_load_task.done():
+                await asyncio.wait({self.rag_load_task}, timeout=RAG_LOAD_WAIT_S)
             
             self.rag_service.update_conversation_context(query)
             results = await self.rag_service.search_memories(
@@ -902,6 +1127,7 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
             for i, mem in enumerate(results[:3], 1):
                 print(f"[TOOL]    #{i}: {mem.get('text', '')[:80]}...")
             
+            recent_cutoff = time.time() - 86400
             return {
                 "memories": [
                     {
@@ -909,7 +1135,7 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
                         "category": r["category"],
                         "similarity": round(r["similarity"], 3),
                         "relevance_score": round(r.get("final_score", r["similarity"]), 3),
-                        "is_recent": (time.time() - r["timestamp"]) < 86400
+                        "is_recent": r["timestamp"] > recent_cutoff
                     } for r in results
                 ],
                 "count": len(results),
@@ -917,7 +1143,7 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
             }
         except Exception as e:
             print(f"[TOOL] ❌ Error: {e}")
-            print(f"[DEBUG][RAG] Exception details: {type(e).__name__}: {str(e)}")
+            logger.debug("[RAG] Exception details: %s: %s", type(e).__name__, e)
             return {"memories": [], "message": f"Error: {e}"}
     
     @function_tool()
@@ -1013,9 +1239,9 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
 
             # 3) HARDCODED greeting (no LLM) - instant!
             if user_name:
-                greeting_text = f"السلام علیکم {user_name}! آج کیسے ہیں؟"
+                greeting_text = FALLBACK_GREETING_WITH_NAME.format(name=user_name)
             else:
-                greeting_text = "السلام علیکم! کیسے ہیں آپ؟"
+                greeting_text = FALLBACK_GREETING
 
             logging.info(f"[GREETING] Sending instant hardcoded greeting (user={user_name or 'unknown'})")
             
@@ -1048,31 +1274,18 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         """
         LiveKit Callback: Called when agent turn starts (if supported)
         """
-        current_time = time.time()
-        response_delay = current_time - self._user_turn_time if self._user_turn_time else 0
+        response_delay = time.time() - self._user_turn_time if self._user_turn_time else 0
         
-        print("=" * 80)
-        print("🤖 [AGENT TURN STARTED] Agent starting response")
-        print(f"⏰ Time: {current_time:.2f}")
-        if response_delay > 0:
-            print(f"⚡ Response delay: {response_delay:.2f}s from user finishing")
-        print("=" * 80)
+        logger.debug("[AGENT] Turn started (%.2fs after user finished)", response_delay)
     
     async def on_agent_speech_started(self, turn_ctx):
         """
         LiveKit Callback: Called when agent starts speaking (TTS playback begins)
         Best Practice: Update UI state to show agent is speaking
         """
-        current_time = time.time()
-        response_delay = current_time - self._user_turn_time if self._user_turn_time else 0
-        
-        print("=" * 80)
-        print("🗣️  [AGENT SPEECH STARTED] Agent is now speaking")
-        print(f"⏰ Time: {current_time:.2f}")
-        if response_delay > 0:
-            print(f"⚡ Response time: {response_delay:.2f}s from user finishing")
-        print("=" * 80)
-        logging.info(f"[AGENT] Started speaking")
+        response_delay = time.time() - self._user_turn_time if self._user_turn_time else 0
+        
+        logging.info("[AGENT] Started speaking (%.2fs after user finished)", response_delay)
         await self.broadcast_state("speaking")
     
     async def on_agent_speech_committed(self, turn_ctx):
@@ -1094,12 +1307,8 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
             
             # Update conversation history if we have both messages
             if assistant_msg and self._pending_user_message:
-                # Print the complete conversation turn
-                print("\n" + "=" * 80)
-                print("💬 CONVERSATION TURN:")
-                print(f"👤 USER: {self._pending_user_message}")
-                print(f"🤖 ASSISTANT: {assistant_msg}")
-                print("=" * 80 + "\n")
+                logger.debug("💬 CONVERSATION TURN - 👤 USER: %s | 🤖 ASSISTANT: %s",
+                             self._pending_user_message, assistant_msg)
                 
                 self._update_conversation_history(self._pending_user_message, assistant_msg)
         
@@ -1168,21 +1377,14 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         LiveKit Callback: Called when user starts speaking (VAD detected speech)
         Best Practice: Update UI to show user is speaking (stops "listening" animation)
         """
-        print("=" * 80)
-        print("🎤 [USER SPEECH STARTED] VAD detected user speaking")
-        print(f"⏰ Time: {time.time():.2f}")
-        print("=" * 80)
-        logging.info(f"[USER] Started speaking")
+        logging.info("[USER] Started speaking")
         # Note: We don't broadcast state here to avoid flickering on short utterances
     
     async def on_user_turn_started(self, turn_ctx):
         """
         LiveKit Callback: Called when user turn starts (if supported)
         """
-        print("=" * 80)
-        print("🎤 [USER TURN STARTED] User started their turn")
-        print(f"⏰ Time: {time.time():.2f}")
-        print("=" * 80)
+        logger.debug("[USER] Turn started")
     
     async def on_user_turn_completed(self, turn_ctx, new_message):
         """
@@ -1200,12 +1402,7 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         # IMMEDIATE FEEDBACK: Broadcast thinking state so user knows they were heard
         await self.broadcast_state("thinking")
         
-        print("=" * 80)
-        print("🎤 [USER TURN COMPLETED] User finished speaking")
-        print(f"⏰ Time: {time.time():.2f}")
-        print(f"📝 Transcript: '{user_text}'")
-        print(f"📊 Turn counter: {self._turn_counter}")
-        print("=" * 80)
+        logger.debug("[USER] Turn %d completed", self._turn_counter)
         
         # Check if we should generate incremental summary (non-blocking background task)
         if self._turn_counter % self.SUMMARY_INTERVAL == 0:
@@ -1229,8 +1426,9 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
         if not can_write_for_current_user():
             return
         
-        # Background processing (zero latency) - track task to prevent leaks
-        task = asyncio.create_task(self._process_background(user_text))
+        # Background processing (zero latency) - track task to prevent leaks,
+        # bounded by the process-wide background slots for backpressure
+        task = asyncio.create_task(self._process_background_bounded(user_text))
         self._background_tasks.add(task)
         task.add_done_callback(self._background_tasks.discard)
     
@@ -1463,11 +1661,23 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
     
     async def cleanup(self):
         """Cleanup background tasks on shutdown"""
+        # Don't drop messages still waiting for the debounced profile update: let a
+        # pending or running flush finish (cancelling it mid-call would lose the
+        # messages it took), then flush whatever arrived after it
+        if self._profile_flush_task and not self._profile_flush_task.done():
+            self._profile_flush_now.set()
+            await asyncio.wait({self._profile_flush_task})
+        await self._flush_profile_updates()
+        
         if self._background_tasks:
             print(f"[CLEANUP] Waiting for {len(self._background_tasks)} background tasks...")
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
             print(f"[CLEANUP] ✓ All background tasks completed")
     
+    async def _process_background_bounded(self, user_text: str):
+        async with _background_slots:
+            await self._process_background(user_text)
+    
     async def _process_background(self, user_text: str):
         """Background processing - index in RAG, update profile, and track conversation context (LLM handles memory storage via tools)"""
         try:
@@ -1487,20 +1697,83 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
             # OPTIMIZATION: Profile is already in initial chat context (loaded at startup)
             # Only fetch here if we need to UPDATE it (meaningful messages >20 chars)
             # This saves unnecessary Redis/DB calls on every turn
+            # The profile only changes when this session saves it, so it's read once and
+            # then served from the versioned in-process copy
             existing_profile = None
-            
-            # Update profile only on meaningful messages (>20 chars)
             if len(user_text.strip()) > 20:
-                # Fetch profile only when we need to update it
-                existing_profile = await self.profile_service.get_profile_async(user_id)
-                print(f"[PROFILE] 📥 Fetched existing profile: {len(existing_profile) if existing_profile else 0} chars")
-                
-                generated_profile = await asyncio.to_thread(
-                    self.profile_service.generate_profile,
-                    user_text,
-                    existing_profile
-                )
-                print(f"[PROFILE] 🤖 Generated profile: {len(generated_profile) if generated_profile else 0} chars")
+                cached = self._profile_cache
+                if cached and cached[0] == self._profile_version:
+                    existing_profile = cached[1]
+                else:
+                    version = self._profile_version  # a save landing mid-fetch wins
+                    existing_profile = await self.profile_service.get_profile_async(user_id)
+                    self._profile_cache = (version, existing_profile)
+                    print(f"[PROFILE] 📥 Fetched existing profile: {len(existing_profile) if existing_profile else 0} chars")
+            
+            # Profile update (LLM) and conversation state update (LLM) are independent -
+            # run them concurrently so the turn costs max(t1, t2) rather than t1 + t2.
+            # Each handles its own errors, so one failing never cancels the other.
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._update_profile(user_id, user_text, existing_profile))
+                tg.create_task(self._update_conversation_state(user_id, user_text, existing_profile))
+            
+            logging.info(f"[BACKGROUND] ✅ Complete")
+            
+        except Exception as e:
+            logging.error(f"[BACKGROUND ERROR] {e}")
+    
+    async def _update_profile(self, user_id: str, user_text: str, existing_profile: Optional[str]):
+        """Queue a meaningful message (>20 chars) for the next debounced profile regeneration"""
+        if len(user_text.strip()) <= 20:
+            logging.info(f"[PROFILE] ⏭️  Skipped update (message too short: {len(user_text)} chars)")
+            print(f"[PROFILE] ⏭️  Message too short ({len(user_text)} chars) - no profile update")
+            return
+        if not mentions_profile_details(user_text):
+            print(f"[PROFILE] ⏭️  No profile-relevant details - no profile update")
+            return
+        
+        self._pending_profile_inputs.append(user_text)
+        self._pending_profile_user = user_id
+        self._latest_profile = existing_profile
+        
+        if self._profile_flush_task is None or self._profile_flush_task.done():
+            self._profile_flush_now = asyncio.Event()
+            self._profile_flush_task = asyncio.create_task(self._flush_profile_after_delay())
+            self._background_tasks.add(self._profile_flush_task)
+            self._profile_flush_task.add_done_callback(self._background_tasks.discard)
+        
+        # A full queue ends the debounce wait early; the flush itself stays in the
+        # background so this turn never waits on the profile LLM
+        if len(self._pending_profile_inputs) >= PROFILE_DEBOUNCE_TURNS:
+            self._profile_flush_now.set()
+        else:
+            print(f"[PROFILE] ⏳ Queued for profile update ({len(self._pending_profile_inputs)}/{PROFILE_DEBOUNCE_TURNS})")
+    
+    async def _flush_profile_after_delay(self):
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._profile_flush_now.wait(), timeout=PROFILE_DEBOUNCE_S)
+        await self._flush_profile_updates()
+    
+    async def _flush_profile_updates(self):
+        """Regenerate the profile once from all queued messages and save real changes"""
+        async with self._profile_lock:
+            if not self._pending_profile_inputs:
+                return
+            pending, self._pending_profile_inputs = self._pending_profile_inputs, []
+            user_id = self._pending_profile_user
+            existing_profile = self._latest_profile
+        
+            try:
+                try:
+                    generated_profile = await self.profile_service.generate_profile_async(
+                        "\n".join(pending),
+                        existing_profile
+                    )
+                except asyncio.CancelledError:
+                    # Put the taken messages back so a later flush still sees them
+                    self._pending_profile_inputs[:0] = pending
+                    raise
+                print(f"[PROFILE] 🤖 Generated profile from {len(pending)} message(s): {len(generated_profile) if generated_profile else 0} chars")
                 
                 # Only save if profile changed by more than 10 chars (avoid micro-updates)
                 if generated_profile and generated_profile != existing_profile:
@@ -1511,6 +1784,7 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
                         print(f"[PROFILE] 💾 Saving updated profile to DB...")
                         save_result = await self.profile_service.save_profile_async(generated_profile, user_id)
                         if save_result:
+                            self._profile_saved(generated_profile)
                             logging.info(f"[PROFILE] ✅ Updated ({len(generated_profile)} chars)")
                             print(f"[PROFILE] ✅ Successfully saved to Supabase + Redis")
                         else:
@@ -1521,32 +1795,72 @@ Assistant is **female** in first person (میں گئی/میں خوش ہوں/می
                         print(f"[PROFILE] ⏭️  Minor change ({char_diff} chars) - not saving")
                 else:
                     print(f"[PROFILE] ℹ️  Profile unchanged - no save needed")
-            else:
-                logging.info(f"[PROFILE] ⏭️  Skipped update (message too short: {len(user_text)} chars)")
-                print(f"[PROFILE] ⏭️  Message too short ({len(user_text)} chars) - no profile update")
-            
-            # Update conversation state automatically
-            # State updates can work with cached profile or None (service handles it)
-            try:
-                state_update_result = await self.conversation_state_service.auto_update_from_interaction(
-                    user_input=user_text,
-                    user_profile=existing_profile or "",  # Use fetched profile or empty
-                    user_id=user_id
-                )
-                
-                if state_update_result.get("action_taken") != "none":
-                    logging.info(f"[STATE] ✅ Updated: {state_update_result['action_taken']}")
-                    if state_update_result.get("action_taken") == "stage_transition":
-                        old_stage = state_update_result["old_state"]["stage"]
-                        new_stage = state_update_result["new_state"]["stage"]
-                        logging.info(f"[STATE] 🎯 Stage transition: {old_stage} → {new_stage}")
             except Exception as e:
-                logging.error(f"[STATE] Background update failed: {e}")
-            
-            logging.info(f"[BACKGROUND] ✅ Complete")
+                logging.error(f"[PROFILE] Background update failed: {e}")
+    
+    async def _update_conversation_state(self, user_id: str, user_text: str, existing_profile: Optional[str]):
+        """Update conversation state automatically from this interaction"""
+        # State updates can work with cached profile or None (service handles it)
+        try:
+            state_update_result = await self.conversation_state_service.auto_update_from_interaction(
+                user_input=user_text,
+                user_profile=existing_profile or "",  # Use fetched profile or empty
+                user_id=user_id
+            )
             
+            if state_update_result.get("action_taken") != "none":
+                self._context_version += 1
+                logging.info(f"[STATE] ✅ Updated: {state_update_result['action_taken']}")
+                if state_update_result.get("action_taken") == "stage_transition":
+                    old_stage = state_update_result["old_state"]["stage"]
+                    new_stage = state_update_result["new_state"]["stage"]
+                    logging.info(f"[STATE] 🎯 Stage transition: {old_stage} → {new_stage}")
         except Exception as e:
-            logging.error(f"[BACKGROUND ERROR] {e}")
+            logging.error(f"[STATE] Background update failed: {e}")
+
+
+# ---------------------------
+# Process Prewarm
+# ---------------------------
+@lru_cache(maxsize=1)
+def load_vad():
+    """Load the Silero VAD model with the agent's tuning (once per process; weights are read-only)"""
+    # Imported here so only processes that actually run sessions pay for it
+    from livekit.plugins import silero
+    
+    # LiveKit Best Practice: Optimize VAD for real-world conditions
+    # Lower activation threshold = more sensitive (might pick up background noise)
+    # Higher activation threshold = less sensitive (might miss quiet speech)
+    return silero.VAD.load(
+        min_silence_duration=0.5,      # Time to wait before considering speech ended
+        activation_threshold=0.3,      # Lower = more sensitive (detects quieter speech)
+        min_speech_duration=0.1,       # Minimum speech duration to trigger (100ms)
+    )
+
+
+def prewarm(proc: agents.JobProcess):
+    """Load the VAD model and the database clients once per worker process, before any job is assigned"""
+    global supabase
+    proc.userdata["vad"] = load_vad()
+    print("[PREWARM] ✅ VAD model loaded")
+    
+    # Supabase's client is synchronous, so it (and the batcher wrapping it) can be built
+    # here; it's the same shared client the connection pool hands out, so every session
+    # in this process reuses it instead of constructing its own
+    if supabase is None and Config.SUPABASE_URL and _SUPABASE_KEY:
+        try:
+            supabase = get_shared_supabase_client(Config.SUPABASE_URL, _SUPABASE_KEY)
+            set_supabase_client(supabase)
+        except Exception as e:
+            print(f"[PREWARM] ⚠️ Supabase client creation failed (will retry per session): {e}")
+    proc.userdata["batcher"] = init_db_batcher(supabase)
+    print("[PREWARM] ✅ Database batcher ready")
+    
+    # Embeddings run remotely (OpenAI), so there is no local model to preload; create the
+    # shared embeddings client now so the first session's RAG load doesn't pay for it
+    if Config.OPENAI_API_KEY:
+        from rag_system import get_openai_client
+        get_openai_client(Config.OPENAI_API_KEY)
 
 
 # ---------------------------
@@ -1556,7 +1870,48 @@ async def entrypoint(ctx: agents.JobContext):
     """
     LiveKit agent entrypoint - simplified pattern
     """
+    # Background tasks spawned by this job; cancelled however the job ends
+    # (including failures before the session starts), never shared with the next job
+    bg_tasks: set = set()
+    try:
+        await _run_session(ctx, bg_tasks)
+    finally:
+        pending = [t for t in bg_tasks if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(f"[ENTRYPOINT] ✓ Cancelled {len(pending)} background tasks")
+
+
+async def _run_session(ctx: agents.JobContext, bg_tasks: set):
+    """
+    Body of the entrypoint: set up the room and session and run until the
+    participant leaves.
+    
+    Args:
+        ctx: LiveKit job context
+        bg_tasks: Set that spawned background tasks are tracked in
+    """
+    # Run tasks inline up to their first await so coroutines that finish without
+    # suspending (cache hits, early returns) never take a scheduler hop. Installed
+    # before any task is created, and only if nothing else owns the task factory.
+    # (eager_task_factory is Python 3.12+; older interpreters keep the default factory)
+    loop = asyncio.get_running_loop()
+    if hasattr(asyncio, "eager_task_factory") and loop.get_task_factory() is None:
+        loop.set_task_factory(asyncio.eager_task_factory)
+    # Supabase calls still go through asyncio.to_thread; size the default executor
+    # for concurrent sessions once per process (the stock pool caps at cpu+4 threads)
+    if not ctx.proc.userdata.get("executor"):
+        ctx.proc.userdata["executor"] = ThreadPoolExecutor(
+            max_workers=min(64, (os.cpu_count() or 1) * 8), thread_name_prefix="agent-io"
+        )
+        loop.set_default_executor(ctx.proc.userdata["executor"])
+
     import time
+    # Provider plugins are imported here rather than at module top so the worker
+    # supervisor and freshly forked processes don't pay their import cost up front
+    from livekit.plugins import openai as lk_openai
     start_time = time.time()
     
     print("=" * 80)
@@ -1566,31 +1921,48 @@ async def entrypoint(ctx: agents.JobContext):
     print("=" * 80)
     print(f"[TIMER] ⏱️  Start time: 0.00s")
 
-    # Initialize infrastructure
-    try:
-        await get_connection_pool()
-        print("[ENTRYPOINT] ✓ Connection pool initialized")
-    except Exception as e:
-        print(f"[ENTRYPOINT] Warning: Connection pool initialization failed: {e}")
+    def spawn_background(coro):
+        task = asyncio.create_task(coro)
+        bg_tasks.add(task)
+        task.add_done_callback(bg_tasks.discard)
+        return task
+
+    async def init_database():
+        # Connection pool -> Supabase client -> batcher (the batcher needs the client).
+        # The client and batcher normally already exist from prewarm.
+        await ensure_supabase()
+        if get_connection_pool_sync() is not None:
+            print("[ENTRYPOINT] ✓ Connection pool initialized")
+        batcher = ctx.proc.userdata.get("batcher")
+        if batcher is not None and batcher.supabase is not None:
+            return batcher
+        return await get_db_batcher(supabase)
+    
+    # Initialize infrastructure and connect to the room concurrently -
+    # none of these depend on each other
+    print("[ENTRYPOINT] Connecting to LiveKit room...")
+    batcher_result, redis_result, connect_result = await asyncio.gather(
+        init_database(),
+        get_redis_cache(),
+        ctx.connect(),
+        return_exceptions=True,
+    )
     
-    try:
-        redis_cache = await get_redis_cache()
-        if redis_cache.enabled:
-            print("[ENTRYPOINT] ✓ Redis cache initialized")
-    except Exception as e:
-        print(f"[ENTRYPOINT] Warning: Redis cache initialization failed: {e}")
+    if isinstance(redis_result, Exception):
+        print(f"[ENTRYPOINT] Warning: Redis cache initialization failed: {redis_result}")
+    elif redis_result.enabled:
+        print("[ENTRYPOINT] ✓ Redis cache initialized")
     
-    try:
-        batcher = await get_db_batcher(supabase)
+    if isinstance(batcher_result, Exception):
+        print(f"[ENTRYPOINT] Warning: Database batcher initialization failed: {batcher_result}")
+    else:
         print("[ENTRYPOINT] ✓ Database batcher initialized")
-    except Exception as e:
-        print(f"[ENTRYPOINT] Warning: Database batcher initialization failed: {e}")
     
     print(f"[TIMER] ⏱️  Infrastructure ready: {time.time() - start_time:.2f}s")
 
-    # CRITICAL: Connect to the room first
-    print("[ENTRYPOINT] Connecting to LiveKit room...")
-    await ctx.connect()
+    # CRITICAL: The room connection is required for everything that follows
+    if isinstance(connect_result, BaseException):
+        raise connect_result
     print("[ENTRYPOINT] ✓ Connected to room")
     print(f"[TIMER] ⏱️  Room connected: {time.time() - start_time:.2f}s")
 
@@ -1609,24 +1981,31 @@ async def entrypoint(ctx: agents.JobContext):
         print("[TTS] ⚠️ WARNING: UPLIFTAI_API_KEY not set! TTS will fail!")
         print("[TTS] 💡 Set UPLIFTAI_API_KEY environment variable")
     
-    try:
-        tts = TTS(voice_id="v_8eelc901", output_format="MP3_22050_32")
-        print("[TTS] ✓ TTS instance created successfully")
-    except Exception as e:
-        print(f"[TTS] ❌ TTS initialization failed: {e}")
-        print("[TTS] 🔄 Attempting fallback TTS configuration...")
-        # Fallback with explicit parameters
+    # Like STT/LLM below, one TTS per process: sessions share its websocket instead of
+    # each opening (and never closing) their own
+    tts = ctx.proc.userdata.get("tts")
+    if tts is None:
         try:
-            tts = TTS(
-                voice_id="v_8eelc901", 
-                output_format="MP3_22050_32",
-                base_url=uplift_base_url,
-                api_key=uplift_api_key
-            )
-            print("[TTS] ✓ Fallback TTS created successfully")
-        except Exception as e2:
-            print(f"[TTS] ❌ Fallback TTS also failed: {e2}")
-            raise e2
+            tts = TTS(voice_id="v_8eelc901", output_format="MP3_22050_32")
+            print("[TTS] ✓ TTS instance created successfully")
+        except Exception as e:
+            print(f"[TTS] ❌ TTS initialization failed: {e}")
+            print("[TTS] 🔄 Attempting fallback TTS configuration...")
+            # Fallback with explicit parameters
+            try:
+                tts = TTS(
+                    voice_id="v_8eelc901", 
+                    output_format="MP3_22050_32",
+                    base_url=uplift_base_url,
+                    api_key=uplift_api_key
+                )
+                print("[TTS] ✓ Fallback TTS created successfully")
+            except Exception as e2:
+                print(f"[TTS] ❌ Fallback TTS also failed: {e2}")
+                raise e2
+        ctx.proc.userdata["tts"] = tts
+    else:
+        print("[TTS] ✓ Reusing process TTS instance")
     
     # BEST PRACTICE: Wait for participant FIRST (more reliable)
     # This ensures participant is in room before session initialization
@@ -1641,23 +2020,23 @@ async def entrypoint(ctx: agents.JobContext):
     print(f"[TIMER] ⏱️  Participant joined: {time.time() - start_time:.2f}s")
     
     # Extract user_id early to load context
-    print(f"[DEBUG][IDENTITY] Extracting user_id from identity: '{participant.identity}'")
+    logger.debug("[IDENTITY] Extracting user_id from identity: '%s'", participant.identity)
     user_id = extract_uuid_from_identity(participant.identity)
     
     if user_id:
-        print(f"[DEBUG][USER_ID] ✅ Successfully extracted user_id: {UserId.format_for_display(user_id)}")
+        logger.debug("[USER_ID] ✅ Successfully extracted user_id: %s", UserId.format_for_display(user_id))
     else:
-        print(f"[DEBUG][USER_ID] ❌ Failed to extract user_id from '{participant.identity}'")
+        logger.warning("[USER_ID] ❌ Failed to extract user_id from '%s'", participant.identity)
         
         # Use test user ID if configured (for development/testing)
         if Config.USE_TEST_USER and Config.TEST_USER_ID:
             user_id = Config.TEST_USER_ID
-            print(f"[DEBUG][USER_ID] 🧪 Using TEST_USER_ID: {UserId.format_for_display(user_id)}")
-            print(f"[DEBUG][USER_ID] → Set USE_TEST_USER=false to disable test mode")
+            logger.warning("[USER_ID] 🧪 Using TEST_USER_ID: %s", UserId.format_for_display(user_id))
+            logger.debug("[USER_ID] → Set USE_TEST_USER=false to disable test mode")
         else:
-            print(f"[DEBUG][USER_ID] → No user data will be available")
-            print(f"[DEBUG][USER_ID] → Expected format: 'user-<uuid>' or '<uuid>'")
-            print(f"[DEBUG][USER_ID] → To enable test mode: set USE_TEST_USER=true")
+            logger.warning("[USER_ID] → No user data will be available")
+            logger.debug("[USER_ID] → Expected format: 'user-<uuid>' or '<uuid>'")
+            logger.debug("[USER_ID] → To enable test mode: set USE_TEST_USER=true")
     
     # STEP 1: Create initial ChatContext
     initial_ctx = ChatContext()
@@ -1666,33 +2045,44 @@ async def entrypoint(ctx: agents.JobContext):
     user_gender = None  # Initialize gender
     user_time_context = None  # Initialize time context
     user_name = None  # Initialize name for greeting
+    last_summary = None  # Last conversation summary (also drives the AI greeting)
     
     if user_id:
         set_current_user_id(user_id)
-        print(f"[DEBUG][USER_ID] ✅ Set current user_id to: {user_id}")
+        logger.debug("[USER_ID] ✅ Set current user_id to: %s", user_id)
+        
+        # The last summary doesn't depend on anything below - start it now so it
+        # loads while onboarding, profile and memories are being prepared
+        summary_service = ConversationSummaryService(supabase)
+        summary_task = spawn_background(summary_service.get_last_summary(user_id))
         
         try:
             # OPTIMIZED: Combined profile check + initialization (single operation)
             # This replaces: ensure_profile_exists + initialize_user_from_onboarding
             # initialize_user_from_onboarding already ensures profile exists internally
-            try:
-                logging.info(f"[ONBOARDING] Initializing user {UserId.format_for_display(user_id)} from onboarding data...")
-                onboarding_service_tmp = OnboardingService(supabase)
-                await onboarding_service_tmp.initialize_user_from_onboarding(user_id)
-                logging.info("[ONBOARDING] ✓ User initialization complete (profile + memories created)")
-                print(f"[PROFILE] ✅ Profile ready for {UserId.format_for_display(user_id)}")
-            except Exception as e:
-                logging.error(f"[ONBOARDING] ⚠️ Failed to initialize user from onboarding: {e}", exc_info=True)
-                print(f"[PROFILE] ⚠️ Initialization warning: {e}")
+            async def initialize_from_onboarding():
+                try:
+                    logging.info(f"[ONBOARDING] Initializing user {UserId.format_for_display(user_id)} from onboarding data...")
+                    onboarding_service_tmp = OnboardingService(supabase)
+                    await onboarding_service_tmp.initialize_user_from_onboarding(user_id)
+                    logging.info("[ONBOARDING] ✓ User initialization complete (profile + memories created)")
+                    print(f"[PROFILE] ✅ Profile ready for {UserId.format_for_display(user_id)}")
+                except Exception as e:
+                    logging.error(f"[ONBOARDING] ⚠️ Failed to initialize user from onboarding: {e}", exc_info=True)
+                    print(f"[PROFILE] ⚠️ Initialization warning: {e}")
             
-            # Load gender AND name from onboarding_details table (single query)
+            # Load gender AND name from onboarding_details table (single query),
+            # concurrently with the onboarding initialization (both only read onboarding_details)
             print(f"[CONTEXT] 🔍 Fetching user data from onboarding_details...")
-            onboarding_result = await asyncio.to_thread(
-                lambda: supabase.table("onboarding_details")
-                .select("gender, full_name")
-                .eq("user_id", user_id)
-                .limit(1)
-                .execute()
+            _, onboarding_result = await asyncio.gather(
+                initialize_from_onboarding(),
+                asyncio.to_thread(
+                    lambda: supabase.table("onboarding_details")
+                    .select("gender, full_name")
+                    .eq("user_id", user_id)
+                    .limit(1)
+                    .execute()
+                )
             )
             
             user_name = None
@@ -1746,38 +2136,41 @@ async def entrypoint(ctx: agents.JobContext):
             memory_service = MemoryService(supabase)
             
             # OPTIMIZED: Load profile once, create if missing (single call path)
-            profile = None
-            try:
-                # First try to get existing profile
-                profile = await profile_service.get_profile_async(user_id)
-                
-                # If empty/missing, create from onboarding (this will also cache it)
-                if not profile or not profile.strip():
-                    await profile_service.create_profile_from_onboarding_async(user_id)
+            async def load_profile() -> Optional[str]:
+                try:
+                    # First try to get existing profile
                     profile = await profile_service.get_profile_async(user_id)
-                    print(f"[PROFILE] ✓ Profile created and loaded ({len(profile) if profile else 0} chars)")
-                else:
-                    print(f"[PROFILE] ✓ Profile loaded from cache/DB ({len(profile)} chars)")
-            except Exception as e:
-                print(f"[PROFILE] ⚠️ Failed to load profile: {e}")
-                profile = None
+                    
+                    # If empty/missing, create from onboarding (this will also cache it)
+                    if not profile or not profile.strip():
+                        await profile_service.create_profile_from_onboarding_async(user_id)
+                        profile = await profile_service.get_profile_async(user_id)
+                        print(f"[PROFILE] ✓ Profile created and loaded ({len(profile) if profile else 0} chars)")
+                    else:
+                        print(f"[PROFILE] ✓ Profile loaded from cache/DB ({len(profile)} chars)")
+                    return profile
+                except Exception as e:
+                    print(f"[PROFILE] ⚠️ Failed to load profile: {e}")
+                    return None
             
             # OPTIMIZED: Load memories from key categories with priority order (async to prevent blocking)
             # FACT first (name, gender, location), then preferences, goals, etc.
-            categories = ['FACT', 'PREFERENCE', 'GOAL', 'INTEREST', 'RELATIONSHIP', 'PLAN']
-            recent_memories = await asyncio.to_thread(
-                memory_service.get_memories_by_categories_batch,
-                categories=categories,
-                limit_per_category=5,  # Increased from 3 to 5 for better context
-                user_id=user_id
+            # The formatted block is cached in Redis until the user's next memory write.
+            # Profile and memories are independent - load them concurrently.
+            profile, (memory_sections, memory_count) = await asyncio.gather(
+                load_profile(),
+                memory_service.get_memory_block_async(
+                    user_id,
+                    CONTEXT_MEMORY_CATEGORIES,
+                    limit_per_category=5  # Increased from 3 to 5 for better context
+                )
             )
             
             # Build optimized initial context message with better structure
             context_parts = []
             
-            # STEP 1: Load last conversation summary (if exists)
-            summary_service = ConversationSummaryService(supabase)
-            last_summary = await summary_service.get_last_summary(user_id)
+            # STEP 1: Load last conversation summary (if exists) - started above
+            last_summary = await summary_task
             
             if last_summary:
                 formatted_summary = summary_service.format_summary_for_context(last_summary)
@@ -1791,21 +2184,9 @@ async def entrypoint(ctx: agents.JobContext):
                 print(f"[CONTEXT]   ✓ Profile loaded ({len(profile)} chars)")
             
             # STEP 3: Add memories by category with clear structure
-            memory_count = 0
-            for category, mems in recent_memories.items():
-                if mems:
-                    # Create readable memory strings
-                    mem_strings = []
-                    for mem in mems[:5]:  # Limit to 5 per category
-                        key = mem.get('key', 'unknown')
-                        value = mem.get('value', '')
-                        if value:
-                            mem_strings.append(f"- {value}")
-                            memory_count += 1
-                    
-                    if mem_strings:
-                        context_parts.append(f"## {category}\n" + "\n".join(mem_strings))
-                        print(f"[CONTEXT]   ✓ {category}: {len(mem_strings)} memories")
+            context_parts.extend(memory_sections)
+            if memory_sections:
+                print(f"[CONTEXT]   ✓ {memory_count} memories across {len(memory_sections)} categories")
             
             if context_parts:
                 # Add as assistant message (internal context, not shown to user)
@@ -1814,7 +2195,7 @@ async def entrypoint(ctx: agents.JobContext):
                     role="assistant",
                     content=context_message
                 )
-                print(f"[CONTEXT] ✅ Loaded profile + {memory_count} memories across {len(recent_memories)} categories")
+                print(f"[CONTEXT] ✅ Loaded profile + {memory_count} memories across {len(memory_sections)} categories")
             else:
                 print("[CONTEXT] ℹ️  No existing user data found, starting fresh")
         except Exception as e:
@@ -1827,6 +2208,115 @@ async def entrypoint(ctx: agents.JobContext):
     
     print(f"[TIMER] ⏱️  Context loaded: {time.time() - start_time:.2f}s")
     
+    # Start the AI greeting now so the LLM call overlaps session/RAG start-up
+    # instead of running after it. It only needs name, gender and last summary.
+    async def generate_ai_greeting() -> Optional[str]:
+        """Personalized first greeting from the last conversation summary (None = use default)"""
+        try:
+            if last_summary and last_summary.get('last_conversation_at'):
+                from datetime import datetime, timezone
+                
+                # Calculate time since last conversation
+                last_convo = last_summary.get('last_conversation_at')
+                last_time = datetime.fromisoformat(last_convo.replace('Z', '+00:00'))
+                now = datetime.now(timezone.utc)
+                delta = now - last_time
+                
+                days = delta.days
+                hours = delta.seconds // 3600
+                
+                # Determine time context
+                if days == 0 and hours < 4:
+                    time_context = "a few hours ago"
+                    recency = "very recent"
+                elif days == 0:
+                    time_context = "earlier today"
+                    recency = "recent"
+                elif days == 1:
+                    time_context = "yesterday"
+                    recency = "recent"
+                elif days < 7:
+                    time_context = f"{days} days ago"
+                    recency = "few days"
+                else:
+                    time_context = f"over a week ago"
+                    recency = "long time"
+                
+                # Extract first name and prepare all context variables
+                first_name = user_name.split()[0] if user_name else 'User'
+                summary_text = last_summary.get('last_summary', 'None')[:250]
+                topics_list = last_summary.get('last_topics', [])[:5]
+                topics_str = ', '.join(topics_list) if topics_list else '[]'
+                
+                # Calculate user's local time (Pakistan timezone)
+                import pytz
+                from datetime import datetime as dt
+                user_tz = pytz.timezone('Asia/Karachi')
+                local_datetime = dt.now(user_tz)
+                local_time = local_datetime.strftime('%H:%M')
+                weekday = local_datetime.strftime('%A')
+                current_hour = local_datetime.hour
+                
+                # Determine time of day
+                if 5 <= current_hour < 12:
+                    time_of_day = 'morning'
+                elif 12 <= current_hour < 17:
+                    time_of_day = 'afternoon'
+                elif 17 <= current_hour < 21:
+                    time_of_day = 'evening'
+                else:
+                    time_of_day = 'night'
+                
+                # Format relative time (last_seen_relative)
+                last_seen_relative = time_context
+                
+                # Gender was already loaded from onboarding_details with the context
+                user_gender_value = user_gender or 'unknown'
+                
+                # Generate personalized greeting using OpenAI
+                print(f"[GREETING] Generating AI greeting (last chat: {time_context})")
+                
+                # Reuse the pooled client instead of building one per session
+                pool = get_connection_pool_sync() or await get_connection_pool()
+                openai_client = pool.get_openai_client()
+                
+                prompt = _GREETING_PROMPT_TEMPLATE.format(
+                    days=days,
+                    first_name=first_name,
+                    hours=hours,
+                    last_seen_relative=last_seen_relative,
+                    local_time=local_time,
+                    summary_text=summary_text,
+                    time_of_day=time_of_day,
+                    topics_str=topics_str,
+                    user_gender_value=user_gender_value,
+                    weekday=weekday,
+                )
+
+                response = await asyncio.wait_for(
+                    asyncio.to_thread(
+                        openai_client.chat.completions.create,
+                        model="gpt-4o-mini",
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.4,
+                        max_tokens=100,
+                        timeout=GREETING_TIMEOUT_S,
+                    ),
+                    timeout=GREETING_TIMEOUT_S,
+                )
+                
+                greeting_text = response.choices[0].message.content.strip()
+                print(f"[GREETING] AI-generated: {greeting_text}")
+                return greeting_text
+        
+        except asyncio.TimeoutError:
+            print(f"[GREETING] ⚠️ AI greeting timed out after {GREETING_TIMEOUT_S}s, using default")
+        except Exception as e:
+            print(f"[GREETING] ⚠️ AI greeting failed, using default: {e}")
+        return None
+
+    greeting_task = spawn_background(generate_ai_greeting()) if user_id else None
+    
     # STEP 3: Create assistant WITH context, gender, and time
     print(f"[AGENT CREATE] Creating Assistant with:")
     print(f"[AGENT CREATE]   - ChatContext: {'Provided' if initial_ctx else 'Empty'}")
@@ -1843,10 +2333,17 @@ async def entrypoint(ctx: agents.JobContext):
     # NOTE: Conversation context (initial_ctx with user profile + memories) is passed to
     # the Agent class (line 403: super().__init__(chat_ctx=chat_ctx)), and LiveKit's
     # framework manages it automatically. No need to pass to LLM or AgentSession.
-    llm = lk_openai.LLM(
-        model="gpt-4o-mini",
-        temperature=0.8,  # More creative responses
-    )
+    # STT/LLM/VAD are stateless between sessions - build once per process and reuse
+    llm = ctx.proc.userdata.get("llm")
+    if llm is None:
+        llm = ctx.proc.userdata["llm"] = lk_openai.LLM(
+            model="gpt-4o-mini",
+            temperature=0.8,  # More creative responses
+        )
+    stt = ctx.proc.userdata.get("stt")
+    if stt is None:
+        stt = ctx.proc.userdata["stt"] = lk_openai.STT(model="gpt-4o-transcribe", language="ur")
+    vad = ctx.proc.userdata.get("vad") or load_vad()
     
     # Pre-warm TTS connection in background (non-blocking)
     print("[TTS] 🔥 Pre-warming TTS connection...")
@@ -1860,27 +2357,35 @@ async def entrypoint(ctx: agents.JobContext):
             print(f"[TTS] ⚠️ Pre-warm failed (will retry on actual use): {e}")
     
     # Start TTS warm-up in background
-    asyncio.create_task(warm_tts())
+    spawn_background(warm_tts())
     
-    # LiveKit Best Practice: Optimize VAD for real-world conditions
-    # Lower activation threshold = more sensitive (might pick up background noise)
-    # Higher activation threshold = less sensitive (might miss quiet speech)
     # Conversation context is managed by the Agent framework (passed to Assistant's parent
     # Agent class). AgentSession just needs the LLM, STT, TTS, and VAD components.
     session = AgentSession(
-        stt=lk_openai.STT(model="gpt-4o-transcribe", language="ur"),
+        stt=stt,
         llm=llm,
         tts=tts,
-        vad=silero.VAD.load(
-            min_silence_duration=0.5,      # Time to wait before considering speech ended
-            activation_threshold=0.3,      # Lower = more sensitive (detects quieter speech)
-            min_speech_duration=0.1,       # Minimum speech duration to trigger (100ms)
-        ),
+        vad=vad,
     )
 
     # PATCH: Store session reference in assistant for history management
     assistant.set_session(session)
     
+    # Audio readiness: set once the participant's microphone track is subscribed.
+    # Registered before session.start so a subscription during start-up isn't missed.
+    audio_ready = asyncio.Event()
+    
+    def on_audio_subscribed(track: rtc.Track, publication: rtc.TrackPublication, participant_obj: rtc.RemoteParticipant):
+        if participant_obj.sid == participant.sid and publication.kind == rtc.TrackKind.KIND_AUDIO:
+            audio_ready.set()
+    
+    ctx.room.on("track_subscribed", on_audio_subscribed)
+    if any(
+        pub.kind == rtc.TrackKind.KIND_AUDIO and pub.track is not None
+        for pub in participant.track_publications.values()
+    ):
+        audio_ready.set()
+    
     # Start session with RoomInputOptions (best practice)
     print(f"[SESSION INIT] Starting LiveKit session...")
     print(f"[SESSION INIT] ChatContext prepared with user profile + memories")
@@ -1892,26 +2397,28 @@ async def entrypoint(ctx: agents.JobContext):
     )
     print(f"[SESSION INIT] ✓ Session started successfully")
     
-    # Wait for session to fully initialize
-    await asyncio.sleep(0.5)
-    print("[SESSION INIT] ✓ Session initialization complete")
-    print(f"[TIMER] ⏱️  Session ready: {time.time() - start_time:.2f}s")
+    # Give the session a moment to fully initialize before the greeting - as a
+    # timer, so RAG/summary setup and the audio wait below overlap it
+    session_settled = asyncio.create_task(asyncio.sleep(0.5))
+    print(f"[TIMER] ⏱️  Session started: {time.time() - start_time:.2f}s")
 
     # Check if we have a valid user (already extracted and set earlier)
     if not user_id:
         print("[ENTRYPOINT] No valid user_id - sending generic greeting...")
+        ctx.room.off("track_subscribed", on_audio_subscribed)
+        await session_settled
         await assistant.generate_greeting(session)
         return
     
     # User_id already set earlier, just verify
     print(f"[SESSION] 👤 User ID: {UserId.format_for_display(user_id)}...")
-    print(f"[DEBUG][USER_ID] Verification - get_current_user_id(): {get_current_user_id()}")
+    logger.debug("[USER_ID] Verification - get_current_user_id(): %s", get_current_user_id())
     
     # OPTIMIZATION: Initialize RAG and load in background (non-blocking)
-    print(f"[RAG] Initializing for user {UserId.format_for_display(user_id)}...")
+    logger.debug("[RAG] Initializing for user %s...", UserId.format_for_display(user_id))
     rag_service = RAGService(user_id)
     assistant.rag_service = rag_service
-    print(f"[RAG] ✅ RAG service attached (will load in background)")
+    logger.debug("[RAG] ✅ RAG service attached (will load in background)")
     
     # Initialize summary service
     summary_service = ConversationSummaryService(supabase)
@@ -1919,36 +2426,77 @@ async def entrypoint(ctx: agents.JobContext):
     assistant.summary_service = summary_service
     print(f"[SUMMARY] ✅ Summary service initialized for session: {ctx.room.name[:20]}...")
     
+    # Set once the greeting has played; speculative RAG work waits for it so the
+    # greeting's LLM/TTS path never competes with it
+    greeting_done = asyncio.Event()
+    
+    async def warmup_rag_after_greeting():
+        """Open the embeddings connection and page in the index before the first searchMemories"""
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(greeting_done.wait(), timeout=GREETING_TIMEOUT_S)
+        try:
+            await rag_service.warmup()
+        except Exception as e:
+            logger.warning("[RAG_BG] ⚠️ Warmup failed: %s", e)
+    
     # Load RAG and prefetch data in parallel background tasks
     # This allows the first greeting to happen immediately
     async def load_rag_background():
         """Load RAG memories in background"""
+        # load_from_database handles query/embedding failures itself; the timeout is
+        # the only expected failure here
         try:
             rag_start = time.time()
-            print(f"[RAG_BG] Loading memories in background...")
+            logger.debug("[RAG_BG] Loading memories in background...")
             await asyncio.wait_for(
                 rag_service.load_from_database(supabase, limit=500),
                 timeout=10.0
             )
             rag_system = rag_service.get_rag_system()
             if rag_system:
-                rag_elapsed = time.time() - rag_start
-                print(f"[RAG_BG] ✅ Loaded {len(rag_system.memories)} memories in {rag_elapsed:.2f}s")
-        except Exception as e:
-            print(f"[RAG_BG] ⚠️ Background load failed: {e}")
+                logger.info("[RAG_BG] ✅ Loaded %d memories in %.2fs", len(rag_system.memories), time.time() - rag_start)
+        except asyncio.TimeoutError:
+            logger.warning("[RAG_BG] ⚠️ Background load timed out after 10s")
+        
+        await warmup_rag_after_greeting()
     
     async def prefetch_background():
         """Prefetch user data in background"""
+        # prefetch_user_data reports query failures by returning partial/empty data
+        batcher = await get_db_batcher(supabase)
+        prefetch_data = await batcher.prefetch_user_data(user_id)
+        logger.info("[BATCH_BG] ✅ Prefetched %d memories in background", prefetch_data.get('memory_count', 0))
+    
+    async def load_user_data_background():
+        """Load RAG memories + prefetch user data, in one round trip when possible"""
+        # fetch_bootstrap_bundle returns None on any RPC failure
+        batcher = await get_db_batcher(supabase)
+        bundle = await batcher.fetch_bootstrap_bundle(user_id, memory_limit=500)
+        
+        if bundle is None:
+            # RPC not available - run the RAG load and the prefetch concurrently. Both
+            # handle their own errors; the TaskGroup ties their lifetime to this task, so
+            # cancelling it at session end cancels both
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(load_rag_background())
+                tg.create_task(prefetch_background())
+            return
+        
+        logger.info("[BATCH_BG] ✅ Prefetched %d memories in background (bundle)", bundle['memory_count'])
         try:
-            batcher = await get_db_batcher(supabase)
-            prefetch_data = await batcher.prefetch_user_data(user_id)
-            print(f"[BATCH_BG] ✅ Prefetched {prefetch_data.get('memory_count', 0)} memories in background")
-        except Exception as e:
-            print(f"[BATCH_BG] ⚠️ Prefetch failed: {e}")
+            rag_start = time.time()
+            await asyncio.wait_for(rag_service.load_from_rows(bundle["memories"]), timeout=10.0)
+            rag_system = rag_service.get_rag_system()
+            if rag_system:
+                logger.info("[RAG_BG] ✅ Loaded %d memories in %.2fs", len(rag_system.memories), time.time() - rag_start)
+        except asyncio.TimeoutError:
+            logger.warning("[RAG_BG] ⚠️ Background load timed out after 10s")
+        
+        await warmup_rag_after_greeting()
     
-    # Start background tasks (don't wait for them)
-    asyncio.create_task(load_rag_background())
-    asyncio.create_task(prefetch_background())
+    # Start background loading (don't wait for it - the greeting never needs the full index;
+    # searchMemories briefly waits on this task if it's still running)
+    assistant.rag_load_task = spawn_background(load_user_data_background())
     print("[OPTIMIZATION] ⚡ RAG and prefetch loading in background (non-blocking)")
 
     if supabase:
@@ -1960,161 +2508,28 @@ async def entrypoint(ctx: agents.JobContext):
     # No need to manually wait - the session's VAD will activate when audio is ready
     print("[AUDIO] ✓ AgentSession managing audio subscription automatically")
     
-    # OPTIMIZATION: Minimal delay to ensure session is ready (LiveKit handles the rest)
-    # Don't wait too long or participant might disconnect
-    await asyncio.sleep(0.3)  # Minimal delay - just enough for session readiness
-    
-    # Generate personalized greeting using OpenAI based on last conversation
-    greeting_msg = None
+    # Wait for the participant's audio track instead of a fixed delay; bounded so a
+    # slow or missing track never holds the greeting back for long
     try:
-        last_summary = await summary_service.get_last_summary(user_id)
-        
-        if last_summary and last_summary.get('last_conversation_at'):
-            from datetime import datetime, timezone
-            from openai import OpenAI
-            
-            # Calculate time since last conversation
-            last_convo = last_summary.get('last_conversation_at')
-            last_time = datetime.fromisoformat(last_convo.replace('Z', '+00:00'))
-            now = datetime.now(timezone.utc)
-            delta = now - last_time
-            
-            days = delta.days
-            hours = delta.seconds // 3600
-            
-            # Determine time context
-            if days == 0 and hours < 4:
-                time_context = "a few hours ago"
-                recency = "very recent"
-            elif days == 0:
-                time_context = "earlier today"
-                recency = "recent"
-            elif days == 1:
-                time_context = "yesterday"
-                recency = "recent"
-            elif days < 7:
-                time_context = f"{days} days ago"
-                recency = "few days"
-            else:
-                time_context = f"over a week ago"
-                recency = "long time"
-            
-            # Extract first name and prepare all context variables
-            first_name = user_name.split()[0] if user_name else 'User'
-            summary_text = last_summary.get('last_summary', 'None')[:250]
-            topics_list = last_summary.get('last_topics', [])[:5]
-            topics_str = ', '.join(topics_list) if topics_list else '[]'
-            
-            # Calculate user's local time (Pakistan timezone)
-            import pytz
-            from datetime import datetime as dt
-            user_tz = pytz.timezone('Asia/Karachi')
-            local_datetime = dt.now(user_tz)
-            local_time = local_datetime.strftime('%H:%M')
-            weekday = local_datetime.strftime('%A')
-            current_hour = local_datetime.hour
-            
-            # Determine time of day
-            if 5 <= current_hour < 12:
-                time_of_day = 'morning'
-            elif 12 <= current_hour < 17:
-                time_of_day = 'afternoon'
-            elif 17 <= current_hour < 21:
-                time_of_day = 'evening'
-            else:
-                time_of_day = 'night'
-            
-            # Format relative time (last_seen_relative)
-            last_seen_relative = time_context
-            
-            # Load user gender from onboarding_details table
-            user_gender_value = 'unknown'
-            try:
-                onboarding_result = await asyncio.to_thread(
-                    lambda: supabase.table("onboarding_details")
-                    .select("gender")
-                    .eq("user_id", user_id)
-                    .limit(1)
-                    .execute()
-                )
-                if onboarding_result and onboarding_result.data:
-                    user_gender_value = onboarding_result.data[0].get("gender", "unknown")
-            except Exception as e:
-                print(f"[GREETING] ⚠️ Could not load gender: {e}")
-            
-            # Generate personalized greeting using OpenAI
-            print(f"[GREETING] Generating AI greeting (last chat: {time_context})")
-            
-            openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
-            
-            prompt = f"""Generate the FIRST greeting for a returning user. 
-DECIDE: (A) Follow up on last conversation  OR  (B) Fresh open-ended start.
-
-You are Humraaz, a warm, witty, strictly platonic female friend who speaks Urdu only.
-
-[User Info]
-- First name: {first_name}     # Use only the first name in greeting; never full name.
-- Local time now: {local_time} ({time_of_day}; {weekday})
-- Last chat: {last_seen_relative}  ({days} days, {hours} hours ago)
-- User gender (for addressing): {user_gender_value}
-
-[Context Inputs]
-- Last summary (<= 250 chars): {summary_text}
-- Last topics (up to 5): {topics_str}
-
-[Decision Heuristics]
-Choose FOLLOW-UP if ALL are true:
-  • recency ≤ 12 hours  OR  (recency ≤ 14 days AND current message domain ≈ last_topics)
-  • last summary contains a goal/concern or an ongoing item (e.g., sleep, review, trip, health, exam)
-  • not sensitive unless user-led (health/finances/relationships)
-Otherwise choose FRESH.
-
-[Safety & Non-creepy Rules]
-- Use at most ONE soft callback clause (≤ 12–16 Urdu tokens) if FOLLOW-UP.
-- Never quote the summary verbatim; paraphrase softly.
-- If the last topic is older than 14 days, avoid callback unless the user recently re-opened it.
-- Do not mention tools, logs, or "summary".
-- Sensitive topics (health/finance/relationship) = user-led only.
-
-[Tone & Form]
-- Urdu only; natural colloquial SOV order.
-- 1–2 short sentences MAX (casual); warm, friendly, not formal.
-- Match time-of-day in a tiny way (morning/evening/late-night).
-- Address user with polite "آپ". Assistant speaks in female first person ("میں … ہوں/کروں گی").
-
-[Micro-variation]
-- Vary openers across sessions (don't reuse the last greeting template).
-- If FOLLOW-UP: acknowledge briefly → one light question or gentle nudge.
-- If FRESH: neutral warmth + 1 open question that lets the user lead.
-
-[Output format]
-- Output ONLY the Urdu greeting text (no labels, no English, no metadata).
-
-# Decision Examples (for the model, do not output):
-- (Morning, last chat 3h ago, topic=sleep): FOLLOW-UP → "صبح بخیر {first_name}! پچھلی رات ذرا کم نیند تھی—آج کیسا لگ رہا ہے؟"
-- (Evening, last chat 9d ago, casual topics): FRESH → "{first_name}, آج دن کیسا گزرا؟ کچھ ہلکی بات سے شروع کریں؟"
-- (Late night, sensitive/old): FRESH (no callback)."""
-
-            response = await asyncio.to_thread(
-                openai_client.chat.completions.create,
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.4,
-                max_tokens=100
-            )
-            
-            greeting_msg = response.choices[0].message.content.strip()
-            print(f"[GREETING] AI-generated: {greeting_msg}")
-            
-    except Exception as e:
-        print(f"[GREETING] ⚠️ AI greeting failed, using default: {e}")
+        await asyncio.wait_for(audio_ready.wait(), timeout=2.0)
+        print(f"[AUDIO] ✓ Participant audio ready ({time.time() - start_time:.2f}s)")
+    except asyncio.TimeoutError:
+        print("[AUDIO] ⚠️ Audio track not subscribed after 2s - greeting anyway")
+    finally:
+        ctx.room.off("track_subscribed", on_audio_subscribed)
+    
+    await session_settled
+    print("[SESSION INIT] ✓ Session initialization complete")
+    
+    # AI greeting was started in parallel with session start-up - collect it now
+    greeting_msg = await greeting_task if greeting_task else None
     
     # Fallback to default greeting if AI generation fails or no summary
     if not greeting_msg:
         if user_name:
-            greeting_msg = f"السلام علیکم {user_name}! آج کیسے ہیں؟"
+            greeting_msg = FALLBACK_GREETING_WITH_NAME.format(name=user_name)
         else:
-            greeting_msg = "السلام علیکم! کیسے ہیں آپ؟"
+            greeting_msg = FALLBACK_GREETING
         print(f"[GREETING] Using default greeting")
     
     print(f"[GREETING] Playing: {greeting_msg}")
@@ -2124,6 +2539,8 @@ Otherwise choose FRESH.
         print(f"[GREETING] ✅ Complete ({time.time() - start_time:.2f}s)")
     except Exception as e:
         print(f"[GREETING] ⚠️ Failed: {e}")
+    finally:
+        greeting_done.set()
     
     # Set to listening state and ensure VAD is ready
     await assistant.broadcast_state("listening")
@@ -2250,21 +2667,21 @@ async def shutdown_handler():
     """Gracefully shutdown connections and cleanup resources"""
     print("[SHUTDOWN] Initiating graceful shutdown...")
     
-    pool = get_connection_pool_sync()
-    if pool:
-        try:
-            await pool.close()
-            print("[SHUTDOWN] ✓ Connection pool closed")
-        except Exception as e:
-            print(f"[SHUTDOWN] Error closing connection pool: {e}")
-    
-    redis_cache = get_redis_cache_sync()
-    if redis_cache:
-        try:
-            await redis_cache.close()
-            print("[SHUTDOWN] ✓ Redis cache closed")
-        except Exception as e:
-            print(f"[SHUTDOWN] Error closing Redis cache: {e}")
+    # Independent resources - close them concurrently
+    closers = {
+        name: resource.close()
+        for name, resource in (
+            ("Connection pool", get_connection_pool_sync()),
+            ("Redis cache", get_redis_cache_sync()),
+        )
+        if resource
+    }
+    results = await asyncio.gather(*closers.values(), return_exceptions=True)
+    for name, result in zip(closers, results):
+        if isinstance(result, Exception):
+            print(f"[SHUTDOWN] Error closing {name.lower()}: {result}")
+        else:
+            print(f"[SHUTDOWN] ✓ {name} closed")
     
     print("[SHUTDOWN] ✓ Shutdown complete")
 
@@ -2282,9 +2699,12 @@ if __name__ == "__main__":
     time.sleep(1.0)  # Increased from 0.5s to 1.0s
     
     print("[MAIN] ✅ Health check server should be running")
+    
+    print(f"[MAIN] ⚡ Event loop: {'uvloop' if uvloop else 'default asyncio'}")
     print("[MAIN] 🚀 Starting LiveKit agent worker...")
     agents.cli.run_app(agents.WorkerOptions(
         entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
         initialize_process_timeout=5,
     ))
 
@@ -35,11 +35,20 @@ class Config:
     
     # Memory Configuration
     MAX_MEMORIES_TO_LOAD: int = 500
+    # Per-user FAISS index snapshots reused across sessions and worker processes
+    # (empty = disabled). Defaults to tmpfs so every worker reads them from RAM.
+    RAG_INDEX_CACHE_DIR: str = os.getenv(
+        "RAG_INDEX_CACHE_DIR",
+        "/dev/shm/rag" if os.path.isdir("/dev/shm") else "/tmp/rag_index_cache"
+    )
     
     # Conversation Configuration
     TIME_DECAY_HOURS: int = 24
     RECENCY_WEIGHT: float = 0.3
     
+    # Logging Configuration (e.g. WARNING in production, DEBUG for per-turn diagnostics)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    
     # Testing/Development Configuration
     TEST_USER_ID: Optional[str] = os.getenv("TEST_USER_ID", "4e3efa3d-d8fe-431e-a78f-4efffb0cf43a")
     USE_TEST_USER: bool = os.getenv("USE_TEST_USER", "false").lower() == "true"
@@ -13,6 +13,13 @@ UUID_V4_PATTERN = re.compile(
     re.IGNORECASE
 )
 
+# Identity pattern: optional "user-" prefix followed by a UUID v4.
+# Compiled once so identity parsing on participant join is a single match.
+IDENTITY_PATTERN = re.compile(
+    r'^(?:(?-i:user-))?([0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12})$',
+    re.IGNORECASE
+)
+
 
 class UserIdError(Exception):
     """Raised when user_id validation fails"""
@@ -44,6 +51,11 @@ class UserId:
         
         identity = identity.strip()
         
+        # Fast path: single precompiled match covers both accepted formats
+        match = IDENTITY_PATTERN.match(identity)
+        if match:
+            return match.group(1)
+        
         # Handle "user-<uuid>" format
         if identity.startswith("user-"):
             uuid_part = identity[5:]
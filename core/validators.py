@@ -2,10 +2,13 @@
 Validation utilities for Companion Agent
 """
 
+import logging
 import uuid
 from typing import Optional
 from core.user_id import UserId, UserIdError
 
+logger = logging.getLogger(__name__)
+
 
 # Current user session state
 _current_user_id: Optional[str] = None
@@ -32,25 +35,25 @@ def set_current_user_id(user_id: str):
         print(f"[CRITICAL][USER_ID] ❌ REJECTED invalid user_id: {e}")
         raise
     
-    # DEBUG: Track user_id changes and potential collisions
+    # Track user_id changes and potential collisions
     old_user_id = _current_user_id
-    if old_user_id and old_user_id != user_id:
-        print(f"[DEBUG][USER_ID] ⚠️  USER_ID COLLISION DETECTED!")
-        print(f"[DEBUG][USER_ID]    Previous: {UserId.format_for_display(old_user_id)}")
-        print(f"[DEBUG][USER_ID]    New:      {UserId.format_for_display(user_id)}")
-        print(f"[DEBUG][USER_ID]    This indicates multiple sessions are active!")
+    if old_user_id and old_user_id != user_id and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[USER_ID] ⚠️  USER_ID COLLISION DETECTED! Previous: %s New: %s "
+            "- multiple sessions are active",
+            UserId.format_for_display(old_user_id), UserId.format_for_display(user_id)
+        )
     
     _current_user_id = user_id
     print(f"[SESSION] User ID set to: {user_id}")
-    print(f"[DEBUG][USER_ID] ✅ Global _current_user_id = {UserId.format_for_display(user_id)}")
 
 
 def get_current_user_id() -> Optional[str]:
     """Get the current user ID"""
     result = _current_user_id
-    # DEBUG: Only log when result is None (reduce noise)
+    # Only log when result is None (reduce noise)
     if result is None:
-        print(f"[DEBUG][USER_ID] ⚠️  Retrieved user_id: NONE")
+        logger.debug("[USER_ID] ⚠️  Retrieved user_id: NONE")
     return result
 
 
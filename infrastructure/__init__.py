@@ -3,18 +3,24 @@ Infrastructure layer for Companion Agent
 Provides connection pooling, caching, and database optimization
 """
 
-from .connection_pool import ConnectionPool, get_connection_pool, get_connection_pool_sync
+from .connection_pool import ConnectionPool, get_connection_pool, get_connection_pool_sync, get_shared_supabase_client
 from .redis_cache import RedisCache, get_redis_cache, get_redis_cache_sync
-from .database_batcher import DatabaseBatcher, get_db_batcher, get_db_batcher_sync
+from .database_batcher import DatabaseBatcher, get_db_batcher, get_db_batcher_sync, init_db_batcher
+from .categorization_batcher import CategorizationBatcher, get_categorization_batcher, get_categorization_batcher_sync
 
 __all__ = [
     'ConnectionPool',
     'get_connection_pool',
     'get_connection_pool_sync',
+    'get_shared_supabase_client',
     'RedisCache',
     'get_redis_cache',
     'get_redis_cache_sync',
     'DatabaseBatcher',
     'get_db_batcher',
     'get_db_batcher_sync',
+    'init_db_batcher',
+    'CategorizationBatcher',
+    'get_categorization_batcher',
+    'get_categorization_batcher_sync',
 ]
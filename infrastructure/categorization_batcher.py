@@ -0,0 +1,271 @@
+"""
+Categorization Batcher - Coalesces per-turn LLM classification calls
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from infrastructure.connection_pool import get_connection_pool
+from infrastructure.redis_cache import get_redis_cache
+
+logger = logging.getLogger(__name__)
+
+# Result cache: identical (system prompt, prompt) pairs skip the model entirely
+RESULT_CACHE_MAX_ENTRIES = 4096
+RESULT_CACHE_TTL_S = 30 * 24 * 3600  # Redis TTL (shared across workers)
+
+
+class CategorizationBatcher:
+    """
+    Short-window batching for JSON classification prompts.
+    Requests arriving within the window that share a system prompt are sent
+    to the model as ONE numbered multi-item completion, and each caller gets
+    back its own parsed result.
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        window_s: float = 0.025,
+        max_batch: int = 16,
+        timeout_s: float = 3.0
+    ):
+        self.model = model
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self.timeout_s = timeout_s
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batches_sent = 0
+        self._items_processed = 0
+        self._results: "OrderedDict[str, Dict]" = OrderedDict()
+        self._cache_hits = 0
+        self._inflight: Dict[str, asyncio.Future] = {}  # Cache key -> pending result
+        self._inflight_joins = 0
+        self._tasks: set = set()  # Sends and cache writes in flight (strong refs)
+
+    def _ensure_worker(self):
+        """Start (or restart) the worker on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+            self._inflight.clear()
+            self._tasks = set()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+    async def categorize(self, system_prompt: str, prompt: str, max_tokens: int = 200) -> Dict:
+        """
+        Classify one prompt, sharing the API call with concurrent requests.
+
+        Args:
+            system_prompt: System message (only requests with the same one are batched)
+            prompt: Item-specific prompt asking for a JSON object
+            max_tokens: Token budget for this item's result
+
+        Returns:
+            Parsed JSON result for this prompt
+        """
+        key = self._cache_key(system_prompt, prompt)
+        cached = await self._get_cached(key)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached
+        
+        # Identical prompts already waiting on the model share that result
+        self._ensure_worker()
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._loop.create_future()
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._on_result(key, f))
+            await self._queue.put((system_prompt, prompt, max_tokens, future))
+        else:
+            self._inflight_joins += 1
+        # Shielded so one caller's timeout doesn't fail the others sharing the future
+        return await asyncio.shield(future)
+    
+    def _on_result(self, key: str, future: asyncio.Future):
+        """Cache a finished result (whether or not its callers are still waiting)"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._spawn(self._set_cached(key, future.result()))
+    
+    def _spawn(self, coro) -> asyncio.Task:
+        """Start a task on the batcher's loop, keeping it referenced until done"""
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    @staticmethod
+    def _cache_key(system_prompt: str, prompt: str) -> str:
+        """Hash of the prompt pair, normalized for case and whitespace"""
+        normalized = " ".join(f"{system_prompt}\0{prompt}".lower().split())
+        return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+    
+    async def _get_cached(self, key: str) -> Optional[Dict]:
+        """In-process LRU first, then Redis"""
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key]
+        try:
+            redis_cache = await get_redis_cache()
+            cached = await redis_cache.get(f"cat:{key}")
+        except Exception:
+            return None
+        if isinstance(cached, dict):
+            self._remember(key, cached)
+            return cached
+        return None
+    
+    async def _set_cached(self, key: str, result: Dict):
+        self._remember(key, result)
+        try:
+            redis_cache = await get_redis_cache()
+            await redis_cache.set(f"cat:{key}", result, ttl=RESULT_CACHE_TTL_S)
+        except Exception as e:
+            logger.warning("[BATCH] Categorization cache store failed: %s", e)
+    
+    def _remember(self, key: str, result: Dict):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > RESULT_CACHE_MAX_ENTRIES:
+            self._results.popitem(last=False)
+
+    async def _run(self):
+        """Worker: drain the queue in windows of up to max_batch items"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.window_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: Dict[str, List[Tuple]] = {}
+            for item in batch:
+                groups.setdefault(item[0], []).append(item)
+
+            # Sends run in the background so the next window is collected while
+            # a completion is in flight (_send resolves its own futures on failure)
+            for system_prompt, items in groups.items():
+                self._spawn(self._send(system_prompt, items))
+
+    async def _send(self, system_prompt: str, items: List[Tuple]):
+        """Send one completion for a group of items and resolve their futures"""
+        futures = [item[3] for item in items]
+        try:
+            pool = await get_connection_pool()
+            client = pool.get_openai_client(async_client=True)
+
+            if len(items) == 1:
+                content = items[0][1]
+            else:
+                numbered = "\n\n".join(
+                    f"### Item {i}\n{item[1].strip()}" for i, item in enumerate(items, 1)
+                )
+                content = (
+                    f"Analyze each of the {len(items)} numbered items below independently.\n"
+                    f"Respond in JSON: {{\"results\": [<JSON object for item 1>, ...]}} "
+                    f"with exactly {len(items)} entries in item order, each with an "
+                    f"\"item\" field holding its item number.\n\n{numbered}"
+                )
+
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": content}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.1,
+                max_tokens=sum(item[2] for item in items),
+                timeout=self.timeout_s
+            )
+
+            parsed = json.loads(response.choices[0].message.content)
+            results = [parsed] if len(items) == 1 else self._split_results(parsed, len(items))
+
+            self._batches_sent += 1
+            self._items_processed += len(items)
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+    @staticmethod
+    def _split_results(parsed: Dict, count: int) -> List[Dict]:
+        """
+        Per-item results from a multi-item response, in item order.
+        
+        Args:
+            parsed: Decoded response ({"results": [...]})
+            count: Number of items sent
+            
+        Returns:
+            One result dict per item (with the "item" field removed)
+            
+        Raises:
+            ValueError: If the response doesn't hold exactly one object per item
+        """
+        results = parsed.get("results") if isinstance(parsed, dict) else None
+        if not isinstance(results, list) or len(results) != count:
+            got = len(results) if isinstance(results, list) else type(results).__name__
+            raise ValueError(f"Expected {count} results, got {got}")
+        if not all(isinstance(result, dict) for result in results):
+            raise ValueError("Expected a JSON object for every result")
+        
+        # Entries that all carry distinct item numbers 1..count are placed by
+        # number, so a reordered response still reaches the right callers
+        numbers = [result.get("item") for result in results]
+        if sorted(n for n in numbers if isinstance(n, int)) == list(range(1, count + 1)):
+            ordered = [None] * count
+            for number, result in zip(numbers, results):
+                ordered[number - 1] = result
+            results = ordered
+        return [{k: v for k, v in result.items() if k != "item"} for result in results]
+    
+    def get_stats(self) -> Dict:
+        """Get batching statistics"""
+        return {
+            "batches_sent": self._batches_sent,
+            "items_processed": self._items_processed,
+            "avg_batch_size": self._items_processed / max(1, self._batches_sent),
+            "cache_hits": self._cache_hits,
+            "inflight_joins": self._inflight_joins,
+            "cache_size": len(self._results),
+        }
+
+
+# Global categorization batcher instance
+_categorization_batcher: Optional[CategorizationBatcher] = None
+
+
+async def get_categorization_batcher() -> CategorizationBatcher:
+    """Get or create the global categorization batcher instance"""
+    global _categorization_batcher
+    if _categorization_batcher is None:
+        _categorization_batcher = CategorizationBatcher()
+        logger.debug("[BATCH] Categorization batcher initialized")
+    return _categorization_batcher
+
+
+def get_categorization_batcher_sync() -> Optional[CategorizationBatcher]:
+    """Get categorization batcher synchronously (if already initialized)"""
+    return _categorization_batcher
@@ -3,15 +3,72 @@ import os
 import time
 from typing import Dict, Optional
 import aiohttp
+import httpx
 import openai
 from supabase import Client, create_client
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:  # Optional - falls back to pooled HTTP/1.1 keep-alive connections
+    HTTP2_AVAILABLE = False
+
+# Shared OpenAI transport sizing (one pool per process, reused by every session)
+OPENAI_MAX_CONNECTIONS = 100
+OPENAI_MAX_KEEPALIVE = 50
+
+
+def _new_openai_client(async_client: bool):
+    """Create an OpenAI client on a keep-alive (HTTP/2 when available) connection pool"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    limits = httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+    )
+    if async_client:
+        return openai.AsyncOpenAI(
+            api_key=api_key,
+            max_retries=3,
+            timeout=30.0,
+            http_client=httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits, timeout=30.0),
+        )
+    return openai.OpenAI(
+        api_key=api_key,
+        max_retries=3,
+        timeout=30.0,
+        http_client=httpx.Client(http2=HTTP2_AVAILABLE, limits=limits, timeout=30.0),
+    )
+
+
+# Supabase clients are synchronous and not tied to an event loop, so they are shared
+# process-wide: the worker prewarm hook creates one before any pool exists, and the
+# pool hands out that same client afterwards
+_supabase_clients: Dict[str, Client] = {}
+
+
+def get_shared_supabase_client(url: str, key: str) -> Client:
+    """
+    Get or create the process-wide Supabase client for a URL and key
+    (usable without a running event loop).
+    
+    Args:
+        url: Supabase project URL
+        key: API key
+        
+    Returns:
+        Shared Supabase client
+    """
+    cache_key = f"{url}:{key[:10]}"  # Use first 10 chars of key for caching
+    if cache_key not in _supabase_clients:
+        _supabase_clients[cache_key] = create_client(url, key)
+        print(f"[POOL] Created new Supabase client (pool size: {len(_supabase_clients)})")
+    return _supabase_clients[cache_key]
+
 
 class ConnectionPool:
     """Manages connection pooling and client reuse for optimal performance"""
     
     def __init__(self):
-        self._supabase_clients: Dict[str, Client] = {}
         self._openai_sync_client: Optional[openai.OpenAI] = None
         self._openai_async_client: Optional[openai.AsyncOpenAI] = None
         self._http_session: Optional[aiohttp.ClientSession] = None
@@ -37,19 +94,10 @@ class ConnectionPool:
         )
         
         # Initialize OpenAI clients (singleton pattern)
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
-            self._openai_sync_client = openai.OpenAI(
-                api_key=api_key,
-                max_retries=3,
-                timeout=30.0
-            )
-            self._openai_async_client = openai.AsyncOpenAI(
-                api_key=api_key,
-                max_retries=3,
-                timeout=30.0
-            )
-            print("[POOL] ✓ OpenAI clients initialized with connection pooling")
+        if os.getenv("OPENAI_API_KEY"):
+            self._openai_sync_client = _new_openai_client(async_client=False)
+            self._openai_async_client = _new_openai_client(async_client=True)
+            print(f"[POOL] ✓ OpenAI clients initialized with connection pooling (HTTP/2: {HTTP2_AVAILABLE})")
         
         # Start health check monitoring
         self._health_check_task = asyncio.create_task(self._health_monitor())
@@ -76,39 +124,22 @@ class ConnectionPool:
     
     def get_supabase_client(self, url: str, key: str) -> Client:
         """Get or create a Supabase client with connection pooling"""
-        cache_key = f"{url}:{key[:10]}"  # Use first 10 chars of key for caching
-        
-        if cache_key not in self._supabase_clients:
-            try:
-                client = create_client(url, key)
-                self._supabase_clients[cache_key] = client
-                print(f"[POOL] Created new Supabase client (pool size: {len(self._supabase_clients)})")
-            except Exception as e:
-                self._connection_errors += 1
-                print(f"[POOL ERROR] Failed to create Supabase client: {e}")
-                raise
-        
-        return self._supabase_clients[cache_key]
+        try:
+            return get_shared_supabase_client(url, key)
+        except Exception as e:
+            self._connection_errors += 1
+            print(f"[POOL ERROR] Failed to create Supabase client: {e}")
+            raise
     
     def get_openai_client(self, async_client: bool = False):
         """Get reusable OpenAI client (sync or async)"""
         if async_client:
             if not self._openai_async_client:
-                api_key = os.getenv("OPENAI_API_KEY")
-                self._openai_async_client = openai.AsyncOpenAI(
-                    api_key=api_key,
-                    max_retries=3,
-                    timeout=30.0
-                )
+                self._openai_async_client = _new_openai_client(async_client=True)
             return self._openai_async_client
         else:
             if not self._openai_sync_client:
-                api_key = os.getenv("OPENAI_API_KEY")
-                self._openai_sync_client = openai.OpenAI(
-                    api_key=api_key,
-                    max_retries=3,
-                    timeout=30.0
-                )
+                self._openai_sync_client = _new_openai_client(async_client=False)
             return self._openai_sync_client
     
     async def get_http_session(self) -> aiohttp.ClientSession:
@@ -142,13 +173,18 @@ class ConnectionPool:
         if self._http_session and not self._http_session.closed:
             await self._http_session.close()
         
-        self._supabase_clients.clear()
+        if self._openai_async_client:
+            await self._openai_async_client.close()
+        if self._openai_sync_client:
+            self._openai_sync_client.close()
+        
+        _supabase_clients.clear()
         print("[POOL] ✓ Connection pool closed")
     
     def get_stats(self) -> Dict:
         """Get connection pool statistics"""
         return {
-            "supabase_clients": len(self._supabase_clients),
+            "supabase_clients": len(_supabase_clients),
             "http_session_active": self._http_session is not None and not self._http_session.closed,
             "openai_clients_initialized": self._openai_sync_client is not None,
             "connection_errors": self._connection_errors,
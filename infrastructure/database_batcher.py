@@ -3,6 +3,14 @@ import time
 from typing import Any, Dict, List, Optional
 from supabase import Client
 
+# Buffered upserts are flushed after this window or at _batch_size rows
+WRITE_FLUSH_WINDOW_S = 0.01
+
+# After get_bootstrap_bundle fails (not deployed), sessions use the separate
+# queries until this many seconds have passed, then probe the RPC again
+BOOTSTRAP_RPC_RETRY_S = 600
+_bootstrap_rpc_retry_at = 0.0
+
 
 class DatabaseBatcher:
     """
@@ -15,6 +23,11 @@ class DatabaseBatcher:
         self._batch_size = 100  # Max items per batch
         self._queries_saved = 0
         self._total_operations = 0
+        # (table, on_conflict) -> {conflict key values -> (row, waiting futures)};
+        # one row per key so a single upsert never touches the same row twice
+        self._pending_writes: Dict[tuple, Dict[tuple, tuple]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._size_flush_tasks: set = set()  # Flushes started by a full queue (strong refs)
         
     async def batch_get_memories(
         self, 
@@ -107,6 +120,122 @@ class DatabaseBatcher:
             print(f"[BATCH] Error in batch_save_memories: {e}")
             return False
     
+    async def enqueue_write(self, table: str, row: Dict, on_conflict: str) -> Optional[Dict[str, str]]:
+        """
+        Queue one upsert and wait for the batched flush that writes it.
+        Writes arriving within WRITE_FLUSH_WINDOW_S (from any session) are flushed
+        together - one upsert per table, all tables concurrently - and a later
+        write to the same conflict key replaces the queued row.
+        
+        Args:
+            table: Table name
+            row: Row to upsert (must include every on_conflict column)
+            on_conflict: Comma-separated conflict columns, e.g. "user_id"
+            
+        Returns:
+            None if the batch containing this write was saved, else the error
+            as {"code", "message"} (from the response error or the raised exception)
+        """
+        if not self.supabase:
+            return {"code": "", "message": "No Supabase client"}
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        rows = self._pending_writes.setdefault((table, on_conflict), {})
+        row_key = tuple(row[column] for column in on_conflict.split(","))
+        _, waiters = rows.get(row_key, (None, []))
+        waiters.append(future)
+        rows[row_key] = (row, waiters)
+        
+        if sum(len(pending) for pending in self._pending_writes.values()) >= self._batch_size:
+            # Owned by the batcher, not this caller: cancelling the caller must not
+            # abandon the other writes swapped out for this flush
+            task = asyncio.create_task(self._flush_writes())
+            self._size_flush_tasks.add(task)
+            task.add_done_callback(self._size_flush_tasks.discard)
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        
+        return await future
+    
+    async def enqueue_memory_write(self, memory: Dict) -> bool:
+        """
+        Queue one memory upsert (see enqueue_write).
+        
+        Args:
+            memory: Memory dict with keys: user_id, category, key, value
+            
+        Returns:
+            True if the batch containing this write was saved, False otherwise
+        """
+        if not self.supabase:
+            return False
+        return await self.enqueue_write("memory", memory, "user_id,category,key") is None
+    
+    async def _flush_after_window(self):
+        await asyncio.sleep(WRITE_FLUSH_WINDOW_S)
+        await self._flush_writes()
+    
+    async def _flush_writes(self):
+        """Upsert all queued writes (one request per table) and resolve their waiters"""
+        pending, self._pending_writes = self._pending_writes, {}
+        if not pending:
+            return
+        try:
+            await asyncio.gather(*(
+                self._flush_table(table, on_conflict, rows)
+                for (table, on_conflict), rows in pending.items()
+            ))
+        finally:
+            # A flush cancelled or failed partway must still answer every waiter
+            for rows in pending.values():
+                for _, waiters in rows.values():
+                    for future in waiters:
+                        if not future.done():
+                            future.set_result({"code": "", "message": "Write flush did not complete"})
+    
+    async def _flush_table(self, table: str, on_conflict: str, pending: Dict[tuple, tuple]):
+        # A list upsert sends the union of the rows' keys, so a row that left a
+        # column out would have it overwritten with NULL - rows with different
+        # column sets go in separate upserts
+        groups: Dict[frozenset, List[tuple]] = {}
+        for row, waiters in pending.values():
+            groups.setdefault(frozenset(row), []).append((row, waiters))
+        await asyncio.gather(*(
+            self._upsert_group(table, on_conflict, entries) for entries in groups.values()
+        ))
+    
+    async def _upsert_group(self, table: str, on_conflict: str, entries: List[tuple]):
+        rows = [row for row, _ in entries]
+        try:
+            resp = await asyncio.to_thread(
+                lambda: self.supabase.table(table).upsert(rows, on_conflict=on_conflict).execute()
+            )
+            error = getattr(resp, "error", None)
+            if error:
+                print(f"[BATCH] Error flushing {table} writes: {error}")
+        except Exception as e:
+            print(f"[BATCH] Error flushing {len(rows)} {table} writes: {e}")
+            error = e
+        
+        result = self._error_info(error) if error else None
+        self._total_operations += 1
+        self._queries_saved += sum(len(waiters) for _, waiters in entries) - 1
+        for _, waiters in entries:
+            for future in waiters:
+                if not future.done():
+                    future.set_result(result)
+    
+    @staticmethod
+    def _error_info(error: Any) -> Dict[str, str]:
+        """Normalize a response error or raised APIError to {"code", "message"}"""
+        if isinstance(error, dict):
+            return {"code": str(error.get("code") or ""), "message": str(error.get("message") or error)}
+        return {
+            "code": str(getattr(error, "code", "") or ""),
+            "message": str(getattr(error, "message", "") or error),
+        }
+    
     async def batch_delete_memories(self, user_id: str, keys: List[str]) -> int:
         """
         Batch delete multiple memories.
@@ -320,6 +449,57 @@ class DatabaseBatcher:
             print(f"[BATCH] Error in prefetch_user_data: {e}")
             return {}
     
+    async def fetch_bootstrap_bundle(self, user_id: str, memory_limit: int = 500) -> Optional[Dict[str, Any]]:
+        """
+        Fetch everything session startup needs (memories for RAG, profile, onboarding)
+        in ONE round trip via the get_bootstrap_bundle RPC.
+        
+        Args:
+            user_id: User ID
+            memory_limit: Maximum memories to return (newest first)
+            
+        Returns:
+            Dict shaped like prefetch_user_data plus "memories" (all rows for RAG),
+            or None if the RPC is unavailable (caller should fall back to separate queries)
+        """
+        global _bootstrap_rpc_retry_at
+        if not self.supabase or time.monotonic() < _bootstrap_rpc_retry_at:
+            return None
+        
+        try:
+            start_time = time.time()
+            resp = await asyncio.to_thread(
+                lambda: self.supabase.rpc("get_bootstrap_bundle", {
+                    "p_user_id": user_id,
+                    "p_limit": memory_limit,
+                }).execute()
+            )
+            bundle = getattr(resp, "data", None)
+            if not isinstance(bundle, dict):
+                return None
+            
+            self._total_operations += 1
+            self._queries_saved += 3  # RAG load + profile + memories + onboarding in one call
+            
+            memories = bundle.get("memories") or []
+            result = {
+                "profile": bundle.get("profile") or "",
+                "recent_memories": memories[:50],
+                "onboarding": bundle.get("onboarding") or {},
+                "memory_count": len(memories),
+                "memories": memories,
+            }
+            
+            elapsed = time.time() - start_time
+            print(f"[BATCH] Bootstrap bundle fetched in {elapsed:.2f}s ({len(memories)} memories)")
+            return result
+            
+        except Exception as e:
+            # Function not deployed yet (see migrations/create_get_bootstrap_bundle.sql)
+            _bootstrap_rpc_retry_at = time.monotonic() + BOOTSTRAP_RPC_RETRY_S
+            print(f"[BATCH] Bootstrap bundle unavailable, using separate queries: {e}")
+            return None
+    
     def get_stats(self) -> Dict:
         """Get batching statistics"""
         efficiency = (
@@ -342,10 +522,21 @@ _db_batcher: Optional[DatabaseBatcher] = None
 
 async def get_db_batcher(supabase_client: Optional[Client] = None) -> DatabaseBatcher:
     """Get or create the global database batcher instance"""
+    return init_db_batcher(supabase_client)
+
+
+def init_db_batcher(supabase_client: Optional[Client] = None) -> DatabaseBatcher:
+    """
+    Get or create the global database batcher without awaiting
+    (for synchronous hooks such as the worker prewarm).
+    A batcher created before Supabase was available picks up the client later.
+    """
     global _db_batcher
     if _db_batcher is None:
         _db_batcher = DatabaseBatcher(supabase_client)
         print("[BATCH] Database batcher initialized")
+    elif _db_batcher.supabase is None and supabase_client is not None:
+        _db_batcher.supabase = supabase_client
     return _db_batcher
 
 
@@ -2,14 +2,33 @@ import asyncio
 import json
 import os
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 import redis.asyncio as redis
 
+try:
+    import orjson
+except ImportError:  # Optional speedup - stdlib json works the same, just slower
+    orjson = None
+
 # Redis Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 REDIS_ENABLED = os.getenv("REDIS_ENABLED", "true").lower() == "true"
 
 
+def _dumps(value: Any):
+    """Serialize a cache payload to JSON (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value)
+
+
+def _loads(value: Any) -> Any:
+    """Deserialize a cache payload from JSON (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
 class RedisCache:
     """
     Redis caching layer with connection pooling and automatic fallback.
@@ -85,8 +104,8 @@ class RedisCache:
             
             # Try to deserialize JSON
             try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
+                return _loads(value)
+            except (ValueError, TypeError):
                 return value
                 
         except Exception as e:
@@ -94,6 +113,40 @@ class RedisCache:
             print(f"[REDIS] Get error for key '{key}': {e}")
             return default
     
+    async def get_many(self, *keys: str) -> List[Any]:
+        """
+        Get several values in one round trip (MGET) with automatic deserialization.
+        
+        Args:
+            *keys: Cache keys
+            
+        Returns:
+            List of cached values in key order (None for misses or if Redis is unavailable)
+        """
+        if not self.enabled or not self._client or not keys:
+            return [None] * len(keys)
+        
+        try:
+            self._total_requests += len(keys)
+            values = await self._client.mget(keys)
+        except Exception as e:
+            self._connection_errors += 1
+            print(f"[REDIS] MGET error: {e}")
+            return [None] * len(keys)
+        
+        results = []
+        for value in values:
+            if value is None:
+                self._cache_misses += 1
+                results.append(None)
+                continue
+            self._cache_hits += 1
+            try:
+                results.append(_loads(value))
+            except (ValueError, TypeError):
+                results.append(value)
+        return results
+    
     async def set(
         self, 
         key: str, 
@@ -121,9 +174,9 @@ class RedisCache:
         try:
             # Serialize complex objects to JSON
             if isinstance(value, (dict, list, tuple)):
-                value = json.dumps(value)
+                value = _dumps(value)
             elif not isinstance(value, (str, int, float, bool)):
-                value = json.dumps(str(value))
+                value = _dumps(str(value))
             
             result = await self._client.set(
                 key, 
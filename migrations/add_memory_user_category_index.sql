@@ -0,0 +1,22 @@
+-- Migration: Add composite indexes for per-category memory reads
+-- Purpose: Serve "newest N memories of category X for user Y" straight from an index
+--          (get_memories_by_category, get_top_memories_per_category, the batched .in_() fallback)
+--          instead of scanning and sorting every row the user has
+
+-- NOTE: CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+--       Run each statement on its own (e.g. psql, not the SQL editor's "run all" transaction).
+
+-- Covers (user_id, category) equality + created_at DESC ordering; INCLUDE lets
+-- value/value_preview reads be answered with an index-only scan
+CREATE INDEX CONCURRENTLY IF NOT EXISTS memory_user_cat_created_idx
+    ON memory (user_id, category, created_at DESC)
+    INCLUDE (value, value_preview);
+
+-- Hot-path subset: the categories loaded into context on every session start
+-- (keep in sync with MEMORY_CATEGORIES in services/memory_service.py)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS memory_user_created_hot_partial
+    ON memory (user_id, created_at DESC)
+    WHERE category IN ('FACT', 'GOAL', 'INTEREST', 'EXPERIENCE', 'PREFERENCE', 'PLAN', 'RELATIONSHIP', 'OPINION');
+
+COMMENT ON INDEX memory_user_cat_created_idx IS 'Newest memories per (user, category); used by per-category and batched category reads';
+COMMENT ON INDEX memory_user_created_hot_partial IS 'Newest memories per user restricted to the context categories';
@@ -0,0 +1,11 @@
+-- Migration: Add value_preview column to memory
+-- Purpose: Store a clipped (<= 150 chars) copy of each memory value, computed once on write,
+--          so context building can read it directly instead of slicing every value on every read
+
+-- Generated column: Postgres fills it on INSERT/UPDATE and backfills existing rows,
+-- so no application write path has to set it
+ALTER TABLE memory
+    ADD COLUMN IF NOT EXISTS value_preview TEXT
+    GENERATED ALWAYS AS (left(value, 150)) STORED;
+
+COMMENT ON COLUMN memory.value_preview IS 'First 150 characters of value (generated) for prompt context building';
@@ -0,0 +1,43 @@
+-- Migration: Create get_bootstrap_bundle function
+-- Purpose: Return everything a voice session needs at startup (recent memories for RAG,
+--          profile text, onboarding details) in ONE round trip instead of separate
+--          memory / user_profiles / onboarding_details queries
+
+CREATE OR REPLACE FUNCTION get_bootstrap_bundle(
+    p_user_id UUID,
+    p_limit INT DEFAULT 500
+)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'memories', COALESCE((
+            SELECT json_agg(m ORDER BY m.created_at DESC)
+            FROM (
+                SELECT category, key, value, created_at
+                FROM memory
+                WHERE user_id = p_user_id
+                ORDER BY created_at DESC
+                LIMIT p_limit
+            ) m
+        ), '[]'::json),
+        'profile', (
+            SELECT profile_text
+            FROM user_profiles
+            WHERE user_id = p_user_id
+            LIMIT 1
+        ),
+        'onboarding', (
+            SELECT row_to_json(o)
+            FROM onboarding_details o
+            WHERE o.user_id = p_user_id
+            LIMIT 1
+        )
+    );
+$$;
+
+-- Runs with the caller's privileges, so RLS policies on each table still apply
+GRANT EXECUTE ON FUNCTION get_bootstrap_bundle(UUID, INT) TO authenticated, service_role;
+
+COMMENT ON FUNCTION get_bootstrap_bundle(UUID, INT) IS 'Startup bundle for a session: recent memories, profile text and onboarding details as JSON';
@@ -0,0 +1,30 @@
+-- Migration: Create get_top_memories_per_category function
+-- Purpose: Fetch the newest N memories for each of several categories in one round trip
+--          (replaces one SELECT per category and the over-fetching .in_() fallback)
+
+CREATE OR REPLACE FUNCTION get_top_memories_per_category(
+    p_user_id UUID,
+    p_categories TEXT[],
+    p_limit INT
+)
+RETURNS SETOF memory
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT m.*
+    FROM memory m
+    JOIN (
+        SELECT id,
+               row_number() OVER (PARTITION BY category ORDER BY created_at DESC) AS rn
+        FROM memory
+        WHERE user_id = p_user_id
+          AND category = ANY(p_categories)
+    ) ranked ON ranked.id = m.id
+    WHERE ranked.rn <= p_limit
+    ORDER BY m.category, m.created_at DESC;
+$$;
+
+-- Runs with the caller's privileges, so memory RLS policies still apply
+GRANT EXECUTE ON FUNCTION get_top_memories_per_category(UUID, TEXT[], INT) TO authenticated, service_role;
+
+COMMENT ON FUNCTION get_top_memories_per_category(UUID, TEXT[], INT) IS 'Top-N newest memories per category for a user (windowed row_number)';
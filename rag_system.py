@@ -20,6 +20,7 @@ Tier 1 Advanced Features:
 """
 
 import asyncio
+import base64
 import numpy as np
 import faiss
 import pickle
@@ -29,12 +30,14 @@ import json
 from typing import List, Dict, Optional, Tuple, Set
 from openai import AsyncOpenAI
 import logging
+from functools import lru_cache
 
 # RAG Configuration
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIMENSION = 1536
 CACHE_EMBEDDINGS = True
 MAX_CACHE_SIZE = 1000
+EMBEDDING_BATCH_SIZE = 128  # Texts per embeddings request (the API caps inputs per request)
 
 # Advanced RAG Configuration
 ENABLE_QUERY_EXPANSION = False  # DISABLED: Adds 1-3s LLM call per search - too slow for real-time
@@ -44,6 +47,195 @@ ENABLE_CONVERSATION_CONTEXT = True
 TIME_DECAY_HOURS = 24  # Memories decay over 24 hours
 RECENCY_WEIGHT = 0.3  # 30% weight for recency, 70% for similarity
 
+# FAISS HNSW index (graph search, no training step; sub-linear as memories grow)
+HNSW_M = 32  # Neighbours per graph node
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+# Store HNSW vectors as float16 (half the RAM of float32; cosine/L2 ranking is
+# unaffected at this precision). False keeps full float32 vectors.
+HNSW_FP16_STORAGE = True
+
+# Optional pre-trained, empty quantized index (e.g. IVFPQ) used instead of HNSW.
+# Train it once offline on a representative embedding sample and write it with
+# faiss.write_index; sessions then only clone it and add() vectors - no training at runtime.
+RAG_INDEX_TEMPLATE_PATH = os.getenv("RAG_INDEX_TEMPLATE_PATH", "")
+IVF_NPROBE = 8  # Inverted lists scanned per query for IVF templates
+
+LOAD_PAGE_SIZE = 100  # Memory rows per Supabase page when loading (each page embedded on arrival)
+
+# Retrieval score multiplier by memory category
+CATEGORY_IMPORTANCE_WEIGHTS = {
+    "GOAL": 2.0,           # Goals are highly important
+    "RELATIONSHIP": 1.8,   # People matter
+    "PREFERENCE": 1.5,     # User preferences
+    "EXPERIENCE": 1.3,     # Life experiences
+    "FACT": 1.2,           # Basic facts
+    "INTEREST": 1.4,       # Interests and hobbies
+    "OPINION": 1.1,        # Opinions
+    "PLAN": 1.6,           # Future plans
+    "GENERAL": 1.0         # Default
+}
+
+# Background adds within this cosine similarity of an indexed memory (or of an
+# earlier add in the same batch) refresh that memory instead of being indexed
+NEAR_DUPLICATE_COSINE = 0.95
+
+# Background memory adds from every session are coalesced into shared embeddings requests
+EMBEDDING_COALESCE_WINDOW_S = 0.02  # Max wait after the first queued text
+EMBEDDING_COALESCE_MAX = 64  # Max texts per coalesced request
+
+
+def _order_snippets(results: List[Dict]) -> List[Dict]:
+    """
+    Order retrieved snippets by when they were stored, independent of score.
+    
+    Args:
+        results: Selected results carrying "timestamp" and "memory_idx"
+    
+    Returns:
+        The same results, oldest first (memory index breaks ties)
+    """
+    return sorted(results, key=lambda r: (r["timestamp"], r["memory_idx"]))
+
+
+class _EmbeddingCoalescer:
+    """
+    Short-window batching for single-text embedding requests.
+    Texts queued within EMBEDDING_COALESCE_WINDOW_S (from any user's RAG system)
+    are embedded in ONE API call per client, and each caller gets its own vector.
+    """
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set = set()  # Sends in flight (strong refs)
+    
+    def _ensure_worker(self):
+        """Start (or restart) the worker on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A worker left on a previous (still open) loop would wait forever
+            if self._worker is not None and not self._worker.done() and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._worker.cancel)
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+            self._tasks = set()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+    
+    async def embed(self, client: AsyncOpenAI, text: str) -> np.ndarray:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((client, text, future))
+        return await future
+    
+    async def _run(self):
+        """Worker: drain the queue in windows of up to EMBEDDING_COALESCE_MAX texts"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + EMBEDDING_COALESCE_WINDOW_S
+            while len(batch) < EMBEDDING_COALESCE_MAX:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            groups: Dict[int, List[Tuple]] = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+            # Sends run in the background so one slow request doesn't hold back
+            # every other session's adds
+            for items in groups.values():
+                task = self._loop.create_task(self._send(items))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+    
+    async def _send(self, items: List[Tuple]):
+        """Embed one group of texts and resolve their futures"""
+        futures = [item[2] for item in items]
+        try:
+            response = await items[0][0].embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=[item[1] for item in items],
+                timeout=3.0
+            )
+            if len(response.data) != len(futures):
+                raise ValueError(f"Expected {len(futures)} embeddings, got {len(response.data)}")
+            for future, data in zip(futures, sorted(response.data, key=lambda d: d.index)):
+                if not future.done():
+                    future.set_result(np.array(data.embedding, dtype=np.float32))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Every caller must be resolved (even if this send was cancelled), or a
+            # background flush waits forever
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+
+
+_embedding_coalescer = _EmbeddingCoalescer()
+
+
+@lru_cache(maxsize=None)
+def get_openai_client(openai_api_key: str) -> AsyncOpenAI:
+    """
+    Process-wide embeddings client, shared by every user's RAG system so sessions
+    reuse one HTTP connection pool instead of each opening (and TLS-handshaking) their own.
+    """
+    return AsyncOpenAI(api_key=openai_api_key)
+
+
+@lru_cache(maxsize=1)
+def _load_index_template() -> Optional[faiss.Index]:
+    """Read the pre-trained index template once per process (None if not configured)."""
+    if not RAG_INDEX_TEMPLATE_PATH:
+        return None
+    try:
+        template = faiss.read_index(RAG_INDEX_TEMPLATE_PATH)
+    except Exception as e:
+        logging.error(f"[RAG] Could not read index template {RAG_INDEX_TEMPLATE_PATH}: {e}")
+        return None
+    if template.d != EMBEDDING_DIMENSION or not template.is_trained or template.ntotal:
+        logging.error(f"[RAG] Index template must be trained, empty and {EMBEDDING_DIMENSION}-d; ignoring it")
+        return None
+    return template
+
+
+def _configure_index(index: faiss.Index) -> faiss.Index:
+    """Apply search-time settings, which aren't reliably carried by saved indexes."""
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    elif isinstance(index, faiss.IndexIVF):
+        index.nprobe = IVF_NPROBE
+        index.make_direct_map()  # Needed for reconstruct_n (see retain_only)
+    return index
+
+
+def new_faiss_index() -> faiss.Index:
+    """
+    Create an empty index for memory embeddings (L2 distance): a clone of the
+    pre-trained quantized template when one is configured, otherwise HNSW
+    (float16 vector storage unless HNSW_FP16_STORAGE is off).
+    """
+    template = _load_index_template()
+    if template is not None:
+        return _configure_index(faiss.clone_index(template))
+    if HNSW_FP16_STORAGE:
+        index = faiss.IndexHNSWSQ(EMBEDDING_DIMENSION, faiss.ScalarQuantizer.QT_fp16, HNSW_M)
+    else:
+        index = faiss.IndexHNSWFlat(EMBEDDING_DIMENSION, HNSW_M)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    return _configure_index(index)
+
+
 class RAGMemorySystem:
     """
     Advanced RAG system with Tier 1 features for AI companion.
@@ -52,33 +244,33 @@ class RAGMemorySystem:
     
     def __init__(self, user_id: str, openai_api_key: str):
         self.user_id = user_id
-        self.client = AsyncOpenAI(api_key=openai_api_key)
+        self.client = get_openai_client(openai_api_key)
         
         # FAISS index for vector search
-        self.index = faiss.IndexFlatL2(EMBEDDING_DIMENSION)
+        self.index = new_faiss_index()
         
         # Memory storage with enhanced metadata
         self.memories = []  # List of memory dicts with full metadata
         self.embedding_cache = {}  # {text_hash: embedding}
         
+        # Column views over self.memories (same order) for vectorized scoring
+        self._timestamps = np.empty(0, dtype=np.float64)
+        self._importance = np.empty(0, dtype=np.float32)
+        # Bumped on every change to the index or memories; result caches key on it
+        self.write_generation = 0
+        
         # Tier 1: Conversation context tracking
         self.conversation_context: List[str] = []  # Recent conversation turns
         self.conversation_turns: List[Dict[str, str]] = []  # Full conversation turns with user/assistant
         self.current_topic: Optional[str] = None
         self.referenced_memories: Set[int] = set()  # Track mentioned memories
         
-        # Tier 1: Importance weights by category
-        self.importance_weights = {
-            "GOAL": 2.0,           # Goals are highly important
-            "RELATIONSHIP": 1.8,   # People matter
-            "PREFERENCE": 1.5,     # User preferences
-            "EXPERIENCE": 1.3,     # Life experiences
-            "FACT": 1.2,           # Basic facts
-            "INTEREST": 1.4,       # Interests and hobbies
-            "OPINION": 1.1,        # Opinions
-            "PLAN": 1.6,           # Future plans
-            "GENERAL": 1.0         # Default
-        }
+        # Background adds waiting to be embedded and indexed together
+        self._pending_adds: List[Tuple[str, str, Optional[Dict]]] = []
+        self._add_flush_task: Optional[asyncio.Task] = None
+        
+        # Tier 1: Importance weights by category (shared, read-only)
+        self.importance_weights = CATEGORY_IMPORTANCE_WEIGHTS
         
         # Performance tracking
         self.stats = {
@@ -94,13 +286,32 @@ class RAGMemorySystem:
         
         logging.info(f"[RAG] Initialized Advanced RAG for user {user_id}")
     
-    async def create_embedding(self, text: str, use_cache: bool = True) -> np.ndarray:
+    def _append_memory(self, memory: Dict):
+        """Append a memory dict and keep the scoring columns in sync."""
+        self.memories.append(memory)
+        self._timestamps = np.append(self._timestamps, memory["timestamp"])
+        self._importance = np.append(self._importance, self.calculate_importance_score(memory))
+        self.write_generation += 1
+    
+    def _rebuild_columns(self):
+        """Recompute the scoring columns from self.memories (after bulk replace)."""
+        self._timestamps = np.fromiter(
+            (m.get("timestamp", 0.0) for m in self.memories), dtype=np.float64, count=len(self.memories)
+        )
+        self._importance = np.fromiter(
+            (self.calculate_importance_score(m) for m in self.memories), dtype=np.float32, count=len(self.memories)
+        )
+        self.write_generation += 1
+    
+    async def create_embedding(self, text: str, use_cache: bool = True, coalesce: bool = False) -> np.ndarray:
         """
         Create embedding for text with caching.
         
         Args:
             text: Text to embed
             use_cache: Whether to use cache (default True)
+            coalesce: Share an embeddings request with concurrent background adds
+                      (adds up to EMBEDDING_COALESCE_WINDOW_S; not for search queries)
         
         Returns:
             Numpy array of embedding vector
@@ -118,13 +329,15 @@ class RAGMemorySystem:
         # Create embedding
         try:
             self.stats["cache_misses"] += 1
-            response = await self.client.embeddings.create(
-                model=EMBEDDING_MODEL,
-                input=text,
-                timeout=3.0  # Reduced from 5s to 3s for faster failure
-            )
-            
-            embedding = np.array(response.data[0].embedding, dtype=np.float32)
+            if coalesce:
+                embedding = await _embedding_coalescer.embed(self.client, text)
+            else:
+                response = await self.client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=text,
+                    timeout=3.0  # Reduced from 5s to 3s for faster failure
+                )
+                embedding = np.array(response.data[0].embedding, dtype=np.float32)
             
             # Cache it
             if use_cache and CACHE_EMBEDDINGS:
@@ -142,6 +355,25 @@ class RAGMemorySystem:
             logging.error(f"[RAG] Embedding creation failed: {e}")
             return np.zeros(EMBEDDING_DIMENSION)
     
+    async def create_embeddings_batch(self, texts: List[str], timeout: float = 10.0) -> List[np.ndarray]:
+        """
+        Embed many texts with as few API calls as possible: one request per
+        EMBEDDING_BATCH_SIZE texts, all requests in flight concurrently.
+        
+        Args:
+            texts: Non-empty texts to embed
+            timeout: Per-request timeout in seconds
+        
+        Returns:
+            Embeddings in the same order as texts
+        """
+        batches = [texts[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)]
+        responses = await asyncio.gather(*(
+            self.client.embeddings.create(model=EMBEDDING_MODEL, input=batch, timeout=timeout)
+            for batch in batches
+        ))
+        return [np.array(item.embedding, dtype=np.float32) for response in responses for item in response.data]
+    
     def update_conversation_context(self, text: str):
         """
         Tier 1: Track conversation context for better retrieval.
@@ -157,7 +389,7 @@ class RAGMemorySystem:
         if len(self.conversation_context) > 10:
             self.conversation_context.pop(0)
         
-        logging.debug(f"[RAG] Updated conversation context (size: {len(self.conversation_context)})")
+        logging.debug("[RAG] Updated conversation context (size: %d)", len(self.conversation_context))
     
     def add_conversation_turn(self, user_message: str, assistant_message: str):
         """
@@ -181,7 +413,7 @@ class RAGMemorySystem:
         if len(self.conversation_turns) > 10:
             self.conversation_turns.pop(0)
         
-        logging.debug(f"[RAG] Added conversation turn (total turns: {len(self.conversation_turns)})")
+        logging.debug("[RAG] Added conversation turn (total turns: %d)", len(self.conversation_turns))
     
     def calculate_importance_score(self, memory: Dict) -> float:
         """
@@ -298,8 +530,8 @@ class RAGMemorySystem:
             return
         
         try:
-            # Create embedding asynchronously
-            embedding = await self.create_embedding(text)
+            # Create embedding asynchronously (batched with other sessions' adds)
+            embedding = await self.create_embedding(text, coalesce=True)
             
             # Add to FAISS index
             self.index.add(embedding.reshape(1, -1))
@@ -309,12 +541,11 @@ class RAGMemorySystem:
                 "text": text,
                 "category": category,
                 "timestamp": time.time(),
-                "embedding": embedding,
                 "metadata": metadata or {},
                 "access_count": 0,  # Track how often accessed
                 "last_accessed": time.time()
             }
-            self.memories.append(memory)
+            self._append_memory(memory)
             
             logging.info(f"[RAG] Added memory: [{category}] {text[:50]}...")
             
@@ -324,13 +555,94 @@ class RAGMemorySystem:
     def add_memory_background(self, text: str, category: str = "GENERAL", metadata: Dict = None):
         """
         Add memory in background (fire-and-forget, zero latency).
+        Adds queued while a flush is running are embedded and indexed as one batch.
         
         Args:
             text: Memory text
             category: Memory category
             metadata: Optional metadata
         """
-        asyncio.create_task(self.add_memory_async(text, category, metadata))
+        if not text or not text.strip():
+            return
+        self._pending_adds.append((text, category, metadata))
+        if self._add_flush_task is None or self._add_flush_task.done():
+            self._add_flush_task = asyncio.create_task(self._flush_pending_adds())
+    
+    async def _flush_pending_adds(self):
+        """Embed all queued background adds in one request and index them with one add()"""
+        while self._pending_adds:
+            pending, self._pending_adds = self._pending_adds, []
+            try:
+                # Queued together, so the coalescer sends them as one embeddings request
+                embeddings = await asyncio.gather(
+                    *(self.create_embedding(text, coalesce=True) for text, _, _ in pending)
+                )
+                # Zero vectors mean the embedding failed - don't index them
+                added = [
+                    (item, embedding) for item, embedding in zip(pending, embeddings)
+                    if np.any(embedding)
+                ]
+                if not added:
+                    continue
+                
+                now = time.time()
+                added = self._drop_near_duplicates(added, now)
+                if not added:
+                    continue
+                
+                self.index.add(np.vstack([embedding for _, embedding in added]))
+                for (text, category, metadata), _ in added:
+                    self._append_memory({
+                        "text": text,
+                        "category": category,
+                        "timestamp": now,
+                        "metadata": metadata or {},
+                        "access_count": 0,
+                        "last_accessed": now
+                    })
+                logging.info(f"[RAG] Added {len(added)} memories in background")
+            except Exception as e:
+                logging.error(f"[RAG] Failed to add {len(pending)} background memories: {e}")
+    
+    def _drop_near_duplicates(self, added: List[Tuple], now: float) -> List[Tuple]:
+        """
+        Filter (item, embedding) pairs down to those not already represented.
+        A near duplicate of an indexed memory bumps that memory's duplicate count
+        and timestamp instead; near duplicates within the batch keep the first.
+        
+        Args:
+            added: (queued add, embedding) pairs, in queue order
+            now: Timestamp for refreshed memories
+            
+        Returns:
+            The pairs to index
+        """
+        vecs = np.vstack([embedding for _, embedding in added]).astype(np.float32)
+        vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+        keep = np.ones(len(added), dtype=bool)
+        
+        # Index distances are squared L2; for unit vectors that is 2 - 2*cosine
+        if self.index.ntotal:
+            distances, indices = self.index.search(vecs, 1)
+            for j, (dist, idx) in enumerate(zip(distances[:, 0], indices[:, 0])):
+                if 0 <= idx < len(self.memories) and dist <= 2 * (1 - NEAR_DUPLICATE_COSINE):
+                    keep[j] = False
+                    memory = self.memories[idx]
+                    metadata = memory.setdefault("metadata", {})
+                    metadata["duplicate_count"] = metadata.get("duplicate_count", 0) + 1
+                    memory["timestamp"] = now
+                    self._timestamps[idx] = now
+                    self.write_generation += 1
+        
+        sims = vecs @ vecs.T
+        for j in range(1, len(added)):
+            if keep[j] and (sims[j, :j][keep[:j]] >= NEAR_DUPLICATE_COSINE).any():
+                keep[j] = False
+        
+        skipped = len(added) - int(keep.sum())
+        if skipped:
+            logging.info(f"[RAG] Skipped {skipped} near-duplicate memories")
+        return [pair for pair, k in zip(added, keep) if k]
     
     async def retrieve_relevant_memories(
         self, 
@@ -390,69 +702,88 @@ class RAGMemorySystem:
                     if idx not in all_candidates or similarity > all_candidates[idx]:
                         all_candidates[idx] = similarity
             
-            # Build and score results
-            scored_results = []
+            if not all_candidates:
+                return []
             
-            for idx, base_similarity in all_candidates.items():
-                memory = self.memories[idx]
-                
-                # Apply basic filters
-                if category_filter and memory["category"] != category_filter:
-                    continue
-                
-                if time_filter:
-                    mem_time = memory["timestamp"]
-                    if mem_time < time_filter[0] or mem_time > time_filter[1]:
-                        continue
+            # Build and score results (vectorized over the candidate set)
+            idxs = np.fromiter(all_candidates.keys(), dtype=np.int64, count=len(all_candidates))
+            base_sims = np.fromiter(all_candidates.values(), dtype=np.float64, count=len(all_candidates))
+            timestamps = self._timestamps[idxs]
+            
+            # Apply basic filters
+            keep = np.ones(len(idxs), dtype=bool)
+            if category_filter:
+                keep &= np.fromiter(
+                    (self.memories[i]["category"] == category_filter for i in idxs), dtype=bool, count=len(idxs)
+                )
+            if time_filter:
+                keep &= (timestamps >= time_filter[0]) & (timestamps <= time_filter[1])
+            idxs, base_sims, timestamps = idxs[keep], base_sims[keep], timestamps[keep]
+            
+            # Tier 1: Calculate enhanced score
+            final_scores = base_sims.copy()
+            
+            if use_advanced_features and len(idxs):
+                # Importance scoring (precomputed per memory)
+                importance = self._importance[idxs]
+                final_scores *= importance
+                self.stats["importance_boosts"] += int(np.count_nonzero(importance > 1.0))
                 
-                # Tier 1: Calculate enhanced score
-                final_score = base_similarity
+                # Temporal scoring: 1.0 now, 0.5 at TIME_DECAY_HOURS
+                if ENABLE_TEMPORAL_FILTERING:
+                    age_hours = (time.time() - timestamps) / 3600
+                    temporal = 0.5 ** (age_hours / TIME_DECAY_HOURS)
+                else:
+                    temporal = np.ones(len(idxs))
+                final_scores = (
+                    final_scores * (1 - RECENCY_WEIGHT) +  # Similarity component
+                    final_scores * temporal * RECENCY_WEIGHT  # Recency component
+                )
+                self.stats["temporal_boosts"] += int(np.count_nonzero(temporal < 1.0))
                 
-                if use_advanced_features:
-                    # Importance scoring
-                    importance = self.calculate_importance_score(memory)
-                    final_score *= importance
-                    if importance > 1.0:
-                        self.stats["importance_boosts"] += 1
-                    
-                    # Temporal scoring
-                    temporal = self.calculate_temporal_score(memory["timestamp"])
-                    final_score = (
-                        final_score * (1 - RECENCY_WEIGHT) +  # Similarity component
-                        final_score * temporal * RECENCY_WEIGHT  # Recency component
-                    )
-                    if temporal < 1.0:
-                        self.stats["temporal_boosts"] += 1
-                    
-                    # Conversation context bonus
-                    if self.conversation_context:
-                        memory_text = memory["text"].lower()
-                        for context_turn in self.conversation_context[-3:]:  # Last 3 turns
-                            if any(word in memory_text for word in context_turn.lower().split()[:5]):
-                                final_score *= 1.2  # 20% boost for context match
-                                self.stats["context_matches"] += 1
-                                break
-                    
-                    # Avoid recently referenced memories (diversity)
-                    if idx in self.referenced_memories:
-                        final_score *= 0.7  # Penalty for repetition
+                # Conversation context bonus
+                if self.conversation_context:
+                    context_words = [turn.lower().split()[:5] for turn in self.conversation_context[-3:]]  # Last 3 turns
+                    for j, idx in enumerate(idxs):
+                        memory_text = self.memories[idx]["text"].lower()
+                        if any(any(word in memory_text for word in words) for words in context_words):
+                            final_scores[j] *= 1.2  # 20% boost for context match
+                            self.stats["context_matches"] += 1
                 
-                scored_results.append({
+                # Avoid recently referenced memories (diversity)
+                if self.referenced_memories:
+                    referenced = np.isin(idxs, list(self.referenced_memories))
+                    final_scores[referenced] *= 0.7  # Penalty for repetition
+            
+            # Sort by final score and materialize only the top_k results, skipping
+            # texts already taken (the same memory can be indexed more than once)
+            order = np.argsort(-final_scores, kind="stable")
+            results = []
+            seen_texts = set()
+            for j in order:
+                if len(results) == top_k:
+                    break
+                idx = int(idxs[j])
+                memory = self.memories[idx]
+                text_key = " ".join(memory["text"].lower().split())
+                if text_key in seen_texts:
+                    continue
+                seen_texts.add(text_key)
+                results.append({
                     "memory_idx": idx,
                     "text": memory["text"],
                     "category": memory["category"],
                     "timestamp": memory["timestamp"],
-                    "similarity": float(base_similarity),
-                    "final_score": float(final_score),
+                    "similarity": float(base_sims[j]),
+                    "final_score": float(final_scores[j]),
                     "metadata": memory.get("metadata", {})
                 })
             
-            # Sort by final score
-            scored_results.sort(key=lambda x: x["final_score"], reverse=True)
-            
-            # Take top_k and mark as referenced
-            results = scored_results[:top_k]
+            # Present the chosen snippets in a fixed order so the prompt stays
+            # stable when the same set is retrieved again
+            results = _order_snippets(results)
             
+            # Mark as referenced
             if use_advanced_features:
                 for result in results:
                     self.referenced_memories.add(result["memory_idx"])
@@ -537,14 +868,20 @@ class RAGMemorySystem:
             "context_match_rate": self.stats["context_matches"] / max(1, self.stats["retrievals"])
         }
     
-    async def load_from_supabase(self, supabase_client, limit: int = 500):
+    async def load_from_supabase(self, supabase_client, limit: int = 500, offset: int = 0):
         """
         Load recent memories from Supabase and build FAISS index.
         Uses ONLY the full UUID for querying (no prefix handling).
+        Rows already in the index (e.g. a RAG instance reused from an earlier
+        session in this process) are skipped, so they are not re-embedded.
         
         Args:
             supabase_client: Supabase client instance
             limit: Maximum memories to load
+            offset: Number of newest memories to skip (for paging past rows loaded earlier)
+            
+        Returns:
+            The fetched memory rows, or None if the query failed
         """
         try:
             from core.user_id import UserId, UserIdError
@@ -558,127 +895,200 @@ class RAGMemorySystem:
                 return
             
             logging.info(f"[RAG] Loading memories from Supabase for user {UserId.format_for_display(self.user_id)}...")
-            print(f"[DEBUG][DB] Querying memory table for user_id: {self.user_id} (full UUID), limit: {limit}")
+            logging.debug("[DB] Querying memory table for user_id: %s (full UUID), limit: %d", self.user_id, limit)
             
             # Query using ONLY the full UUID - no prefix handling
-            try:
-                result = (
+            # (off the event loop, so concurrent startup queries actually overlap).
+            # Rows are fetched in pages and each page is embedded + indexed as soon as it
+            # arrives, so embedding overlaps the download of the remaining pages.
+            stop = offset + limit
+            
+            def fetch_page(start: int):
+                return (
                     supabase_client.table("memory")
                     .select("category, key, value, created_at")
                     .eq("user_id", self.user_id)
                     .order("created_at", desc=True)
-                    .limit(limit)
+                    .range(start, min(start + LOAD_PAGE_SIZE, stop) - 1)
                     .execute()
                 )
+            
+            async def fetch_and_index(start: int) -> List[Dict]:
+                result = await asyncio.to_thread(fetch_page, start)
+                if getattr(result, "error", None):
+                    raise RuntimeError(f"Supabase select error: {result.error}")
+                rows = result.data or []
+                await self.load_from_rows(rows)
+                return rows
+            
+            # First page alone: most users have fewer memories than one page, and
+            # only a full page means there may be more to fetch
+            try:
+                first_rows = await asyncio.to_thread(fetch_page, offset)
+                if getattr(first_rows, "error", None):
+                    raise RuntimeError(f"Supabase select error: {first_rows.error}")
+                first_rows = first_rows.data or []
             except Exception as select_err:
                 logging.error(f"[RAG] ❌ Select failed for user_id={self.user_id}: {select_err}")
                 print(f"[RAG] ❌ Query failed: {select_err}")
                 return
             
-            if getattr(result, "error", None):
-                logging.error(f"[RAG] ❌ Supabase select error: {result.error}")
-                print(f"[RAG] ❌ Supabase error: {result.error}")
-                return
+            pages = [first_rows]
+            page_failed = False
+            if len(first_rows) == LOAD_PAGE_SIZE and offset + LOAD_PAGE_SIZE < stop:
+                results = await asyncio.gather(
+                    self.load_from_rows(first_rows),
+                    *(fetch_and_index(start) for start in range(offset + LOAD_PAGE_SIZE, stop, LOAD_PAGE_SIZE)),
+                    return_exceptions=True
+                )
+                for page in results[1:]:
+                    if isinstance(page, Exception):
+                        logging.error(f"[RAG] ❌ Page fetch failed for user_id={self.user_id}: {page}")
+                        page_failed = True
+                    else:
+                        pages.append(page)
+            else:
+                await self.load_from_rows(first_rows)
             
-            memories_data = result.data if result.data else []
+            memories_data = [row for page in pages for row in page]
             
             logging.info(f"[RAG] Loaded {len(memories_data)} memories from database")
-            print(f"[DEBUG][DB] ✅ Query returned {len(memories_data)} memories from database")
+            logging.debug("[DB] ✅ Query returned %d memories from database (%d page(s))", len(memories_data), len(pages))
             
             # DEBUG: Show sample of memories
-            if memories_data:
-                print(f"[DEBUG][DB] Sample memories retrieved:")
-                for i, mem in enumerate(memories_data[:3], 1):
-                    print(f"[DEBUG][DB]   #{i}: [{mem.get('category')}] {mem.get('value', '')[:60]}...")
-            else:
-                from core.user_id import UserId
-                print(f"[DEBUG][DB] ⚠️  No memories found in database for user {UserId.format_for_display(self.user_id)}")
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                if memories_data:
+                    logging.debug("[DB] Sample memories retrieved:")
+                    for i, mem in enumerate(memories_data[:3], 1):
+                        logging.debug("[DB]   #%d: [%s] %s...", i, mem.get('category'), mem.get('value', '')[:60])
+                else:
+                    logging.debug("[DB] ⚠️  No memories found in database for user %s", UserId.format_for_display(self.user_id))
+            
+            # Partial result: don't report it as the full row set (callers prune the index by it)
+            return None if page_failed else memories_data
             
+        except Exception as e:
+            logging.error(f"[RAG] Failed to load from Supabase: {e}")
+            logging.debug("[DB] Load failure details", exc_info=True)
+    
+    async def load_from_rows(self, memories_data: List[Dict]):
+        """
+        Embed memory rows (as selected from the memory table) and add them to the index.
+        Used by load_from_supabase and by callers that already fetched the rows
+        (e.g. the startup bootstrap bundle), so no extra database call is made.
+        
+        Args:
+            memories_data: Rows with category, key, value (and optionally created_at)
+        """
+        try:
             # OPTIMIZED: Batch create all embeddings in ONE API call
+            already_indexed = {(m["category"], m["text"]) for m in self.memories}
             texts_to_embed = []
             valid_indices = []
+            skipped = 0
             for i, mem in enumerate(memories_data):
                 text = mem.get("value", "")
                 if text and text.strip():
+                    if (mem.get("category", "GENERAL"), text) in already_indexed:
+                        skipped += 1
+                        continue
                     texts_to_embed.append(text)
                     valid_indices.append(i)
+            if skipped:
+                print(f"[RAG] Skipping {skipped} memories already in the index")
             
-            print(f"[DEBUG][DB] Creating embeddings for {len(texts_to_embed)} memories in SINGLE batch call...")
+            logging.debug("[DB] Creating embeddings for %d memories in batches of %d...", len(texts_to_embed), EMBEDDING_BATCH_SIZE)
             
             embeddings = []
             if texts_to_embed:
                 try:
-                    # BATCH API call - all texts at once!
-                    response = await self.client.embeddings.create(
-                        model=EMBEDDING_MODEL,
-                        input=texts_to_embed,
-                        timeout=10.0
-                    )
-                    
-                    # Extract embeddings in order
-                    embeddings = [np.array(item.embedding, dtype=np.float32) for item in response.data]
+                    # BATCH API calls - EMBEDDING_BATCH_SIZE texts each, requested concurrently
+                    embeddings = await self.create_embeddings_batch(texts_to_embed, timeout=10.0)
                     
-                    print(f"[DEBUG][DB] ✅ Batch embeddings created: {len(embeddings)} total")
-                    print(f"[DEBUG][DB] Successful: {len(embeddings)}, Failed: 0")
+                    logging.debug("[DB] ✅ Batch embeddings created: %d total", len(embeddings))
                     
                     # Update stats
                     self.stats["embeddings_created"] += len(embeddings)
                     
                 except Exception as e:
                     logging.error(f"[RAG] Batch embedding failed: {e}")
-                    print(f"[DEBUG][DB] ❌ Batch embedding failed: {e}")
-                    print(f"[DEBUG][DB] Successful: 0, Failed: {len(texts_to_embed)}")
+                    logging.debug("[DB] Successful: 0, Failed: %d", len(texts_to_embed))
                 
-                # Add to FAISS index - match embeddings with valid memories
+                # Add to FAISS index in ONE call - match embeddings with valid memories
                 added_count = 0
-                for embed_idx, mem_idx in enumerate(valid_indices):
-                    if embed_idx < len(embeddings):
-                        embedding = embeddings[embed_idx]
-                        mem = memories_data[mem_idx]
-                        
-                        # Add to index
-                        self.index.add(embedding.reshape(1, -1))
-                        
-                        # Store memory
-                        self.memories.append({
-                            "text": mem.get("value", ""),
-                            "category": mem.get("category", "GENERAL"),
-                            "timestamp": time.time(),  # Use current time or parse created_at
-                            "embedding": embedding,
-                            "metadata": {"key": mem.get("key")}
-                        })
-                        added_count += 1
+                if embeddings:
+                    self.index.add(np.vstack(embeddings))
+                for mem_idx in valid_indices[:len(embeddings)]:
+                    mem = memories_data[mem_idx]
+                    
+                    # Store memory
+                    self._append_memory({
+                        "text": mem.get("value", ""),
+                        "category": mem.get("category", "GENERAL"),
+                        "timestamp": time.time(),  # Use current time or parse created_at
+                        "metadata": {"key": mem.get("key")}
+                    })
+                    added_count += 1
                 
                 logging.info(f"[RAG] ✓ Indexed {len(self.memories)} memories")
-                print(f"[DEBUG][DB] ✅ Added {added_count} memories to FAISS index")
-                print(f"[DEBUG][DB] Total memories in RAG: {len(self.memories)}")
-                print(f"[DEBUG][DB] FAISS index size: {self.index.ntotal}")
+                logging.debug("[DB] ✅ Added %d memories to FAISS index (total %d, index size %d)",
+                              added_count, len(self.memories), self.index.ntotal)
             else:
-                print(f"[DEBUG][DB] ⚠️  No embedding tasks created - no valid memory text found")
+                logging.debug("[DB] ⚠️  No embedding tasks created - no valid memory text found")
             
         except Exception as e:
-            logging.error(f"[RAG] Failed to load from Supabase: {e}")
-            print(f"[DEBUG][DB] ❌ Error loading from Supabase: {type(e).__name__}: {str(e)}")
-            import traceback
-            print(f"[DEBUG][DB] Traceback: {traceback.format_exc()}")
+            logging.error(f"[RAG] Failed to index memory rows: {e}")
+            print(f"[RAG] ❌ Error indexing memory rows: {type(e).__name__}: {e}")
+    
+    def retain_only(self, keep: Set[Tuple[str, str]]) -> int:
+        """
+        Drop indexed memories whose (category, text) is not in keep, e.g. rows
+        deleted from the database since a cached index was saved.
+        
+        Args:
+            keep: (category, text) pairs that should stay indexed
+            
+        Returns:
+            Number of memories removed
+        """
+        kept = [i for i, m in enumerate(self.memories) if (m["category"], m["text"]) in keep]
+        removed = len(self.memories) - len(kept)
+        if removed == 0:
+            return 0
+        
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)[kept] if kept else None
+        self.index = new_faiss_index()
+        if vectors is not None:
+            self.index.add(vectors)
+        self.memories = [self.memories[i] for i in kept]
+        self._rebuild_columns()
+        logging.info(f"[RAG] Removed {removed} stale memories from index")
+        return removed
     
     def save_index(self, filepath: str):
         """Save FAISS index and memories to disk."""
         try:
+            # Write to temp files and rename into place, so other worker processes
+            # reading the same snapshot never see a partially written file
+            tmp_suffix = f".{os.getpid()}.tmp"
+            
             # Save FAISS index
-            faiss.write_index(self.index, f"{filepath}.faiss")
+            faiss.write_index(self.index, f"{filepath}.faiss{tmp_suffix}")
             
             # Save memories (without embeddings to save space)
             memories_to_save = [
                 {k: v for k, v in m.items() if k != "embedding"}
                 for m in self.memories
             ]
-            with open(f"{filepath}.pkl", "wb") as f:
+            with open(f"{filepath}.pkl{tmp_suffix}", "wb") as f:
                 pickle.dump({
                     "memories": memories_to_save,
                     "stats": self.stats
                 }, f)
             
+            os.replace(f"{filepath}.pkl{tmp_suffix}", f"{filepath}.pkl")
+            os.replace(f"{filepath}.faiss{tmp_suffix}", f"{filepath}.faiss")
+            
             logging.info(f"[RAG] Saved index to {filepath}")
         except Exception as e:
             logging.error(f"[RAG] Failed to save index: {e}")
@@ -687,19 +1097,49 @@ class RAGMemorySystem:
         """Load FAISS index and memories from disk."""
         try:
             # Load FAISS index
-            self.index = faiss.read_index(f"{filepath}.faiss")
+            index = faiss.read_index(f"{filepath}.faiss")
             
             # Load memories
             with open(f"{filepath}.pkl", "rb") as f:
                 data = pickle.load(f)
-                self.memories = data.get("memories", [])
-                self.stats = data.get("stats", self.stats)
+            memories = data.get("memories", [])
+            
+            # Another worker may have replaced one file between the two reads
+            if index.ntotal != len(memories):
+                raise ValueError(f"index has {index.ntotal} vectors but {len(memories)} memories")
+            
+            self.index = _configure_index(index)
+            self.memories = memories
+            self.stats = data.get("stats", self.stats)
+            self._rebuild_columns()
             
             logging.info(f"[RAG] Loaded {len(self.memories)} memories from {filepath}")
         except Exception as e:
             logging.warning(f"[RAG] Could not load index: {e}")
 
 
+    def to_snapshot(self) -> Dict:
+        """
+        Serialize the index and memories (without embeddings) into a JSON-safe dict,
+        for storing outside the process (e.g. Redis).
+        """
+        return {
+            "index": base64.b64encode(faiss.serialize_index(self.index).tobytes()).decode("ascii"),
+            "memories": [
+                {k: v for k, v in m.items() if k != "embedding"}
+                for m in self.memories
+            ],
+        }
+    
+    def load_snapshot(self, snapshot: Dict):
+        """Replace the index and memories with a snapshot from to_snapshot()."""
+        raw = np.frombuffer(base64.b64decode(snapshot["index"]), dtype=np.uint8)
+        self.index = _configure_index(faiss.deserialize_index(raw))
+        self.memories = list(snapshot.get("memories", []))
+        self._rebuild_columns()
+        logging.info(f"[RAG] Loaded {len(self.memories)} memories from snapshot")
+
+
 # Global RAG instance (initialized per user)
 user_rag_systems = {}  # {user_id: RAGMemorySystem}
 
@@ -717,17 +1157,19 @@ def get_or_create_rag(user_id: str, openai_api_key: str) -> RAGMemorySystem:
         print(f"[RAG] ❌ CRITICAL: Invalid user_id: {e}")
         raise
     
-    print(f"[DEBUG][RAG] get_or_create_rag called for user {UserId.format_for_display(user_id)}")
-    print(f"[DEBUG][RAG] Current user_rag_systems keys: {[UserId.format_for_display(uid) for uid in user_rag_systems.keys()]}")
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+    if debug:
+        logging.debug("[RAG] get_or_create_rag called for user %s", UserId.format_for_display(user_id))
+        logging.debug("[RAG] Current user_rag_systems keys: %s", [UserId.format_for_display(uid) for uid in user_rag_systems])
     
     if user_id not in user_rag_systems:
-        print(f"[DEBUG][RAG] 🆕 Creating NEW RAG instance for {UserId.format_for_display(user_id)}")
+        logging.debug("[RAG] 🆕 Creating NEW RAG instance for %s", UserId.format_for_display(user_id))
         user_rag_systems[user_id] = RAGMemorySystem(user_id, openai_api_key)
-        print(f"[DEBUG][RAG] ✅ RAG instance created and stored in global dict")
-    else:
+        logging.debug("[RAG] ✅ RAG instance created and stored in global dict")
+    elif debug:
         existing_rag = user_rag_systems[user_id]
-        print(f"[DEBUG][RAG] ♻️  Returning EXISTING RAG for {UserId.format_for_display(user_id)}")
-        print(f"[DEBUG][RAG]    Existing RAG has {len(existing_rag.memories)} memories")
-        print(f"[DEBUG][RAG]    FAISS index size: {existing_rag.index.ntotal}")
+        logging.debug("[RAG] ♻️  Returning EXISTING RAG for %s", UserId.format_for_display(user_id))
+        logging.debug("[RAG]    Existing RAG has %d memories", len(existing_rag.memories))
+        logging.debug("[RAG]    FAISS index size: %d", existing_rag.index.ntotal)
     
     return user_rag_systems[user_id]
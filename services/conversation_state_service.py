@@ -4,13 +4,15 @@ Based on Social Penetration Theory for depth and breadth in conversations
 """
 
 import asyncio
-import json
+import math
+import re
 from typing import Dict, Optional, Tuple
 from datetime import datetime
 from supabase import Client
 from core.validators import get_current_user_id
-from infrastructure.connection_pool import get_connection_pool
 from infrastructure.redis_cache import get_redis_cache
+from infrastructure.categorization_batcher import get_categorization_batcher
+from infrastructure.database_batcher import get_db_batcher_sync
 
 
 # Conversation stages based on Social Penetration Theory
@@ -27,6 +29,222 @@ DEFAULT_TRUST_SCORE = 3.0
 MIN_TRUST = 0.0
 MAX_TRUST = 10.0
 
+# Per-stage guidance appended to the assistant instructions
+_STAGE_GUIDANCE = {
+    "ORIENTATION": """
+## Current Stage: ORIENTATION (Trust: Building)
+**Goal**: Build safety and comfort through light conversation.
+
+**Approach**:
+- Use warm, friendly greetings
+- Ask simple, non-intrusive questions
+- Show genuine interest and active listening
+- Offer one small, easy "win" (micro-action <5 min)
+- Avoid pushing for personal details
+
+**Topics**: Weather, general interests, daily activities, light topics
+**Trust Building**: Consistency, warmth, respect boundaries
+""",
+    "ENGAGEMENT": """
+## Current Stage: ENGAGEMENT (Trust: Growing)
+**Goal**: Explore breadth across life domains to identify energetic areas.
+
+**Approach**:
+- Explore multiple life areas (work, family, health, interests, habits)
+- Ask open-ended questions
+- Identify one domain that energizes them
+- Continue offering small wins
+- Show you remember previous conversations
+
+**Topics**: Work, family, hobbies, health, learning, finances (surface level)
+**Trust Building**: Remember details, show genuine curiosity, celebrate shares
+""",
+    "GUIDANCE": """
+## Current Stage: GUIDANCE (Trust: Established)
+**Goal**: Go deeper with consent and offer meaningful guidance.
+
+**Approach**:
+- **Ask for consent** before going deeper ("Would you like to explore this more?")
+- Discuss feelings, needs, triggers (if comfortable)
+- Offer one actionable skill or reframing technique
+- Validate emotions and experiences
+- Back off if any discomfort signals
+
+**Topics**: Emotions, underlying needs, patterns, gentle challenges
+**Trust Building**: Respect consent, validate feelings, offer useful insights
+""",
+    "REFLECTION": """
+## Current Stage: REFLECTION (Trust: Strong)
+**Goal**: Help reflect on progress and build sustainable routines.
+
+**Approach**:
+- Review progress on previous micro-actions
+- Set small, sustainable routines
+- Address obstacles with problem-solving
+- Celebrate small wins
+- Encourage self-reflection
+
+**Topics**: Progress review, habit formation, obstacle handling, next steps
+**Trust Building**: Acknowledge progress, support through setbacks, consistency
+""",
+    "INTEGRATION": """
+## Current Stage: INTEGRATION (Trust: Deep)
+**Goal**: Identity-level insights and choosing next growth area.
+
+**Approach**:
+- Facilitate identity-level reflection ("Who am I becoming?")
+- Celebrate consistent growth
+- Help choose next focus area or domain
+- Acknowledge transformation
+- Maintain deep, authentic connection
+
+**Topics**: Identity, values, long-term vision, life purpose, next chapter
+**Trust Building**: Deep authenticity, celebrate transformation, honor growth
+"""
+}
+
+# Stage analysis prompt, built once at import; each call only fills in the fields
+_STAGE_DESCRIPTIONS = {
+    "ORIENTATION": "Safety, comfort, light small talk, building rapport",
+    "ENGAGEMENT": "Exploring breadth - work, family, interests, habits, general topics",
+    "GUIDANCE": "Going deeper with consent - feelings, needs, triggers, offering guidance",
+    "REFLECTION": "Reflecting on progress, setting routines, handling obstacles",
+    "INTEGRATION": "Identity-level insights, celebrating growth, choosing next focus"
+}
+
+# Kept compact: the prompt is sent on every non-trivial turn, so its size is most of
+# the analysis cost. Output keys are what suggest_stage_transition reads
+_STAGE_ANALYSIS_SYSTEM = "You judge whether a companion chat should advance to its next conversation stage. Favor progression when in doubt. Reply with JSON only."
+
+_STAGE_ANALYSIS_PROMPT = """Stage: {current_stage} ({current_stage_desc}); trust {current_trust:.1f}/10
+Next: {next_stage} ({next_stage_desc})
+Profile: {profile_excerpt}
+Message: "{user_input}"
+
+Transition if the user shares anything personal, replies with more than one word, asks questions or keeps the conversation going (trust >3 for ENGAGEMENT+, >4 for GUIDANCE+). Stay only if replies are repeatedly single words, the user asks for lighter talk, or shows distress.
+
+JSON: {{"should_transition": bool, "confidence": 0-1, "reason": "<10 words", "trust_adjustment": -2.0 to 3.0, "detected_signals": [short tags]}}"""
+
+# Local pre-classifier for stage analysis: messages these rules decide with
+# high confidence never reach the LLM
+_WORD_RE = re.compile(r"\w+")
+_LIGHTER_TOPIC_RE = re.compile(
+    r"\b(change the (topic|subject)|talk about something else|don'?t want to talk|"
+    r"not comfortable|let'?s keep it light|"
+    r"topic (badlo|badal do|change karo)|kuch aur baat karo|"
+    r"(is|us) (bare|baare) mein baat nahi|baat nahi karn[ai]( chahta| chahti)?)\b|"
+    r"موضوع بدل|کچھ اور بات کر|(اس|اُس) بارے میں بات نہیں|بات نہیں کرن",
+    re.IGNORECASE
+)
+_LOCAL_STAGE_CONFIDENCE = 0.9
+
+# Personal-disclosure scorer: a small hand-weighted logistic model over cheap
+# features. Messages it scores above the threshold are treated as the LLM would
+# (the analysis prompt favors progression on any personal detail); everything in
+# between still goes to the LLM.
+_FIRST_PERSON_RE = re.compile(
+    r"\b(i|i'm|im|i've|my|me|mine|main|mera|meri|mere|mujhe|hum|hamara)\b|میں|میرا|میری|میرے|مجھے|ہمارا",
+    re.IGNORECASE
+)
+_PERSONAL_TOPIC_RE = re.compile(
+    r"\b(family|mother|father|mom|dad|brother|sister|wife|husband|son|daughter|friend|"
+    r"job|work|office|study|university|school|college|"
+    r"dream|goal|hobby|ammi|abbu|bhai|behen|dost|kaam|naukri|parhai)\b|"
+    r"امی|ابو|بھائی|بہن|دوست|کام|نوکری|پڑھائی",
+    re.IGNORECASE
+)
+# Distress pulls the score down: the analysis prompt stays put when the user is
+# struggling, so these messages must never be pushed deeper locally
+_DISTRESS_RE = re.compile(
+    r"\b(worr(y|ied|ying)|stress(ed|ful)?|anxious|anxiety|depressed|sad|scared|afraid|"
+    r"upset|lonely|hopeless|crying|can'?t sleep|cannot sleep|sick|ill|"
+    r"pareshan|pareshaan|tension|udaas|udas|dukhi|ghabra\w*|dar lag\w*|"
+    r"neend nahi\w*|bimar|beemar|ro rah[aie])\b|"
+    r"پریشان|ٹینشن|اداس|دکھی|گھبرا|ڈر لگ|نیند نہیں|بیمار|رو رہ",
+    re.IGNORECASE
+)
+# words, first-person hits, topic hits, question, distress hits
+_DISCLOSURE_WEIGHTS = (0.12, 0.9, 1.1, 0.6, -1.5)
+_DISCLOSURE_BIAS = -3.2
+_LOCAL_TRANSITION_THRESHOLD = 0.75
+# Trust a local transition needs, by target stage (the prompt's ">3 for ENGAGEMENT+,
+# >4 for GUIDANCE+" gates); below it the LLM decides
+_LOCAL_TRANSITION_MIN_TRUST = {
+    "ENGAGEMENT": 3.0,
+    "GUIDANCE": 4.0,
+    "REFLECTION": 4.0,
+    "INTEGRATION": 4.0,
+}
+
+
+def _disclosure_probability(text: str) -> float:
+    """Probability that a message shares personal information (0.0-1.0)"""
+    features = (
+        min(len(_WORD_RE.findall(text)), 25),
+        min(len(_FIRST_PERSON_RE.findall(text)), 3),
+        min(len(_PERSONAL_TOPIC_RE.findall(text)), 3),
+        1.0 if ("?" in text or "؟" in text) else 0.0,
+        min(len(_DISTRESS_RE.findall(text)), 3),
+    )
+    z = _DISCLOSURE_BIAS + sum(w * x for w, x in zip(_DISCLOSURE_WEIGHTS, features))
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def _classify_stage_locally(user_input: str, next_stage: str, current_trust: float) -> Optional[Dict]:
+    """
+    Cheap rule-based stage analysis for unambiguous messages.
+    
+    Args:
+        user_input: Recent user message
+        next_stage: Stage a transition would move to
+        current_trust: Current trust score (gates local transitions)
+        
+    Returns:
+        Analysis dict (same shape as the LLM response), or None when the
+        message needs the LLM
+    """
+    text = (user_input or "").strip()
+    
+    if _LIGHTER_TOPIC_RE.search(text):
+        return {
+            "should_transition": False,
+            "confidence": _LOCAL_STAGE_CONFIDENCE,
+            "reason": "User asked for lighter conversation",
+            "trust_adjustment": 0.0,
+            "detected_signals": ["lighter_topic_request"]
+        }
+    
+    # Only a bare one-word (or empty) reply is unambiguous; anything longer
+    # counts toward progression per the prompt, so the LLM weighs it
+    if len(_WORD_RE.findall(text)) <= 1 and "?" not in text and "؟" not in text:
+        return {
+            "should_transition": False,
+            "confidence": _LOCAL_STAGE_CONFIDENCE,
+            "reason": "Single-word reply - no depth signal",
+            "trust_adjustment": 0.0,
+            "detected_signals": ["short_reply"]
+        }
+    
+    # Distress and low trust are judgement calls - leave them to the LLM
+    if _DISTRESS_RE.search(text):
+        return None
+    
+    min_trust = _LOCAL_TRANSITION_MIN_TRUST.get(next_stage)
+    if min_trust is None or current_trust <= min_trust:
+        return None
+    
+    disclosure = _disclosure_probability(text)
+    if disclosure >= _LOCAL_TRANSITION_THRESHOLD:
+        return {
+            "should_transition": True,
+            "confidence": round(disclosure, 2),
+            "reason": "User shared personal information",
+            "trust_adjustment": 1.0,
+            "detected_signals": ["personal_disclosure"]
+        }
+    
+    return None
+
 
 class ConversationStateService:
     """
@@ -155,15 +373,20 @@ class ConversationStateService:
                 })
                 update_data["stage_history"] = stage_history
             
-            # Upsert to database with conflict resolution on user_id
-            resp = await asyncio.to_thread(
-                lambda: self.supabase.table("conversation_state")
-                .upsert(update_data, on_conflict="user_id")
-                .execute()
-            )
+            # Upsert to database with conflict resolution on user_id, coalesced with
+            # concurrent writes (memories, profile) into the batcher's next flush
+            batcher = get_db_batcher_sync()
+            if batcher is not None and batcher.supabase is not None:
+                error = await batcher.enqueue_write("conversation_state", update_data, "user_id")
+            else:
+                resp = await asyncio.to_thread(
+                    lambda: self.supabase.table("conversation_state")
+                    .upsert(update_data, on_conflict="user_id")
+                    .execute()
+                )
+                error = getattr(resp, "error", None)
             
             # Check for errors
-            error = getattr(resp, "error", None)
             if error:
                 error_dict = error if isinstance(error, dict) else {}
                 error_code = error_dict.get("code", "")
@@ -179,7 +402,7 @@ class ConversationStateService:
                     # This allows the system to work with in-memory state
                     pass  # Don't return False
                 else:
-                    print(f"[STATE SERVICE] update_state failed: {error_dict}")
+                    print(f"[STATE SERVICE] update_state failed: {error_dict or error_msg}")
                     return False
             
             # Invalidate cache (or update it with new state if DB failed)
@@ -279,79 +502,42 @@ class ConversationStateService:
                     "trust_adjustment": 0.0
                 }
             
-            # Use AI to analyze
-            pool = await get_connection_pool()
-            client = pool.get_openai_client(async_client=True)
-            
-            # Stage descriptions
-            stage_descriptions = {
-                "ORIENTATION": "Safety, comfort, light small talk, building rapport",
-                "ENGAGEMENT": "Exploring breadth - work, family, interests, habits, general topics",
-                "GUIDANCE": "Going deeper with consent - feelings, needs, triggers, offering guidance",
-                "REFLECTION": "Reflecting on progress, setting routines, handling obstacles",
-                "INTEGRATION": "Identity-level insights, celebrating growth, choosing next focus"
-            }
-            
-            current_stage_desc = stage_descriptions.get(current_stage, "")
+            # Unambiguous messages are decided locally - no API call
             next_stage = STAGES[STAGES.index(current_stage) + 1] if STAGES.index(current_stage) < len(STAGES) - 1 else current_stage
-            next_stage_desc = stage_descriptions.get(next_stage, "")
+            local_analysis = _classify_stage_locally(user_input, next_stage, current_trust)
+            if local_analysis is not None:
+                print(f"[STATE SERVICE] Stage analysis (local): {local_analysis['reason']}")
+                return {
+                    "current_stage": current_stage,
+                    "suggested_stage": next_stage if local_analysis["should_transition"] else current_stage,
+                    **local_analysis
+                }
             
-            prompt = f"""
-Analyze if the user is ready to progress to the next conversation stage.
-BE OPTIMISTIC: When in doubt, favor progression to keep engagement high.
-
-CURRENT STATE:
-- Stage: {current_stage} - {current_stage_desc}
-- Trust Score: {current_trust:.1f}/10
-- User Profile: {user_profile[:200] if user_profile else "No profile"}
-
-USER'S RECENT MESSAGE:
-"{user_input}"
-
-NEXT STAGE:
-- {next_stage} - {next_stage_desc}
-
-ANALYSIS CRITERIA (favor YES if any apply):
-1. User shares ANY personal information (even small details)
-2. User responds with more than one word
-3. User asks questions or shows curiosity
-4. Trust score is above 3.0 for ENGAGEMENT+, above 4.0 for GUIDANCE+
-5. User continues the conversation
-
-ONLY STAY if ALL of these apply:
-- User gives only single-word responses repeatedly
-- User explicitly requests lighter conversation
-- User shows clear distress or discomfort
-
-When uncertain, favor transition to maintain engagement.
-
-Respond in JSON:
-{{
-    "should_transition": true/false,
-    "confidence": 0.0-1.0,
-    "reason": "brief explanation",
-    "trust_adjustment": -2.0 to +3.0 (how much to adjust trust, favor positive adjustments),
-    "detected_signals": ["signal1", "signal2"]
-}}
-"""
+            # Use AI to analyze (batched with concurrent analyses into one API call)
+            batcher = await get_categorization_batcher()
+            
+            current_stage_desc = _STAGE_DESCRIPTIONS.get(current_stage, "")
+            next_stage_desc = _STAGE_DESCRIPTIONS.get(next_stage, "")
+            
+            prompt = _STAGE_ANALYSIS_PROMPT.format(
+                current_stage=current_stage,
+                current_stage_desc=current_stage_desc,
+                current_trust=current_trust,
+                profile_excerpt=user_profile[:200] if user_profile else "No profile",
+                user_input=user_input,
+                next_stage=next_stage,
+                next_stage_desc=next_stage_desc,
+            )
             
-            response = await asyncio.wait_for(
-                client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "You are an expert at analyzing conversation depth and readiness for stage transitions. Be optimistic and favor progression when possible. Respond with valid JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1,
-                    max_tokens=200,
-                    timeout=3.0
+            analysis = await asyncio.wait_for(
+                batcher.categorize(
+                    _STAGE_ANALYSIS_SYSTEM,
+                    prompt,
+                    max_tokens=100
                 ),
                 timeout=3.0
             )
             
-            analysis = json.loads(response.choices[0].message.content)
-            
             result = {
                 "current_stage": current_stage,
                 "suggested_stage": next_stage if analysis.get("should_transition") else current_stage,
@@ -460,80 +646,7 @@ Respond in JSON:
         Returns:
             Guidance text for the assistant
         """
-        guidance = {
-            "ORIENTATION": """
-## Current Stage: ORIENTATION (Trust: Building)
-**Goal**: Build safety and comfort through light conversation.
-
-**Approach**:
-- Use warm, friendly greetings
-- Ask simple, non-intrusive questions
-- Show genuine interest and active listening
-- Offer one small, easy "win" (micro-action <5 min)
-- Avoid pushing for personal details
-
-**Topics**: Weather, general interests, daily activities, light topics
-**Trust Building**: Consistency, warmth, respect boundaries
-""",
-            "ENGAGEMENT": """
-## Current Stage: ENGAGEMENT (Trust: Growing)
-**Goal**: Explore breadth across life domains to identify energetic areas.
-
-**Approach**:
-- Explore multiple life areas (work, family, health, interests, habits)
-- Ask open-ended questions
-- Identify one domain that energizes them
-- Continue offering small wins
-- Show you remember previous conversations
-
-**Topics**: Work, family, hobbies, health, learning, finances (surface level)
-**Trust Building**: Remember details, show genuine curiosity, celebrate shares
-""",
-            "GUIDANCE": """
-## Current Stage: GUIDANCE (Trust: Established)
-**Goal**: Go deeper with consent and offer meaningful guidance.
-
-**Approach**:
-- **Ask for consent** before going deeper ("Would you like to explore this more?")
-- Discuss feelings, needs, triggers (if comfortable)
-- Offer one actionable skill or reframing technique
-- Validate emotions and experiences
-- Back off if any discomfort signals
-
-**Topics**: Emotions, underlying needs, patterns, gentle challenges
-**Trust Building**: Respect consent, validate feelings, offer useful insights
-""",
-            "REFLECTION": """
-## Current Stage: REFLECTION (Trust: Strong)
-**Goal**: Help reflect on progress and build sustainable routines.
-
-**Approach**:
-- Review progress on previous micro-actions
-- Set small, sustainable routines
-- Address obstacles with problem-solving
-- Celebrate small wins
-- Encourage self-reflection
-
-**Topics**: Progress review, habit formation, obstacle handling, next steps
-**Trust Building**: Acknowledge progress, support through setbacks, consistency
-""",
-            "INTEGRATION": """
-## Current Stage: INTEGRATION (Trust: Deep)
-**Goal**: Identity-level insights and choosing next growth area.
-
-**Approach**:
-- Facilitate identity-level reflection ("Who am I becoming?")
-- Celebrate consistent growth
-- Help choose next focus area or domain
-- Acknowledge transformation
-- Maintain deep, authentic connection
-
-**Topics**: Identity, values, long-term vision, life purpose, next chapter
-**Trust Building**: Deep authenticity, celebrate transformation, honor growth
-"""
-        }
-        
-        return guidance.get(stage, guidance["ORIENTATION"])
+        return _STAGE_GUIDANCE.get(stage, _STAGE_GUIDANCE["ORIENTATION"])
     
     def _default_state(self) -> Dict:
         """Return default conversation state"""
@@ -2,16 +2,46 @@
 Memory Service - Handles memory storage and retrieval operations
 """
 
+import asyncio
 import logging
 import time
-from typing import Optional, List, Dict
+from collections import defaultdict
+from typing import Optional, List, Dict, Tuple
 from supabase import Client
 from core.validators import can_write_for_current_user, get_current_user_id
 from core.user_id import UserId, UserIdError
 from services.user_service import UserService
+from infrastructure.database_batcher import get_db_batcher_sync
+from infrastructure.redis_cache import get_redis_cache
 
 logger = logging.getLogger(__name__)
 
+# Memory categories in canonical order, plus an O(1) membership set
+MEMORY_CATEGORIES = ("FACT", "GOAL", "INTEREST", "EXPERIENCE", "PREFERENCE", "PLAN", "RELATIONSHIP", "OPINION")
+VALID_CATEGORIES = frozenset(MEMORY_CATEGORIES)
+# Categories loaded into the initial chat context, in display order (FACT first:
+# name, gender, location)
+CONTEXT_MEMORY_CATEGORIES = ("FACT", "PREFERENCE", "GOAL", "INTEREST", "RELATIONSHIP", "PLAN")
+assert VALID_CATEGORIES.issuperset(CONTEXT_MEMORY_CATEGORIES), "unknown context memory category"
+
+# In-flight batched category fetches, keyed by (user_id, categories, limit), so
+# concurrent callers for the same user share one round trip
+_inflight_category_fetches: Dict[tuple, asyncio.Task] = {}
+
+# After get_top_memories_per_category fails (not deployed), go straight to the
+# .in_() query until this many seconds have passed, then probe the RPC again
+TOP_PER_CATEGORY_RPC_RETRY_S = 600
+_top_per_category_rpc_retry_at = 0.0
+
+# Formatted context memory block (user:{id}:memblock), dropped on every memory write
+MEMORY_BLOCK_CACHE_TTL_S = 300
+# Invalidations scheduled from the sync write paths (strong refs until done)
+_memory_block_invalidations: set = set()
+
+# Users whose parent profiles row is confirmed to exist (rows are never deleted
+# mid-session), so repeat writes skip the ensure_profile_exists round trip
+_profiles_confirmed: set = set()
+
 
 class MemoryService:
     """Service for memory-related operations"""
@@ -109,6 +139,7 @@ class MemoryService:
                 print(f"[MEMORY SERVICE] ❌ Save error: {err}")
                 return False
             
+            self._invalidate_memory_block_soon(uid)
             logger.info(f"[MEMORY SERVICE] ✅ Saved successfully (sync): [{category}] {key}")
             print(f"[MEMORY SERVICE] ✅ Saved successfully: [{category}] {key}")
             return True
@@ -173,6 +204,9 @@ class MemoryService:
         """
         Get all memories for a category.
         
+        Served by the memory_user_cat_created_idx (user_id, category, created_at DESC)
+        index (see migrations/add_memory_user_category_index.sql).
+        
         Args:
             category: Memory category
             limit: Maximum number of memories to return
@@ -233,14 +267,14 @@ class MemoryService:
             return False
         
         try:
+            # Single compound filter on the (user_id, category, key) unique key
             resp = self.supabase.table("memory").delete() \
-                            .eq("user_id", uid) \
-                            .eq("category", category) \
-                            .eq("key", key) \
+                            .match({"user_id": uid, "category": category, "key": key}) \
                             .execute()
             if getattr(resp, "error", None):
                 print(f"[MEMORY SERVICE] Delete error: {resp.error}")
                 return False
+            self._invalidate_memory_block_soon(uid)
             return True
         except Exception as e:
             print(f"[MEMORY SERVICE] delete_memory failed: {e}")
@@ -284,23 +318,37 @@ class MemoryService:
             print(f"[MEMORY SERVICE] 🚀 Batch fetching {len(categories)} categories (optimized)...")
             print(f"[MEMORY SERVICE]    User: {UserId.format_for_display(uid)}")
             
-            # Single query with .in_() filter - gets all categories at once!
-            resp = self.supabase.table("memory").select("*") \
-                .eq("user_id", uid) \
-                .in_("category", categories) \
-                .order("created_at", desc=True) \
-                .limit(limit_per_category * len(categories)) \
-                .execute()
+            # Preferred: windowed top-N per category in a single RPC
+            # (see migrations/create_get_top_memories_per_category.sql)
+            global _top_per_category_rpc_retry_at
+            resp = None
+            if time.monotonic() >= _top_per_category_rpc_retry_at:
+                try:
+                    resp = self.supabase.rpc("get_top_memories_per_category", {
+                        "p_user_id": uid,
+                        "p_categories": list(categories),
+                        "p_limit": limit_per_category,
+                    }).execute()
+                except Exception as rpc_error:
+                    _top_per_category_rpc_retry_at = time.monotonic() + TOP_PER_CATEGORY_RPC_RETRY_S
+                    logger.debug(f"[MEMORY SERVICE] get_top_memories_per_category unavailable, using .in_() query: {rpc_error}")
+            if resp is None:
+                # Function not deployed yet - single query with .in_() filter
+                # (uses memory_user_created_hot_partial for the standard context categories)
+                resp = self.supabase.table("memory").select("*") \
+                    .eq("user_id", uid) \
+                    .in_("category", categories) \
+                    .order("created_at", desc=True) \
+                    .limit(limit_per_category * len(categories)) \
+                    .execute()
             
             data = getattr(resp, "data", []) or []
             
-            # Group by category and limit each
-            grouped = {cat: [] for cat in categories}
-            
+            # Bucket by category and limit each
+            buckets = defaultdict(list)
             for mem in data:
-                cat = mem.get("category")
-                if cat in grouped and len(grouped[cat]) < limit_per_category:
-                    grouped[cat].append(mem)
+                buckets[mem.get("category")].append(mem)
+            grouped = {cat: buckets[cat][:limit_per_category] for cat in categories}
             
             # Log results
             total = sum(len(mems) for mems in grouped.values())
@@ -312,6 +360,95 @@ class MemoryService:
             print(f"[MEMORY SERVICE] ❌ Batch fetch error: {e}")
             return {cat: [] for cat in categories}
     
+    async def get_memories_by_categories_async(
+        self,
+        categories: List[str],
+        limit_per_category: int = 3,
+        user_id: Optional[str] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Fetch memories from multiple categories in one round trip (async version).
+        Runs the batched query off the event loop so callers can gather it
+        alongside other context fetches. Identical concurrent requests (e.g. the
+        initial context build and a getCompleteUserInfo tool call) share one query.
+        
+        Args:
+            categories: List of categories to fetch
+            limit_per_category: Maximum memories per category
+            user_id: Optional user ID (uses current user if not provided)
+            
+        Returns:
+            Dict mapping category name to list of memories
+        """
+        uid = user_id or get_current_user_id()
+        key = (uid, tuple(categories), limit_per_category)
+        task = _inflight_category_fetches.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(
+                self.get_memories_by_categories_batch,
+                categories=categories,
+                limit_per_category=limit_per_category,
+                user_id=uid
+            ))
+            _inflight_category_fetches[key] = task
+            task.add_done_callback(lambda _: _inflight_category_fetches.pop(key, None))
+        
+        grouped = await asyncio.shield(task)
+        # Callers get their own dict/lists; the rows themselves are shared read-only
+        return {cat: list(mems) for cat, mems in grouped.items()}
+    
+    async def get_memory_block_async(
+        self,
+        user_id: str,
+        categories: List[str],
+        limit_per_category: int = 5
+    ) -> Tuple[List[str], int]:
+        """
+        Get the formatted per-category memory sections for the initial context.
+        The block is built once and cached in Redis until the next memory write,
+        so repeat sessions skip both the query and the formatting.
+        
+        Args:
+            user_id: User ID (explicit, required)
+            categories: Categories to include, in display order
+            limit_per_category: Maximum memories per category
+            
+        Returns:
+            (list of "## CATEGORY\n- value" sections, number of memories included)
+        """
+        redis_cache = await get_redis_cache()
+        cache_key = f"user:{user_id}:memblock"
+        cached = await redis_cache.get(cache_key)
+        if isinstance(cached, dict) and cached.get("categories") == list(categories):
+            return cached["sections"], cached["count"]
+        
+        grouped = await self.get_memories_by_categories_async(
+            categories=list(categories),
+            limit_per_category=limit_per_category,
+            user_id=user_id
+        )
+        
+        sections = []
+        count = 0
+        for category in categories:
+            # value_preview is clipped to 150 chars at write time (generated column);
+            # rows from before the migration fall back to slicing here
+            values = [
+                mem.get('value_preview') or (mem.get('value') or '')[:150]
+                for mem in grouped.get(category, [])[:limit_per_category]
+            ]
+            lines = [f"- {value}" for value in values if value]
+            if lines:
+                sections.append(f"## {category}\n" + "\n".join(lines))
+                count += len(lines)
+        
+        await redis_cache.set(
+            cache_key,
+            {"categories": list(categories), "sections": sections, "count": count},
+            ttl=MEMORY_BLOCK_CACHE_TTL_S
+        )
+        return sections, count
+    
     async def store_memory_async(self, category: str, key: str, value: str, user_id: str) -> bool:
         """
         Save memory to Supabase (async version).
@@ -344,9 +481,13 @@ class MemoryService:
             return False
         
         # CRITICAL: Ensure profile exists BEFORE any memory insert
-        import asyncio
-        user_service = UserService(self.supabase)
-        profile_exists = await asyncio.to_thread(user_service.ensure_profile_exists, user_id)
+        if user_id in _profiles_confirmed:
+            profile_exists = True
+        else:
+            user_service = UserService(self.supabase)
+            profile_exists = await asyncio.to_thread(user_service.ensure_profile_exists, user_id)
+            if profile_exists:
+                _profiles_confirmed.add(user_id)
         if not profile_exists:
             logger.error(f"[MEMORY SERVICE] ❌ CRITICAL: Cannot save memory - profile does not exist for {UserId.format_for_display(user_id)}")
             print(f"[MEMORY SERVICE] ❌ CRITICAL: Cannot save memory - profile does not exist for {UserId.format_for_display(user_id)}")
@@ -364,6 +505,19 @@ class MemoryService:
             logger.info(f"[MEMORY SERVICE] 💾 Attempting async save: [{category}] {key}")
             logger.debug(f"[MEMORY SERVICE]    User: {UserId.format_for_display(user_id)} Value: {value[:50]}...")
             
+            # Preferred: coalesce with concurrent writes into one batched upsert
+            batcher = get_db_batcher_sync()
+            if batcher is not None and batcher.supabase is not None:
+                if not await batcher.enqueue_memory_write(memory_data):
+                    # Could be an FK violation - re-check the parent profile next time
+                    _profiles_confirmed.discard(user_id)
+                    print(f"[MEMORY SERVICE] ❌ Batched save failed: [{category}] {key}")
+                    return False
+                await self._invalidate_memory_block(user_id)
+                logger.info(f"[MEMORY SERVICE] ✅ Saved async (batched): [{category}] {key}")
+                print(f"[MEMORY SERVICE] ✅ Saved async: [{category}] {key}")
+                return True
+            
             try:
                 resp = await asyncio.to_thread(
                     lambda: self.supabase.table("memory").upsert(memory_data, on_conflict="user_id,category,key").execute()
@@ -382,6 +536,7 @@ class MemoryService:
                     print(f"[MEMORY SERVICE] 🚨 CRITICAL BUG: FK error despite ensuring profile exists! (async)")
                     print(f"[MEMORY SERVICE] 🚨 This indicates a serious consistency issue")
                     print(f"[MEMORY SERVICE] 🚨 user_id: {user_id}")
+                    _profiles_confirmed.discard(user_id)
                     return False
                 else:
                     # Some other database error
@@ -396,6 +551,7 @@ class MemoryService:
                 print(f"[MEMORY SERVICE] ❌ Save error in response: {err}")
                 return False
             
+            await self._invalidate_memory_block(user_id)
             logger.info(f"[MEMORY SERVICE] ✅ Saved async: [{category}] {key}")
             print(f"[MEMORY SERVICE] ✅ Saved async: [{category}] {key}")
             return True
@@ -404,6 +560,28 @@ class MemoryService:
             print(f"[MEMORY SERVICE] store_memory_async failed: {e}")
             return False
     
+    async def _invalidate_memory_block(self, user_id: str):
+        """Drop the cached context memory block after a write"""
+        try:
+            redis_cache = await get_redis_cache()
+            await redis_cache.delete(f"user:{user_id}:memblock")
+        except Exception as e:
+            print(f"[MEMORY SERVICE] Memory block invalidation failed: {e}")
+    
+    def _invalidate_memory_block_soon(self, user_id: str):
+        """
+        Drop the cached context memory block after a write from a sync method.
+        Scheduled on the running event loop (the Redis client is async); called
+        outside one there is no loop-bound cache client to reach, so it's a no-op.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._invalidate_memory_block(user_id))
+        _memory_block_invalidations.add(task)
+        task.add_done_callback(_memory_block_invalidations.discard)
+    
     async def get_value_async(self, user_id: str, category: str, key: str) -> Optional[str]:
         """
         Get a specific memory value by category and key (async version).
@@ -420,7 +598,6 @@ class MemoryService:
             return None
         
         try:
-            import asyncio
             resp = await asyncio.to_thread(
                 lambda: self.supabase.table("memory").select("value")
                     .eq("user_id", user_id)
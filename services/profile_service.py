@@ -4,16 +4,55 @@ Profile Service - Handles user profile generation and management
 
 import asyncio
 import json
-from typing import Optional, Dict
+import re
+from functools import lru_cache
+from typing import Optional, Dict, Tuple
 from supabase import Client
 import openai
 from core.validators import can_write_for_current_user, get_current_user_id
 from core.user_id import UserId, UserIdError
 from core.config import Config
 from infrastructure.connection_pool import get_connection_pool_sync, get_connection_pool
+from infrastructure.database_batcher import get_db_batcher_sync
 from infrastructure.redis_cache import get_redis_cache
 from services.user_service import UserService
 
+# Display names rarely change; cached alongside the profile (user:{id}:*)
+DISPLAY_NAME_CACHE_TTL_S = 3600
+
+# Self-disclosure patterns (name, age, home, work/study, family, likes/dislikes)
+# in English, Roman Urdu and Urdu. Only messages matching one reach the profile
+# LLM; bare pronouns and common verbs are left out because nearly every turn has them
+_PROFILE_TRIGGER_RE = re.compile(
+    r"\b(my name|call me|i am \d+|i'm \d+|\d+ years old|i live in|i'm from|i am from|"
+    r"i work (at|as|in|for)|my (job|work|office)|i study|i'm studying|"
+    r"my (wife|husband|mother|mom|father|dad|son|daughter|brother|sister|kids|children|family)|"
+    r"i (really )?(like|love|hate|enjoy|prefer) (to|\w+ing)|my favou?rite|"
+    r"mera naam|meri umr|meri umar|\d+ saal (ka|ki)|(rehta|rehti) (hoon|hun|hu)|"
+    r"(kaam|job|naukri) kart[ai]|parht[ai] (hoon|hun|hu)|pasand (hai|hain|nahi)|nafrat (hai|karta|karti)|"
+    r"meri (biwi|ammi|behen|beti)|mera (bhai|beta|shohar)|mere (abbu|shohar|bachay|bachche))\b|"
+    r"میرا نام|میری عمر|سال کا|سال کی|رہتا ہوں|رہتی ہوں|کام کرتا|کام کرتی|پڑھتا ہوں|پڑھتی ہوں|"
+    r"پسند ہے|پسند نہیں|نفرت ہے|میری بیوی|میرے شوہر|میرا بھائی|میری بہن|میری امی|میرے ابو|میرے بچے",
+    re.IGNORECASE
+)
+
+
+def mentions_profile_details(text: str) -> bool:
+    """Whether a message looks like it tells us something about the user"""
+    return bool(_PROFILE_TRIGGER_RE.search(text or ""))
+
+
+@lru_cache(maxsize=1)
+def _fallback_openai_client() -> openai.OpenAI:
+    """Process-wide OpenAI client used only until the connection pool exists"""
+    return openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+
+
+def _openai_client() -> openai.OpenAI:
+    """Pooled sync OpenAI client (never constructs a new client per call)"""
+    pool = get_connection_pool_sync()
+    return pool.get_openai_client() if pool else _fallback_openai_client()
+
 
 class ProfileService:
     """Service for user profile operations"""
@@ -21,6 +60,70 @@ class ProfileService:
     def __init__(self, supabase_client: Optional[Client] = None):
         self.supabase = supabase_client
     
+    def _profile_generation_messages(self, user_input: str, existing_profile: str) -> Optional[list]:
+        """
+        Build the profile-generation chat messages, or None when the input
+        isn't worth an LLM call (empty, very short, or trivial with a full profile).
+        """
+        if not user_input or not user_input.strip():
+            return None
+        
+        # OPTIMIZATION: Skip profile generation for very short inputs (reduced from 15 to 5)
+        if len(user_input.strip()) < 5:
+            return None
+        
+        # OPTIMIZATION: Skip only single-word trivial responses
+        if existing_profile and len(existing_profile) > 200:
+            # Check if input is a single trivial word
+            trivial_patterns = ["ok", "okay", "yes", "no", "haan", "nahi"]
+            if user_input.lower().strip() in trivial_patterns:
+                return None
+        
+        prompt = f"""
+        {"Update" if existing_profile else "Create"} a concise 3-4 line user profile that captures ONLY the most essential information about their persona.
+        
+        CRITICAL RULES:
+        1. ONLY include information that is explicitly stated in the user's input - DO NOT infer, assume, or add anything on your own
+        2. DO NOT add information that is not directly verifiable from what the user said
+        3. Focus ONLY on the most important details - skip minor or trivial information
+        4. Be selective - quality over quantity
+        
+        Priority information (only if explicitly mentioned):
+        - Core interests & passions (not casual mentions)
+        - Significant goals or life aspirations
+        - Important relationships or family (key people only)
+        - Defining personality traits or values
+        - Critical life details (profession, major life events)
+        
+        {"Existing profile: " + existing_profile if existing_profile else ""}
+        
+        New information: "{user_input}"
+        
+        {"Carefully merge ONLY the important new information with the existing profile. Keep it concise and factual." if existing_profile else "Create a profile from ONLY the important information provided."}
+        
+        Format: Write 3-4 concise sentences with ONLY verified, important facts.
+        Style: Factual and natural - like essential notes about the person.
+        
+        Return only the profile text (3-4 sentences). If no meaningful information is found, return "NO_PROFILE_INFO".
+        """
+        
+        return [
+            {"role": "system", "content": f"You are an expert at creating concise, factual user profiles. {'Update' if existing_profile else 'Create'} a 3-4 sentence profile with ONLY the most important information explicitly provided by the user. Never infer, assume, or add information that wasn't directly stated. Be selective and truthful."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _parse_generated_profile(self, response, user_input: str, existing_profile: str) -> str:
+        """Extract the profile text from a completion (existing profile if nothing useful)"""
+        profile = response.choices[0].message.content.strip()
+        
+        if profile == "NO_PROFILE_INFO" or len(profile) < 20:
+            print(f"[PROFILE SERVICE] ℹ️  No meaningful profile info found in: {user_input[:50]}...")
+            return existing_profile
+        
+        print(f"[PROFILE SERVICE] ✅ {'Updated' if existing_profile else 'Generated'} profile:")
+        print(f"[PROFILE SERVICE]    {profile[:150]}{'...' if len(profile) > 150 else ''}")
+        return profile
+    
     def generate_profile(self, user_input: str, existing_profile: str = "") -> str:
         """
         Generate or update comprehensive user profile using OpenAI.
@@ -33,77 +136,54 @@ class ProfileService:
         Returns:
             Generated profile text or existing profile if generation fails
         """
-        if not user_input or not user_input.strip():
+        messages = self._profile_generation_messages(user_input, existing_profile)
+        if messages is None:
             return existing_profile
         
-        # OPTIMIZATION: Skip profile generation for very short inputs (reduced from 15 to 5)
-        if len(user_input.strip()) < 5:
-            return existing_profile
-        
-        # OPTIMIZATION: Skip only single-word trivial responses
-        if existing_profile and len(existing_profile) > 200:
-            # Check if input is a single trivial word
-            trivial_patterns = ["ok", "okay", "yes", "no", "haan", "nahi"]
-            if user_input.lower().strip() in trivial_patterns:
-                return existing_profile
-        
         try:
             # Use pooled OpenAI client
-            pool = get_connection_pool_sync()
-            client = pool.get_openai_client() if pool else openai.OpenAI(api_key=Config.OPENAI_API_KEY)
-            
-            prompt = f"""
-            {"Update" if existing_profile else "Create"} a concise 3-4 line user profile that captures ONLY the most essential information about their persona.
-            
-            CRITICAL RULES:
-            1. ONLY include information that is explicitly stated in the user's input - DO NOT infer, assume, or add anything on your own
-            2. DO NOT add information that is not directly verifiable from what the user said
-            3. Focus ONLY on the most important details - skip minor or trivial information
-            4. Be selective - quality over quantity
-            
-            Priority information (only if explicitly mentioned):
-            - Core interests & passions (not casual mentions)
-            - Significant goals or life aspirations
-            - Important relationships or family (key people only)
-            - Defining personality traits or values
-            - Critical life details (profession, major life events)
-            
-            {"Existing profile: " + existing_profile if existing_profile else ""}
-            
-            New information: "{user_input}"
-            
-            {"Carefully merge ONLY the important new information with the existing profile. Keep it concise and factual." if existing_profile else "Create a profile from ONLY the important information provided."}
-            
-            Format: Write 3-4 concise sentences with ONLY verified, important facts.
-            Style: Factual and natural - like essential notes about the person.
-            
-            Return only the profile text (3-4 sentences). If no meaningful information is found, return "NO_PROFILE_INFO".
-            """
-            
+            client = _openai_client()
             response = client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": f"You are an expert at creating concise, factual user profiles. {'Update' if existing_profile else 'Create'} a 3-4 sentence profile with ONLY the most important information explicitly provided by the user. Never infer, assume, or add information that wasn't directly stated. Be selective and truthful."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 max_tokens=200,
                 temperature=0.3
             )
-            
-            profile = response.choices[0].message.content.strip()
-            
-            if profile == "NO_PROFILE_INFO" or len(profile) < 20:
-                print(f"[PROFILE SERVICE] ℹ️  No meaningful profile info found in: {user_input[:50]}...")
-                return existing_profile
-            
-            print(f"[PROFILE SERVICE] ✅ {'Updated' if existing_profile else 'Generated'} profile:")
-            print(f"[PROFILE SERVICE]    {profile[:150]}{'...' if len(profile) > 150 else ''}")
-            return profile
-            
+            return self._parse_generated_profile(response, user_input, existing_profile)
         except Exception as e:
             print(f"[PROFILE SERVICE] generate_profile failed: {e}")
             return existing_profile
     
+    async def generate_profile_async(self, user_input: str, existing_profile: str = "") -> str:
+        """
+        Generate or update the user profile (async version).
+        Uses the pooled AsyncOpenAI client, so no worker thread is held for the call.
+        
+        Args:
+            user_input: New information to incorporate
+            existing_profile: Current profile text
+            
+        Returns:
+            Generated profile text or existing profile if generation fails
+        """
+        messages = self._profile_generation_messages(user_input, existing_profile)
+        if messages is None:
+            return existing_profile
+        
+        try:
+            pool = await get_connection_pool()
+            client = pool.get_openai_client(async_client=True)
+            response = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=200,
+                temperature=0.3
+            )
+            return self._parse_generated_profile(response, user_input, existing_profile)
+        except Exception as e:
+            print(f"[PROFILE SERVICE] generate_profile_async failed: {e}")
+            return existing_profile
+    
     def save_profile(self, profile_text: str, user_id: Optional[str] = None) -> bool:
         """
         Save user profile to Supabase (sync version).
@@ -191,15 +271,19 @@ class ProfileService:
                 print(f"[PROFILE SERVICE] ❌ Cannot save profile - missing parent row in profiles for {UserId.format_for_display(uid)}")
                 return False
 
-            # Profile changed significantly - save to DB
-            resp = await asyncio.to_thread(
-                lambda: self.supabase.table("user_profiles").upsert({
-                    "user_id": uid,
-                    "profile_text": profile_text,
-                }).execute()
-            )
-            if getattr(resp, "error", None):
-                print(f"[PROFILE SERVICE] Save error: {resp.error}")
+            # Profile changed significantly - save to DB, coalesced with concurrent
+            # writes (memories, conversation state) into the batcher's next flush
+            row = {"user_id": uid, "profile_text": profile_text}
+            batcher = get_db_batcher_sync()
+            if batcher is not None and batcher.supabase is not None:
+                error = await batcher.enqueue_write("user_profiles", row, "user_id")
+            else:
+                resp = await asyncio.to_thread(
+                    lambda: self.supabase.table("user_profiles").upsert(row).execute()
+                )
+                error = getattr(resp, "error", None)
+            if error:
+                print(f"[PROFILE SERVICE] Save error: {error}")
                 return False
             
             # 🚀 OPTIMIZATION: Update cache instead of deleting (prevents cache miss)
@@ -305,8 +389,7 @@ class ProfileService:
                 return False
             
             # Use pooled OpenAI client
-            pool = get_connection_pool_sync()
-            client = pool.get_openai_client() if pool else openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+            client = _openai_client()
             
             # Build concise prompt for <=250 chars, factual only from provided fields
             fields_text = (
@@ -442,7 +525,7 @@ class ProfileService:
     
     async def get_display_name_async(self, user_id: str) -> Optional[str]:
         """
-        Get user's display name from profile (async version).
+        Get user's display name from Redis cache or profile (async version).
         
         Args:
             user_id: User ID (explicit, required)
@@ -453,6 +536,16 @@ class ProfileService:
         if not user_id:
             return None
         
+        redis_cache = await get_redis_cache()
+        cache_key = f"user:{user_id}:display_name"
+        cached_name = await redis_cache.get(cache_key)
+        if cached_name:
+            return cached_name
+        
+        return await self._fetch_display_name(user_id, redis_cache)
+    
+    async def _fetch_display_name(self, user_id: str, redis_cache) -> Optional[str]:
+        """Read the display name from Supabase and cache it (names rarely change)"""
         try:
             resp = await asyncio.to_thread(
                 lambda: self.supabase.table("user_profiles").select("display_name")
@@ -462,8 +555,42 @@ class ProfileService:
             if getattr(resp, "error", None):
                 return None
             data = getattr(resp, "data", []) or []
-            return data[0].get("display_name") if data else None
+            display_name = data[0].get("display_name") if data else None
+            if display_name:
+                await redis_cache.set(f"user:{user_id}:display_name", display_name, ttl=DISPLAY_NAME_CACHE_TTL_S)
+            return display_name
         except Exception as e:
             print(f"[PROFILE SERVICE] get_display_name_async failed: {e}")
             return None
     
+    async def get_profile_and_display_name_async(self, user_id: str) -> Tuple[str, Optional[str]]:
+        """
+        Get profile text and display name, reading both cache keys in one Redis
+        round trip and only going to Supabase for whichever missed.
+        
+        Args:
+            user_id: User ID (explicit, required)
+            
+        Returns:
+            (profile text or empty string, display name or None)
+        """
+        if not user_id:
+            return "", None
+        
+        redis_cache = await get_redis_cache()
+        cached_profile, cached_name = await redis_cache.get_many(
+            f"user:{user_id}:profile", f"user:{user_id}:display_name"
+        )
+        
+        if not can_write_for_current_user():
+            profile_task = asyncio.sleep(0, result="")
+        elif cached_profile is not None:
+            profile_task = asyncio.sleep(0, result=cached_profile)
+        else:
+            profile_task = self.get_profile_async(user_id)
+        name_task = (
+            asyncio.sleep(0, result=cached_name) if cached_name
+            else self._fetch_display_name(user_id, redis_cache)
+        )
+        return tuple(await asyncio.gather(profile_task, name_task))
+    
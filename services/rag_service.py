@@ -3,10 +3,133 @@ RAG Service - Wrapper for RAG memory system operations
 """
 
 import asyncio
+import os
+import time
+import numpy as np
 from typing import List, Dict, Optional, Tuple
-from rag_system import get_or_create_rag, RAGMemorySystem
+from rag_system import get_or_create_rag, RAGMemorySystem, EMBEDDING_DIMENSION
 from core.config import Config
 from core.validators import get_current_user_id
+from infrastructure.redis_cache import get_redis_cache
+
+# Semantic search cache configuration
+SEMANTIC_CACHE_THRESHOLD = 0.95  # Minimum cosine similarity to reuse results
+SEMANTIC_CACHE_MAX_ENTRIES = 256
+SEMANTIC_CACHE_TTL_S = 600.0  # 10 minutes
+
+# Index snapshots shared through Redis, so a reconnect handled by another worker
+# (no local snapshot) still skips re-embedding
+RAG_REDIS_SNAPSHOT_TTL_S = 3600
+RAG_REDIS_SNAPSHOT_MAX_CHARS = 8 * 1024 * 1024  # Skip Redis for unusually large indexes
+
+class SemanticCache:
+    """
+    In-process cache of search results keyed by normalized query embedding.
+    Near-duplicate queries (cosine >= threshold) reuse the cached results
+    instead of re-running retrieval.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl_s: float = SEMANTIC_CACHE_TTL_S
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.clear()
+    
+    def clear(self):
+        """Drop all cached entries"""
+        self._vecs = np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+        self._created = np.empty(0, dtype=np.float64)
+        self._last_used = np.empty(0, dtype=np.float64)
+        self._params: List[Tuple] = []
+        self._results: List[List[Dict]] = []
+    
+    def __len__(self) -> int:
+        return len(self._results)
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> Optional[np.ndarray]:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0:
+            # Zero vector means embedding failed - never cache on it
+            return None
+        return vec / norm
+    
+    def _keep(self, mask: np.ndarray):
+        self._vecs = self._vecs[mask]
+        self._created = self._created[mask]
+        self._last_used = self._last_used[mask]
+        self._params = [p for p, keep in zip(self._params, mask) if keep]
+        self._results = [r for r, keep in zip(self._results, mask) if keep]
+    
+    def lookup(self, embedding: np.ndarray, params: Tuple) -> Optional[List[Dict]]:
+        """
+        Find cached results for a near-duplicate query.
+        
+        Args:
+            embedding: Query embedding
+            params: Search parameters that must match exactly (top_k, filters, ...)
+            
+        Returns:
+            Cached results list, or None on miss
+        """
+        query = self._normalize(embedding)
+        if query is None or not self._results:
+            self.misses += 1
+            return None
+        
+        now = time.time()
+        expired = (now - self._created) > self.ttl_s
+        if expired.any():
+            self._keep(~expired)
+            if not self._results:
+                self.misses += 1
+                return None
+        
+        sims = self._vecs @ query
+        for i, p in enumerate(self._params):
+            if p != params:
+                sims[i] = -1.0
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            self.misses += 1
+            return None
+        
+        self._last_used[best] = now
+        self.hits += 1
+        return list(self._results[best])
+    
+    def store(self, embedding: np.ndarray, params: Tuple, results: List[Dict]):
+        """
+        Cache results for a query, evicting the least recently used entry when full.
+        
+        Args:
+            embedding: Query embedding
+            params: Search parameters the results were produced with
+            results: Search results to cache
+        """
+        query = self._normalize(embedding)
+        if query is None:
+            return
+        
+        if len(self._results) >= self.max_entries:
+            mask = np.ones(len(self._results), dtype=bool)
+            mask[int(np.argmin(self._last_used))] = False
+            self._keep(mask)
+        
+        now = time.time()
+        self._vecs = np.vstack([self._vecs, query.reshape(1, -1)])
+        self._created = np.append(self._created, now)
+        self._last_used = np.append(self._last_used, now)
+        self._params.append(params)
+        self._results.append(list(results))
 
 
 class RAGService:
@@ -15,6 +138,8 @@ class RAGService:
     def __init__(self, user_id: Optional[str] = None):
         self.user_id = user_id or get_current_user_id()
         self.rag_system: Optional[RAGMemorySystem] = None
+        self.search_cache = SemanticCache()
+        self._search_cache_generation = -1
     
     def get_rag_system(self) -> RAGMemorySystem:
         """Get or create RAG system for current user"""
@@ -76,12 +201,62 @@ class RAGService:
         if not rag:
             return []
         
-        return await rag.retrieve_relevant_memories(
+        # Advanced results depend on conversation context and which memories were
+        # already referenced, so only plain similarity searches are cached
+        if use_advanced_features:
+            return await rag.retrieve_relevant_memories(
+                query=query,
+                top_k=top_k,
+                category_filter=category_filter,
+                use_advanced_features=True
+            )
+        
+        # Cached results are only valid for the index state they were computed on
+        if rag.write_generation != self._search_cache_generation:
+            self.search_cache.clear()
+            self._search_cache_generation = rag.write_generation
+        
+        # Embedding is cached by text inside the RAG system, so retrieval below
+        # reuses it instead of making a second API call
+        query_embedding = await rag.create_embedding(query)
+        params = (top_k, category_filter)
+        cached = self.search_cache.lookup(query_embedding, params)
+        if cached is not None:
+            return cached
+        
+        results = await rag.retrieve_relevant_memories(
             query=query,
             top_k=top_k,
             category_filter=category_filter,
-            use_advanced_features=use_advanced_features
+            use_advanced_features=False
         )
+        # A write landing during the awaits above leaves these results uncached
+        if results and rag.write_generation == self._search_cache_generation:
+            self.search_cache.store(query_embedding, params, results)
+        return results
+    
+    async def warmup(self):
+        """
+        Pre-warm retrieval for the first turns of a session.
+        Opens the embeddings client's connection with a request that spends no
+        tokens, and runs a throwaway FAISS search so the index is paged in before
+        the first real search. Queries themselves are not pre-embedded: tool
+        queries are written by the LLM and would rarely match a guessed text.
+        """
+        rag = self.get_rag_system()
+        if not rag:
+            return
+        
+        try:
+            await rag.client.models.list()
+        except Exception as e:
+            print(f"[RAG] ⚠️ Embeddings connection warmup failed: {e}")
+        
+        if rag.index.ntotal:
+            probe = rag.index.reconstruct(0)
+            rag.index.search(probe.reshape(1, -1), min(5, rag.index.ntotal))
+        
+        print("[RAG] 🔥 Warmup complete")
     
     def update_conversation_context(self, text: str):
         """
@@ -140,19 +315,99 @@ class RAGService:
         if not rag:
             return {"total_memories": 0, "message": "RAG not initialized"}
         
-        return rag.get_stats()
+        stats = rag.get_stats()
+        stats["search_cache_size"] = len(self.search_cache)
+        stats["search_cache_hits"] = self.search_cache.hits
+        stats["search_cache_misses"] = self.search_cache.misses
+        return stats
+    
+    def _index_cache_path(self) -> Optional[str]:
+        """Path prefix of this user's on-disk index snapshot (None if disabled)"""
+        if not Config.RAG_INDEX_CACHE_DIR or not self.user_id:
+            return None
+        return os.path.join(Config.RAG_INDEX_CACHE_DIR, self.user_id)
+    
+    def _redis_snapshot_key(self) -> str:
+        return f"rag:{self.user_id}:v1"
+    
+    async def _restore_cached_index(self, rag: RAGMemorySystem):
+        """Seed an empty RAG system from the on-disk snapshot, else the Redis one"""
+        if rag.memories or not self.user_id:
+            return
+        
+        path = self._index_cache_path()
+        if path and os.path.exists(f"{path}.faiss"):
+            await asyncio.to_thread(rag.load_index, path)
+            print(f"[RAG] ♻️  Restored {len(rag.memories)} memories from index snapshot")
+            return
+        
+        try:
+            redis_cache = await get_redis_cache()
+            snapshot = await redis_cache.get(self._redis_snapshot_key())
+            if isinstance(snapshot, dict) and "index" in snapshot:
+                await asyncio.to_thread(rag.load_snapshot, snapshot)
+                print(f"[RAG] ♻️  Restored {len(rag.memories)} memories from Redis snapshot")
+        except Exception as e:
+            print(f"[RAG] ⚠️ Redis snapshot restore failed: {e}")
     
-    async def load_from_database(self, supabase_client, limit: int = 500):
+    async def _persist_index(self, rag: RAGMemorySystem):
+        """Write the current index to disk and Redis so the next session skips re-embedding"""
+        path = self._index_cache_path()
+        if path:
+            try:
+                os.makedirs(Config.RAG_INDEX_CACHE_DIR, exist_ok=True)
+                await asyncio.to_thread(rag.save_index, path)
+            except OSError as e:
+                print(f"[RAG] ⚠️ Could not write index snapshot: {e}")
+        
+        if not self.user_id:
+            return
+        try:
+            redis_cache = await get_redis_cache()
+            if not redis_cache.enabled:
+                return
+            snapshot = await asyncio.to_thread(rag.to_snapshot)
+            if len(snapshot["index"]) <= RAG_REDIS_SNAPSHOT_MAX_CHARS:
+                await redis_cache.set(self._redis_snapshot_key(), snapshot, ttl=RAG_REDIS_SNAPSHOT_TTL_S)
+        except Exception as e:
+            print(f"[RAG] ⚠️ Redis snapshot write failed: {e}")
+    
+    async def _sync_with_rows(self, rag: RAGMemorySystem, rows: List[Dict]):
+        """Drop snapshot memories not in the freshly fetched rows, then save the snapshot"""
+        rag.retain_only({(r.get("category", "GENERAL"), r.get("value", "")) for r in rows})
+        await self._persist_index(rag)
+    
+    async def load_from_database(self, supabase_client, limit: int = 500, offset: int = 0):
         """
         Load recent memories from Supabase and build FAISS index.
+        Starts from the user's on-disk index snapshot when there is one, so only
+        memories added since it was saved need embedding.
         
         Args:
             supabase_client: Supabase client instance
             limit: Maximum memories to load
+            offset: Number of newest memories to skip
+        """
+        rag = self.get_rag_system()
+        if rag:
+            await self._restore_cached_index(rag)
+            rows = await rag.load_from_supabase(supabase_client, limit, offset)
+            if rows is not None and offset == 0:
+                await self._sync_with_rows(rag, rows)
+    
+    async def load_from_rows(self, rows: List[Dict]):
+        """
+        Build FAISS index from memory rows that were already fetched.
+        Uses the on-disk index snapshot the same way as load_from_database.
+        
+        Args:
+            rows: Memory table rows (category, key, value), newest first
         """
         rag = self.get_rag_system()
         if rag:
-            await rag.load_from_supabase(supabase_client, limit)
+            await self._restore_cached_index(rag)
+            await rag.load_from_rows(rows)
+            await self._sync_with_rows(rag, rows)
     
     def save_index(self, filepath: str):
         """Save FAISS index and memories to disk"""
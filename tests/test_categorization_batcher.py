@@ -0,0 +1,160 @@
+"""
+Tests for CategorizationBatcher - multi-item prompts and per-caller results
+"""
+
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+import infrastructure.categorization_batcher as categorization_batcher
+from infrastructure.categorization_batcher import CategorizationBatcher
+
+
+SYSTEM_PROMPT = "Classify. Reply with JSON only."
+
+
+class _StubCompletions:
+    """Returns canned responses and records every request"""
+    
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        self.before_reply = None  # Optional coroutine function awaited before replying
+    
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        if self.before_reply is not None:
+            await self.before_reply(kwargs)
+        content = self.respond(kwargs["messages"][1]["content"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _StubCache:
+    async def get(self, key):
+        return None
+    
+    async def set(self, key, value, ttl=None):
+        return True
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    """Stub OpenAI client and Redis; tests set completions.respond"""
+    stub = _StubCompletions(lambda content: "{}")
+    client = SimpleNamespace(chat=SimpleNamespace(completions=stub))
+    pool = SimpleNamespace(get_openai_client=lambda async_client=True: client)
+    
+    async def get_pool():
+        return pool
+    
+    async def get_cache():
+        return _StubCache()
+    
+    monkeypatch.setattr(categorization_batcher, "get_connection_pool", get_pool)
+    monkeypatch.setattr(categorization_batcher, "get_redis_cache", get_cache)
+    return stub
+
+
+def _categorize_all(prompts, system_prompt=SYSTEM_PROMPT):
+    """Run concurrent categorize calls on a fresh batcher; exceptions are returned"""
+    async def run():
+        batcher = CategorizationBatcher(window_s=0.05)
+        return await asyncio.gather(
+            *(batcher.categorize(system_prompt, prompt) for prompt in prompts),
+            return_exceptions=True
+        )
+    return asyncio.run(run())
+
+
+class TestBatching:
+    """Test that concurrent prompts share one completion"""
+    
+    def test_single_item_is_sent_as_is(self, completions):
+        """Test that a lone prompt is not wrapped in the multi-item format"""
+        completions.respond = lambda content: json.dumps({"label": "a"})
+        
+        assert _categorize_all(["first"]) == [{"label": "a"}]
+        assert completions.requests[0]["messages"][1]["content"] == "first"
+    
+    def test_concurrent_items_share_one_numbered_request(self, completions):
+        """Test that each caller gets its own entry from one multi-item completion"""
+        completions.respond = lambda content: json.dumps({"results": [
+            {"item": 1, "label": "a"}, {"item": 2, "label": "b"}, {"item": 3, "label": "c"}
+        ]})
+        
+        results = _categorize_all(["first", "second", "third"])
+        
+        assert results == [{"label": "a"}, {"label": "b"}, {"label": "c"}]
+        assert len(completions.requests) == 1
+        content = completions.requests[0]["messages"][1]["content"]
+        assert "### Item 1\nfirst" in content
+        assert "### Item 3\nthird" in content
+    
+    def test_misordered_results_follow_item_numbers(self, completions):
+        """Test that numbered entries reach the right callers in any order"""
+        completions.respond = lambda content: json.dumps({"results": [
+            {"item": 3, "label": "c"}, {"item": 1, "label": "a"}, {"item": 2, "label": "b"}
+        ]})
+        
+        assert _categorize_all(["first", "second", "third"]) == [
+            {"label": "a"}, {"label": "b"}, {"label": "c"}
+        ]
+    
+    def test_next_window_is_sent_while_a_completion_is_in_flight(self, completions):
+        """Test that a slow completion doesn't hold back later windows"""
+        second_sent = asyncio.Event()
+        
+        async def before_reply(request):
+            if request["messages"][1]["content"] == "first":
+                await asyncio.wait_for(second_sent.wait(), timeout=1.0)
+            else:
+                second_sent.set()
+        
+        completions.before_reply = before_reply
+        completions.respond = lambda content: json.dumps({"label": content})
+        
+        async def run():
+            batcher = CategorizationBatcher(window_s=0.01)
+            first = asyncio.ensure_future(batcher.categorize(SYSTEM_PROMPT, "first"))
+            await asyncio.sleep(0.05)  # first window closed and its request in flight
+            second = await batcher.categorize(SYSTEM_PROMPT, "second")
+            return await first, second
+        
+        assert asyncio.run(run()) == ({"label": "first"}, {"label": "second"})
+    
+    def test_identical_prompts_share_one_item(self, completions):
+        """Test that duplicate prompts in flight are sent once"""
+        completions.respond = lambda content: json.dumps({"label": "a"})
+        
+        assert _categorize_all(["same", "same"]) == [{"label": "a"}, {"label": "a"}]
+        assert completions.requests[0]["messages"][1]["content"] == "same"
+
+
+class TestFailures:
+    """Test that a bad response fails every caller in the batch"""
+    
+    @pytest.mark.parametrize("response", [
+        json.dumps({"results": [{"item": 1, "label": "a"}, {"item": 2, "label": "b"}]}),
+        json.dumps({"results": "a, b, c"}),
+        json.dumps({"results": [{"label": "a"}, "b", {"label": "c"}]}),
+        json.dumps([{"label": "a"}]),
+        "not json",
+    ])
+    def test_bad_response_fails_every_waiter(self, completions, response):
+        """Test that partial, malformed or unparseable results raise for all callers"""
+        completions.respond = lambda content: response
+        
+        results = _categorize_all(["first", "second", "third"])
+        
+        assert len(results) == 3
+        assert all(isinstance(result, Exception) for result in results)
+    
+    def test_api_error_fails_every_waiter(self, completions):
+        """Test that a failed request is raised to each caller"""
+        def respond(content):
+            raise RuntimeError("rate limited")
+        completions.respond = respond
+        
+        results = _categorize_all(["first", "second"])
+        
+        assert [str(result) for result in results] == ["rate limited", "rate limited"]
@@ -0,0 +1,80 @@
+"""
+Tests for the local stage-analysis pre-classifier
+"""
+
+import pytest
+from services.conversation_state_service import (
+    _LOCAL_TRANSITION_THRESHOLD,
+    _classify_stage_locally,
+    _disclosure_probability,
+)
+
+
+DISTRESS_MESSAGES = [
+    "I feel so worried and stressed about my family, I cannot sleep",
+    "Main bohat pareshan hoon apni family ki wajah se, mujhe neend nahi aati",
+    "میں بہت پریشان ہوں میری امی بیمار ہیں",
+]
+
+DISCLOSURE_MESSAGES = [
+    "My brother just started his first job at an office in Lahore and my family is so proud",
+    "Mera bhai naukri karta hai aur meri ammi school mein parhati hain",
+    "میرا بھائی نوکری کرتا ہے اور میری امی سکول میں پڑھاتی ہیں",
+]
+
+
+class TestDisclosureScorer:
+    """Test the personal-disclosure score"""
+    
+    @pytest.mark.parametrize("message", DISTRESS_MESSAGES)
+    def test_distress_scores_below_threshold(self, message):
+        """Test that distress is not mistaken for a disclosure"""
+        assert _disclosure_probability(message) < _LOCAL_TRANSITION_THRESHOLD
+    
+    @pytest.mark.parametrize("message", DISCLOSURE_MESSAGES)
+    def test_disclosure_scores_above_threshold(self, message):
+        """Test that clear personal disclosures pass the threshold"""
+        assert _disclosure_probability(message) >= _LOCAL_TRANSITION_THRESHOLD
+
+
+class TestClassifyStageLocally:
+    """Test which messages are decided without the LLM"""
+    
+    @pytest.mark.parametrize("message", DISTRESS_MESSAGES)
+    def test_distress_never_transitions_locally(self, message):
+        """Test that distress goes to the LLM instead of advancing the stage"""
+        assert _classify_stage_locally(message, "GUIDANCE", 8.0) is None
+    
+    @pytest.mark.parametrize("message", DISCLOSURE_MESSAGES)
+    def test_disclosure_transitions_with_enough_trust(self, message):
+        """Test that a disclosure advances the stage locally when trust allows it"""
+        analysis = _classify_stage_locally(message, "ENGAGEMENT", 5.0)
+        assert analysis is not None
+        assert analysis["should_transition"] is True
+    
+    @pytest.mark.parametrize("next_stage,trust", [("ENGAGEMENT", 3.0), ("GUIDANCE", 4.0), ("REFLECTION", 2.5)])
+    def test_disclosure_below_trust_gate_goes_to_llm(self, next_stage, trust):
+        """Test that the prompt's trust gates apply before a local transition"""
+        assert _classify_stage_locally(DISCLOSURE_MESSAGES[0], next_stage, trust) is None
+    
+    @pytest.mark.parametrize("message", [
+        "Can we change the topic?",
+        "Yaar topic badlo, kuch aur baat karo",
+        "میں اس بارے میں بات نہیں کرنا چاہتا",
+    ])
+    def test_lighter_topic_request_stays(self, message):
+        """Test that an explicit request for lighter talk stays in every language"""
+        analysis = _classify_stage_locally(message, "ENGAGEMENT", 5.0)
+        assert analysis is not None
+        assert analysis["should_transition"] is False
+    
+    @pytest.mark.parametrize("message", ["", "ok", "haan"])
+    def test_single_word_reply_stays(self, message):
+        """Test that empty and one-word replies stay without the LLM"""
+        analysis = _classify_stage_locally(message, "ENGAGEMENT", 5.0)
+        assert analysis["should_transition"] is False
+    
+    @pytest.mark.parametrize("message", ["theek hai", "not bad"])
+    def test_two_word_reply_goes_to_llm(self, message):
+        """Test that multi-word replies are left to the LLM"""
+        assert _classify_stage_locally(message, "ENGAGEMENT", 5.0) is None
@@ -0,0 +1,136 @@
+"""
+Tests for DatabaseBatcher write coalescing
+"""
+
+import asyncio
+from infrastructure.database_batcher import DatabaseBatcher
+
+
+class _Result:
+    error = None
+    data = []
+
+
+class _Table:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.rows = None
+    
+    def upsert(self, rows, on_conflict=None):
+        self.rows = rows
+        return self
+    
+    def execute(self):
+        self.client.upserts.append((self.name, self.rows))
+        if self.client.raise_error:
+            raise self.client.raise_error
+        return _Result()
+
+
+class _StubSupabase:
+    """Records every upsert instead of talking to a database"""
+    
+    def __init__(self, raise_error=None):
+        self.upserts = []
+        self.raise_error = raise_error
+    
+    def table(self, name):
+        return _Table(self, name)
+
+
+class _APIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class TestEnqueueWrite:
+    """Test batched upserts"""
+    
+    def test_mixed_column_sets_are_upserted_separately(self):
+        """Test that a row missing a column is never sent alongside rows that have it"""
+        client = _StubSupabase()
+        batcher = DatabaseBatcher(client)
+        
+        async def run():
+            return await asyncio.gather(
+                batcher.enqueue_write("conversation_state", {"user_id": "a", "stage": "ORIENTATION"}, "user_id"),
+                batcher.enqueue_write("conversation_state", {"user_id": "b", "stage": "ENGAGEMENT", "stage_history": [{"to": "ENGAGEMENT"}]}, "user_id"),
+                batcher.enqueue_write("conversation_state", {"user_id": "c", "stage": "ORIENTATION"}, "user_id"),
+            )
+        
+        assert asyncio.run(run()) == [None, None, None]
+        assert len(client.upserts) == 2
+        for _, rows in client.upserts:
+            assert len({frozenset(row) for row in rows}) == 1
+        assert sorted(len(rows) for _, rows in client.upserts) == [1, 2]
+    
+    def test_same_user_writes_coalesce_to_latest_row(self):
+        """Test that a later write to the same key replaces the queued row"""
+        client = _StubSupabase()
+        batcher = DatabaseBatcher(client)
+        
+        async def run():
+            return await asyncio.gather(
+                batcher.enqueue_write("user_profiles", {"user_id": "a", "profile_text": "old"}, "user_id"),
+                batcher.enqueue_write("user_profiles", {"user_id": "a", "profile_text": "new"}, "user_id"),
+            )
+        
+        assert asyncio.run(run()) == [None, None]
+        assert client.upserts == [("user_profiles", [{"user_id": "a", "profile_text": "new"}])]
+    
+    def test_raised_error_is_normalized_for_every_waiter(self):
+        """Test that a failed upsert reports code and message to each caller"""
+        client = _StubSupabase(raise_error=_APIError("42501", "row-level security"))
+        batcher = DatabaseBatcher(client)
+        
+        async def run():
+            return await asyncio.gather(
+                batcher.enqueue_write("conversation_state", {"user_id": "a", "stage": "ORIENTATION"}, "user_id"),
+                batcher.enqueue_write("conversation_state", {"user_id": "b", "stage": "ORIENTATION"}, "user_id"),
+            )
+        
+        expected = {"code": "42501", "message": "row-level security"}
+        assert asyncio.run(run()) == [expected, expected]
+    
+    def test_full_queue_flush_survives_cancelled_caller(self):
+        """Test that cancelling the caller that filled the queue doesn't drop the batch"""
+        client = _StubSupabase()
+        batcher = DatabaseBatcher(client)
+        batcher._batch_size = 2
+        
+        async def run():
+            first = asyncio.ensure_future(
+                batcher.enqueue_write("user_profiles", {"user_id": "a", "profile_text": "x"}, "user_id")
+            )
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(
+                batcher.enqueue_write("user_profiles", {"user_id": "b", "profile_text": "y"}, "user_id")
+            )
+            await asyncio.sleep(0)
+            second.cancel()
+            return await asyncio.wait_for(first, timeout=1.0)
+        
+        assert asyncio.run(run()) is None
+        assert len(client.upserts) == 1
+        assert len(client.upserts[0][1]) == 2
+    
+    def test_cancelled_flush_answers_every_waiter(self):
+        """Test that waiters get an error instead of hanging when the flush is cancelled"""
+        client = _StubSupabase()
+        batcher = DatabaseBatcher(client)
+        
+        async def run():
+            write = asyncio.ensure_future(
+                batcher.enqueue_write("user_profiles", {"user_id": "a", "profile_text": "x"}, "user_id")
+            )
+            await asyncio.sleep(0)
+            flush = asyncio.ensure_future(batcher._flush_writes())
+            await asyncio.sleep(0)
+            flush.cancel()
+            return await asyncio.wait_for(write, timeout=1.0)
+        
+        error = asyncio.run(run())
+        assert error is not None and error["message"]
@@ -0,0 +1,51 @@
+"""
+Tests for the shared embeddings request coalescer
+"""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from rag_system import _EmbeddingCoalescer
+
+
+class _StubEmbeddings:
+    """Returns one embedding per input, minus `short` of them"""
+    
+    def __init__(self, short: int = 0):
+        self.short = short
+        self.calls = 0
+    
+    async def create(self, model, input, timeout=None):
+        self.calls += 1
+        data = [SimpleNamespace(index=i, embedding=[float(i)]) for i in range(len(input) - self.short)]
+        return SimpleNamespace(data=data)
+
+
+def _embed_all(client, texts):
+    async def run():
+        coalescer = _EmbeddingCoalescer()
+        return await asyncio.wait_for(
+            asyncio.gather(*(coalescer.embed(client, t) for t in texts), return_exceptions=True),
+            timeout=1.0
+        )
+    return asyncio.run(run())
+
+
+class TestEmbeddingCoalescer:
+    """Test that every caller is resolved"""
+    
+    def test_texts_share_one_request(self):
+        """Test that concurrent texts are embedded in one call"""
+        embeddings = _StubEmbeddings()
+        results = _embed_all(SimpleNamespace(embeddings=embeddings), ["a", "b", "c"])
+        
+        assert embeddings.calls == 1
+        assert not any(isinstance(result, BaseException) for result in results)
+    
+    def test_short_response_fails_every_caller(self):
+        """Test that a response missing embeddings raises instead of hanging"""
+        client = SimpleNamespace(embeddings=_StubEmbeddings(short=1))
+        results = _embed_all(client, ["a", "b", "c"])
+        
+        assert len(results) == 3
+        assert all(isinstance(result, ValueError) for result in results)
@@ -0,0 +1,38 @@
+"""
+Tests for the profile-update trigger
+"""
+
+import pytest
+from services.profile_service import mentions_profile_details
+
+
+class TestMentionsProfileDetails:
+    """Test which messages are sent to the profile LLM"""
+    
+    @pytest.mark.parametrize("message", [
+        "acha",
+        "phir kya hua",
+        "haan main bhi yehi soch raha tha",
+        "I like that idea, tell me more",
+        "main theek hoon, aap sunao kya chal raha hai",
+        "میں ٹھیک ہوں آپ کیسے ہیں",
+        "What do you think about the weather today?",
+    ])
+    def test_plain_chat_is_skipped(self, message):
+        """Test that everyday turns don't trigger a profile update"""
+        assert mentions_profile_details(message) is False
+    
+    @pytest.mark.parametrize("message", [
+        "My name is Ali and I live in Karachi",
+        "I'm 24 years old",
+        "I really enjoy playing cricket on weekends",
+        "I work at a bank in Lahore",
+        "Mera naam Sara hai",
+        "main 25 saal ka hoon aur Lahore mein rehta hoon",
+        "mujhe biryani bohat pasand hai",
+        "میرا نام احمد ہے",
+        "میں ایک بینک میں کام کرتا ہوں",
+    ])
+    def test_self_disclosure_triggers(self, message):
+        """Test that names, ages, homes, work and likes trigger a profile update"""
+        assert mentions_profile_details(message) is True
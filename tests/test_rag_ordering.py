@@ -0,0 +1,31 @@
+"""
+Tests for the order in which retrieved memory snippets are presented
+"""
+
+import itertools
+from rag_system import _order_snippets
+
+
+def _snippet(idx, timestamp):
+    return {"memory_idx": idx, "text": f"memory {idx}", "timestamp": timestamp, "final_score": 1.0 / (idx + 1)}
+
+
+class TestSnippetOrdering:
+    """Test that the same snippet set always yields the same prompt order"""
+
+    def test_same_set_same_order_across_calls(self):
+        """Every score ordering of one snippet set produces the same output order"""
+        snippets = [_snippet(0, 300.0), _snippet(1, 100.0), _snippet(2, 200.0)]
+
+        orders = {
+            tuple(r["memory_idx"] for r in _order_snippets(list(perm)))
+            for perm in itertools.permutations(snippets)
+        }
+
+        assert orders == {(1, 2, 0)}
+
+    def test_timestamp_ties_use_memory_index(self):
+        """Snippets stored at the same time fall back to memory index order"""
+        snippets = [_snippet(5, 100.0), _snippet(2, 100.0), _snippet(9, 50.0)]
+
+        assert [r["memory_idx"] for r in _order_snippets(snippets)] == [9, 2, 5]
@@ -152,3 +152,9 @@ class TestUserIdEdgeCases:
         result = UserId.parse_from_identity(uuid_with_space)
         assert result == "bb4a6f7c-1e1d-4db8-9fcd-f7095759aba2"
 
+    
+    def test_parse_from_identity_prefix_is_case_sensitive(self):
+        """Test that only the lowercase 'user-' prefix is accepted"""
+        identity = "USER-bb4a6f7c-1e1d-4db8-9fcd-f7095759aba2"
+        with pytest.raises(UserIdError):
+            UserId.parse_from_identity(identity)